@@ -0,0 +1,59 @@
+"""Скрипт для просмотра аналитики вопросов и обратной связи."""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+from utils.analytics import AnalyticsStore
+from utils.storage_config import ANALYTICS_DB_FILE
+
+# Настройка логирования
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    """Основная функция вывода отчетов аналитики."""
+    parser = argparse.ArgumentParser(description="Отчеты аналитики ассистента")
+    parser.add_argument("--db", default=ANALYTICS_DB_FILE, help="Файл базы SQLite")
+    subparsers = parser.add_subparsers(dest="report", required=True)
+
+    unanswered = subparsers.add_parser("unanswered", help="Частые вопросы без ответа")
+    unanswered.add_argument("--limit", type=int, default=10)
+    unanswered.add_argument("--since-hours", type=float, default=None)
+
+    feedback = subparsers.add_parser("feedback", help="Соотношение 👍/👎 по ответам")
+    feedback.add_argument("--limit", type=int, default=20)
+    feedback.add_argument("--min-votes", type=int, default=1)
+
+    confidence = subparsers.add_parser("confidence", help="Гистограмма уверенности")
+    confidence.add_argument("--since-hours", type=float, default=None)
+
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        logger.error(f"База аналитики {args.db} не найдена")
+        sys.exit(1)
+
+    store = AnalyticsStore(db_path=args.db)
+    since = None
+    if getattr(args, "since_hours", None) is not None:
+        since = time.time() - args.since_hours * 3600
+
+    try:
+        if args.report == "unanswered":
+            report = store.top_unanswered(args.limit, since)
+        elif args.report == "feedback":
+            report = store.feedback_ratios(args.limit, args.min_votes)
+        else:
+            report = store.confidence_histogram(since)
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""Общие инструменты бенчмарков: замер времени, памяти и сравнение с baseline."""
+
+import json
+import logging
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Допустимое замедление относительно baseline (0.25 = на 25%)
+DEFAULT_TOLERANCE = 0.25
+
+# Сценарий калибровочной нагрузки для приведения результатов к машине
+CALIBRATION = "calibration"
+
+# Вопросы на случай отсутствия файлов с вопросами
+FALLBACK_QUESTIONS = [
+    "Как заказать такси?",
+    "Почему удерживается комиссия при безналичном расчете?",
+    "Можно ли работать на праворульном автомобиле?",
+    "Как изменить номер телефона в приложении?",
+]
+
+
+def load_questions(files: Sequence[str]) -> List[str]:
+    """
+    Загружает вопросы из JSONL файлов (история чата, база знаний).
+
+    Args:
+        files: Пути к JSONL файлам с полем question
+
+    Returns:
+        List[str]: Вопросы из всех файлов или стандартный набор,
+        если ни в одном файле вопросов нет
+    """
+    questions = []
+    for file in files:
+        path = Path(file)
+        if not path.exists():
+            logger.warning(f"Файл {file} не найден, пропускаем")
+            continue
+
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    question = json.loads(line).get("question")
+                except json.JSONDecodeError:
+                    continue
+                if question:
+                    questions.append(question)
+
+    if not questions:
+        logger.warning("Вопросы не найдены, используем встроенный набор")
+        return list(FALLBACK_QUESTIONS)
+    return questions
+
+
+def make_typo(word: str, rng: random.Random) -> str:
+    """Вносит в слово одну опечатку: пропуск, удвоение или перестановку букв."""
+    if len(word) < 4:
+        return word + word[-1]
+
+    pos = rng.randrange(1, len(word) - 1)
+    kind = rng.choice(("drop", "double", "swap"))
+    if kind == "drop":
+        return word[:pos] + word[pos + 1 :]
+    if kind == "double":
+        return word[:pos] + word[pos] + word[pos:]
+    return word[:pos] + word[pos + 1] + word[pos] + word[pos + 2 :]
+
+
+def measure(
+    func: Callable[[Any], Any],
+    inputs: Sequence[Any],
+    repeats: int = 5,
+    setup: Optional[Callable[[], None]] = None,
+) -> Dict[str, float]:
+    """
+    Измеряет время и память на одну операцию.
+
+    Каждый повтор - один проход по всем входным данным. Функция setup
+    (например, очистка кэшей) вызывается перед каждым проходом и в замер
+    не входит.
+
+    Args:
+        func: Измеряемая функция одного аргумента
+        inputs: Входные данные для одного прохода
+        repeats: Количество повторов
+        setup: Подготовка перед каждым проходом
+
+    Returns:
+        Dict[str, float]: ns/op (медиана и минимум по повторам)
+        и пиковый прирост памяти в байтах на операцию
+    """
+    if not inputs:
+        raise ValueError("Нет входных данных для замера")
+
+    timings: List[float] = []
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        start = time.perf_counter_ns()
+        for item in inputs:
+            func(item)
+        timings.append((time.perf_counter_ns() - start) / len(inputs))
+
+    # Память замеряем отдельным проходом: tracemalloc сильно замедляет код
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        baseline_memory, _ = tracemalloc.get_traced_memory()
+        for item in inputs:
+            func(item)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "ns_per_op": statistics.median(timings),
+        "min_ns_per_op": min(timings),
+        "peak_bytes_per_op": max(peak_memory - baseline_memory, 0) / len(inputs),
+    }
+
+
+def _reference_workload(size: int) -> None:
+    """Калибровочная нагрузка: строки и векторные операции, как в конвейере."""
+    words = sorted(str(value * 7919 % 10007) for value in range(size))
+    " ".join(words).lower().split()
+    matrix = np.arange(size * 64, dtype="float32").reshape(size, 64)
+    matrix @ matrix[0]
+
+
+def calibrate(repeats: int = 5) -> Dict[str, float]:
+    """
+    Измеряет калибровочную нагрузку для приведения результатов к машине.
+
+    Args:
+        repeats: Количество повторов
+
+    Returns:
+        Dict[str, float]: Результат measure для калибровочной нагрузки
+    """
+    return measure(_reference_workload, [500] * 20, repeats=repeats)
+
+
+def save_baseline(results: Dict[str, Dict[str, float]], path: Path) -> None:
+    """
+    Сохраняет результаты бенчмарка как baseline.
+
+    Args:
+        results: Результаты по сценариям
+        path: Путь к JSON файлу baseline
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    logger.info(f"Baseline сохранен: {path}")
+
+
+def load_baseline(path: Path) -> Dict[str, Dict[str, float]]:
+    """
+    Загружает результаты из файла baseline.
+
+    Args:
+        path: Путь к JSON файлу baseline
+
+    Returns:
+        Dict[str, Dict[str, float]]: Результаты по сценариям
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def compare_with_baseline(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float = DEFAULT_TOLERANCE,
+    metric: str = "ns_per_op",
+) -> List[Dict[str, Any]]:
+    """
+    Сравнивает результаты с baseline.
+
+    Args:
+        results: Текущие результаты по сценариям
+        baseline: Результаты baseline по сценариям
+        tolerance: Допустимое относительное замедление
+        metric: Сравниваемая метрика
+
+    Returns:
+        List[Dict[str, Any]]: Сравнение по сценариям, присутствующим в обоих
+        наборах, с признаком регрессии
+    """
+    comparison = []
+    for name, current in results.items():
+        if name not in baseline or metric not in baseline[name]:
+            continue
+        expected = baseline[name][metric]
+        ratio = current[metric] / expected if expected else 1.0
+        comparison.append(
+            {
+                "name": name,
+                "baseline": expected,
+                "current": current[metric],
+                "ratio": ratio,
+                "regression": ratio > 1.0 + tolerance,
+            }
+        )
+    return comparison
+
+
+def compare_calibrated(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float = DEFAULT_TOLERANCE,
+    metric: str = "ns_per_op",
+) -> List[Dict[str, Any]]:
+    """
+    Сравнивает результаты с baseline с поправкой на скорость машины.
+
+    Результаты делятся на отношение калибровочной нагрузки текущей машины
+    к калибровке baseline, после чего сравниваются обычным образом.
+
+    Args:
+        results: Текущие результаты (со сценарием CALIBRATION)
+        baseline: Результаты baseline (со сценарием CALIBRATION)
+        tolerance: Допустимое относительное замедление
+        metric: Сравниваемая метрика
+
+    Returns:
+        List[Dict[str, Any]]: Сравнение по сценариям с признаком регрессии
+    """
+    scale = 1.0
+    if CALIBRATION in results and CALIBRATION in baseline:
+        scale = results[CALIBRATION][metric] / baseline[CALIBRATION][metric]
+
+    scaled = {
+        name: {metric: result[metric] / scale}
+        for name, result in results.items()
+        if name != CALIBRATION
+    }
+    return compare_with_baseline(scaled, baseline, tolerance, metric)
+
+
+def print_results(results: Dict[str, Dict[str, float]]) -> None:
+    """Выводит таблицу результатов."""
+    print(f"{'сценарий':<40} {'ns/op':>12} {'min ns/op':>12} {'B/op':>10}")
+    for name, result in results.items():
+        print(
+            f"{name:<40} {result['ns_per_op']:>12.0f} "
+            f"{result['min_ns_per_op']:>12.0f} {result['peak_bytes_per_op']:>10.0f}"
+        )
+
+
+def print_comparison(comparison: List[Dict[str, Any]]) -> None:
+    """Выводит сравнение с baseline."""
+    print(f"\n{'сценарий':<40} {'baseline':>12} {'текущий':>12} {'ratio':>8}")
+    for row in comparison:
+        marker = "  ❌ регрессия" if row["regression"] else ""
+        print(
+            f"{row['name']:<40} {row['baseline']:>12.0f} "
+            f"{row['current']:>12.0f} {row['ratio']:>8.2f}{marker}"
+        )
@@ -0,0 +1,265 @@
+"""
+Микробенчмарк обработки приветствий.
+
+Прогоняет реалистичную смесь сообщений (чистые приветствия, приветствие
+с вопросом, опечатки, вопросы из chat_history.jsonl) через функции
+utils/greetings.py, utils/fuzzy_greetings.py и utils/smart_normalize.py
+и выводит ns/op и пиковую память на операцию. При сравнении с baseline
+результаты приводятся к скорости машины по калибровочной нагрузке, как
+в benchmarks/pipeline_bench.py.
+
+Запуск:
+    python -m benchmarks.greetings_bench
+    python -m benchmarks.greetings_bench --save-baseline
+    python -m benchmarks.greetings_bench --compare
+"""
+
+import argparse
+import logging
+import random
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from benchmarks.common import (
+    CALIBRATION,
+    calibrate,
+    compare_calibrated,
+    load_baseline,
+    load_questions,
+    make_typo,
+    measure,
+    print_comparison,
+    print_results,
+    save_baseline,
+)
+from utils.fuzzy_greetings import (
+    clear_fuzzy_cache,
+    fuzzy_greeting_match,
+    fuzzy_greeting_match_batch,
+    patterns_version,
+)
+from utils.greetings import (
+    parse_greeting,
+    parse_greetings_batch,
+    process_greeting_message,
+)
+from utils.greetings_config import GREETING_PATTERNS
+from utils.smart_normalize import (
+    extract_greeting_words,
+    is_potential_greeting,
+    normalize_for_fuzzy_matching,
+    smart_normalize_text,
+)
+from utils.text_normalize import clear_normalize_cache
+
+# Настройка логирования: INFO сообщения модулей приветствий
+# на каждое сообщение исказили бы замеры
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+# Константы
+HISTORY_FILE = "chat_history.jsonl"
+BASELINE_FILE = "benchmarks/baselines/greetings.json"
+MIX_SIZE = 400
+REPEATS = 5
+SEED = 42
+# Минимум по повторам меньше зависит от фоновой нагрузки, чем медиана
+METRIC = "min_ns_per_op"
+# Допустимое замедление, как у бюджетов этапов в pipeline_bench: даже после
+# калибровки микробенчмарки на общих машинах колеблются в полтора раза
+BENCH_TOLERANCE = 1.0
+
+# Доли категорий в смеси сообщений
+MIX_WEIGHTS = {
+    "pure_greeting": 0.2,
+    "greeting_question": 0.3,
+    "typo_greeting": 0.1,
+    "question": 0.4,
+}
+
+Case = Tuple[str, Callable[[Any], Any], Sequence[Any], Optional[Callable[[], None]]]
+
+
+def build_message_mix(
+    questions: Sequence[str], size: int = MIX_SIZE, seed: int = SEED
+) -> Dict[str, List[str]]:
+    """
+    Строит воспроизводимую смесь сообщений по категориям.
+
+    Args:
+        questions: Вопросы пользователей
+        size: Общее количество сообщений
+        seed: Зерно генератора случайных чисел
+
+    Returns:
+        Dict[str, List[str]]: Сообщения по категориям
+    """
+    rng = random.Random(seed)
+    punctuation = ["", "!", ".", "!!", "?"]
+
+    def greeting() -> str:
+        text = rng.choice(GREETING_PATTERNS)
+        return text.capitalize() if rng.random() < 0.5 else text
+
+    generators = {
+        "pure_greeting": lambda: greeting() + rng.choice(punctuation),
+        "greeting_question": lambda: (
+            f"{greeting()}{rng.choice([',', '!', ''])} {rng.choice(questions)}"
+        ),
+        "typo_greeting": lambda: make_typo(rng.choice(GREETING_PATTERNS), rng)
+        + rng.choice(punctuation),
+        "question": lambda: rng.choice(questions),
+    }
+
+    return {
+        category: [generators[category]() for _ in range(max(1, int(size * weight)))]
+        for category, weight in MIX_WEIGHTS.items()
+    }
+
+
+def clear_caches() -> None:
+    """Очищает кэши нормализации и fuzzy matching (холодный прогон)."""
+    clear_fuzzy_cache()
+    clear_normalize_cache()
+
+
+def build_cases(mix: Dict[str, List[str]]) -> List[Case]:
+    """
+    Формирует сценарии бенчмарка.
+
+    Args:
+        mix: Сообщения по категориям
+
+    Returns:
+        List[Case]: (название, функция, входные данные, подготовка)
+    """
+    messages = [message for category in mix.values() for message in category]
+    fuzzy_inputs = [
+        smart_normalize_text(message)
+        for message in mix["pure_greeting"] + mix["typo_greeting"]
+    ]
+
+    cases: List[Case] = [
+        ("parse_greeting", parse_greeting, messages, clear_caches),
+        ("parse_greeting.warm", parse_greeting, messages, None),
+    ]
+    cases += [
+        (f"parse_greeting[{category}]", parse_greeting, items, clear_caches)
+        for category, items in mix.items()
+    ]
+    version = patterns_version(GREETING_PATTERNS)
+    cases += [
+        ("parse_greetings_batch", parse_greetings_batch, [messages], clear_caches),
+        ("process_greeting_message", process_greeting_message, messages, clear_caches),
+        (
+            "fuzzy_greeting_match",
+            lambda message: fuzzy_greeting_match(
+                message, GREETING_PATTERNS, version=version
+            ),
+            fuzzy_inputs,
+            clear_caches,
+        ),
+        (
+            "fuzzy_greeting_match_batch",
+            lambda batch: fuzzy_greeting_match_batch(batch, GREETING_PATTERNS),
+            [fuzzy_inputs],
+            None,
+        ),
+        ("smart_normalize_text", smart_normalize_text, messages, clear_caches),
+        ("is_potential_greeting", is_potential_greeting, messages, None),
+        ("extract_greeting_words", extract_greeting_words, messages, None),
+        (
+            "normalize_for_fuzzy_matching",
+            normalize_for_fuzzy_matching,
+            messages,
+            clear_caches,
+        ),
+    ]
+    return cases
+
+
+def run_benchmarks(
+    mix: Dict[str, List[str]], repeats: int = REPEATS
+) -> Dict[str, Dict[str, float]]:
+    """
+    Запускает все сценарии бенчмарка.
+
+    Для пакетных функций результат пересчитывается на одно сообщение.
+    Сценарий CALIBRATION замеряется до и после остальных для сравнения
+    с baseline.
+
+    Args:
+        mix: Сообщения по категориям
+        repeats: Количество повторов каждого сценария
+
+    Returns:
+        Dict[str, Dict[str, float]]: Результаты по сценариям
+    """
+    calibration = calibrate(repeats)
+    results = {CALIBRATION: calibration}
+    for name, func, inputs, setup in build_cases(mix):
+        result = measure(func, inputs, repeats=repeats, setup=setup)
+        if name.endswith("_batch"):
+            batch_size = len(inputs[0])
+            result = {key: value / batch_size for key, value in result.items()}
+        results[name] = result
+
+    # Частота процессора может измениться за время прогона: калибровка
+    # повторяется в конце, и берется лучший из двух замеров
+    final = calibrate(repeats)
+    results[CALIBRATION] = {
+        key: min(value, final[key]) for key, value in calibration.items()
+    }
+    return results
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Основная функция бенчмарка."""
+    parser = argparse.ArgumentParser(description="Бенчмарк обработки приветствий")
+    parser.add_argument("--history", default=HISTORY_FILE, help="Файл истории чата")
+    parser.add_argument("--size", type=int, default=MIX_SIZE, help="Размер смеси")
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="Повторы")
+    parser.add_argument(
+        "--baseline", default=BASELINE_FILE, help="Файл baseline результатов"
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Сохранить результаты как baseline"
+    )
+    parser.add_argument(
+        "--compare", action="store_true", help="Сравнить результаты с baseline"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=BENCH_TOLERANCE,
+        help="Допустимое замедление относительно baseline",
+    )
+    args = parser.parse_args(argv)
+
+    mix = build_message_mix(load_questions([args.history]), size=args.size)
+    results = run_benchmarks(mix, repeats=args.repeats)
+    print_results(results)
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        save_baseline(results, baseline_path)
+
+    if args.compare:
+        if not baseline_path.exists():
+            logger.error(f"Файл baseline {baseline_path} не найден")
+            return 1
+        comparison = compare_calibrated(
+            results, load_baseline(baseline_path), args.tolerance, METRIC
+        )
+        print_comparison(comparison)
+        regressions = [row["name"] for row in comparison if row["regression"]]
+        if regressions:
+            logger.error(f"Регрессии производительности: {', '.join(regressions)}")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,353 @@
+"""
+Нагрузочный тест эндпоинта /api/v1/ask.
+
+Воспроизводит корпус вопросов (по умолчанию chat_history.jsonl и
+data/kb.jsonl, с настраиваемой долей приветствий и опечаток) с фиксированной
+частотой запросов (--rps) или с максимальной параллельностью (--concurrency)
+и выводит JSON отчет: пропускная способность, перцентили задержек, доля
+ошибок и гистограмма задержек.
+
+Запуск:
+    python -m benchmarks.load_test --url http://localhost:8000 --rps 20
+    python -m benchmarks.load_test --asgi --concurrency 8 --requests 200
+
+Офлайн, без весов модели (индекс собран тем же бэкендом):
+    python -m benchmarks.load_test --asgi --encoder hashing --data-dir data_hashing
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from contextlib import AsyncExitStack
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+
+from benchmarks.common import load_questions, make_typo
+from utils.encoders import ENCODER_BACKENDS
+from utils.greetings_config import GREETING_PATTERNS
+from utils.latency import summarize_latencies
+
+# Настройка логирования
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+# Константы
+CORPUS_FILES = ["chat_history.jsonl", "data/kb.jsonl"]
+DEFAULT_URL = "http://localhost:8000"
+ASK_PATH = "/api/v1/ask"
+REQUEST_TIMEOUT = 30.0
+SEED = 42
+
+# Верхние границы корзин гистограммы задержек (мс)
+HISTOGRAM_BOUNDS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+
+def build_corpus(
+    questions: Sequence[str],
+    size: int,
+    greeting_ratio: float = 0.2,
+    typo_ratio: float = 0.1,
+    seed: int = SEED,
+) -> List[str]:
+    """
+    Строит воспроизводимый корпус запросов.
+
+    Args:
+        questions: Исходные вопросы
+        size: Количество запросов
+        greeting_ratio: Доля запросов с приветствием перед вопросом
+        typo_ratio: Доля запросов с опечаткой в одном слове
+        seed: Зерно генератора случайных чисел
+
+    Returns:
+        List[str]: Запросы
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        query = rng.choice(questions)
+        if rng.random() < typo_ratio:
+            words = query.split()
+            idx = rng.randrange(len(words))
+            words[idx] = make_typo(words[idx], rng)
+            query = " ".join(words)
+        if rng.random() < greeting_ratio:
+            greeting = rng.choice(GREETING_PATTERNS).capitalize()
+            query = f"{greeting}! {query}"
+        corpus.append(query)
+    return corpus
+
+
+def latency_histogram(latencies_ms: Sequence[float]) -> Dict[str, int]:
+    """
+    Раскладывает задержки по корзинам.
+
+    Args:
+        latencies_ms: Задержки в миллисекундах
+
+    Returns:
+        Dict[str, int]: Количество запросов по корзинам ("<=5ms", ..., ">5000ms")
+    """
+    histogram = {f"<={bound}ms": 0 for bound in HISTOGRAM_BOUNDS_MS}
+    overflow = f">{HISTOGRAM_BOUNDS_MS[-1]}ms"
+    histogram[overflow] = 0
+    for latency in latencies_ms:
+        for bound in HISTOGRAM_BOUNDS_MS:
+            if latency <= bound:
+                histogram[f"<={bound}ms"] += 1
+                break
+        else:
+            histogram[overflow] += 1
+    return histogram
+
+
+class LoadGenerator:
+    """Отправляет запросы к /ask и собирает результаты."""
+
+    def __init__(self, client: httpx.AsyncClient) -> None:
+        """
+        Инициализирует генератор нагрузки.
+
+        Args:
+            client: HTTP клиент, настроенный на тестируемый сервис
+        """
+        self.client = client
+        self.results: List[Dict[str, Any]] = []
+
+    async def send(self, query: str) -> None:
+        """Отправляет один запрос и сохраняет задержку и статус."""
+        start = time.perf_counter()
+        try:
+            response = await self.client.post(ASK_PATH, json={"query": query})
+            status = response.status_code
+            source = response.json().get("source") if status == 200 else None
+        except Exception as e:
+            status = type(e).__name__
+            source = None
+        self.results.append(
+            {
+                "latency_ms": (time.perf_counter() - start) * 1000,
+                "status": status,
+                "source": source,
+            }
+        )
+
+    async def run_fixed_rate(self, corpus: Sequence[str], rps: float) -> float:
+        """
+        Отправляет запросы с фиксированной частотой (открытая модель нагрузки).
+
+        Запросы запускаются по расписанию независимо от того, ответил ли
+        сервис на предыдущие, поэтому перегрузка видна в задержках.
+
+        Args:
+            corpus: Запросы
+            rps: Запросов в секунду
+
+        Returns:
+            float: Общее время выполнения в секундах
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        tasks = []
+        for idx, query in enumerate(corpus):
+            delay = start + idx / rps - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(self.send(query)))
+        await asyncio.gather(*tasks)
+        return loop.time() - start
+
+    async def run_max_concurrency(
+        self, corpus: Sequence[str], concurrency: int
+    ) -> float:
+        """
+        Отправляет запросы с постоянным числом одновременных запросов.
+
+        Args:
+            corpus: Запросы
+            concurrency: Число одновременных запросов
+
+        Returns:
+            float: Общее время выполнения в секундах
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        for query in corpus:
+            queue.put_nowait(query)
+
+        async def worker() -> None:
+            while not queue.empty():
+                await self.send(queue.get_nowait())
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+        return time.perf_counter() - start
+
+    def report(self, wall_time_s: float) -> Dict[str, Any]:
+        """
+        Формирует отчет по собранным результатам.
+
+        Args:
+            wall_time_s: Общее время выполнения в секундах
+
+        Returns:
+            Dict[str, Any]: Пропускная способность, задержки успешных
+            запросов, доля ошибок, статусы, источники ответов и гистограмма
+        """
+        succeeded = [result for result in self.results if result["status"] == 200]
+        latencies = [result["latency_ms"] for result in succeeded]
+        total = len(self.results)
+        return {
+            "requests": total,
+            "errors": total - len(succeeded),
+            "error_rate": (total - len(succeeded)) / total if total else 0.0,
+            "wall_time_s": wall_time_s,
+            "latency": summarize_latencies(latencies, wall_time_s),
+            "histogram": latency_histogram(latencies),
+            "statuses": dict(Counter(str(result["status"]) for result in self.results)),
+            "sources": dict(
+                Counter(
+                    result["source"] if result["source"] else "none"
+                    for result in succeeded
+                )
+            ),
+        }
+
+
+async def run_load_test(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Запускает нагрузочный тест по аргументам командной строки.
+
+    Args:
+        args: Аргументы командной строки
+
+    Returns:
+        Dict[str, Any]: Отчет нагрузочного теста
+    """
+    questions = load_questions(args.corpus)
+    corpus = build_corpus(
+        questions, args.requests, args.greeting_ratio, args.typo_ratio, args.seed
+    )
+
+    async with AsyncExitStack() as stack:
+        if args.asgi:
+            # Приложение в процессе, с его lifespan (фоновые писатели и т.п.)
+            from main import app
+            from utils.analytics import analytics_store
+            from utils.feedback_writer import feedback_writer
+            from utils.search import search_engine
+
+            # Синтетический трафик не должен попадать в рабочую аналитику
+            # и журнал обратной связи
+            scratch_dir = Path(stack.enter_context(tempfile.TemporaryDirectory()))
+            stack.callback(setattr, analytics_store, "db_path", analytics_store.db_path)
+            stack.callback(setattr, feedback_writer, "path", feedback_writer.path)
+            analytics_store.db_path = scratch_dir / "analytics.db"
+            feedback_writer.path = scratch_dir / "feedback.log"
+
+            if args.encoder:
+                search_engine.encoder_backend = args.encoder
+            if args.data_dir:
+                search_engine.data_dir = args.data_dir
+
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            transport = httpx.ASGITransport(app=app)
+            base_url = "http://test"
+        else:
+            transport = None
+            base_url = args.url
+
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        client = await stack.enter_async_context(
+            httpx.AsyncClient(
+                base_url=base_url,
+                transport=transport,
+                timeout=args.timeout,
+                limits=limits,
+            )
+        )
+
+        # Прогрев: первый запрос может загружать модели
+        if args.warmup:
+            await client.post(ASK_PATH, json={"query": questions[0]})
+
+        generator = LoadGenerator(client)
+        if args.rps:
+            wall_time = await generator.run_fixed_rate(corpus, args.rps)
+        else:
+            wall_time = await generator.run_max_concurrency(corpus, args.concurrency)
+
+    report = generator.report(wall_time)
+    report["config"] = {
+        "target": "asgi" if args.asgi else args.url,
+        "mode": "fixed_rate" if args.rps else "max_concurrency",
+        "rps": args.rps,
+        "concurrency": None if args.rps else args.concurrency,
+        "greeting_ratio": args.greeting_ratio,
+        "typo_ratio": args.typo_ratio,
+        "seed": args.seed,
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    return report
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """Разбирает аргументы командной строки."""
+    parser = argparse.ArgumentParser(description="Нагрузочный тест /api/v1/ask")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", default=DEFAULT_URL, help="Адрес сервиса")
+    target.add_argument(
+        "--asgi", action="store_true", help="Тестировать приложение в процессе"
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--rps", type=float, help="Фиксированная частота запросов")
+    mode.add_argument(
+        "--concurrency", type=int, default=8, help="Одновременных запросов"
+    )
+    parser.add_argument("--requests", type=int, default=200, help="Всего запросов")
+    parser.add_argument(
+        "--corpus", nargs="+", default=CORPUS_FILES, help="JSONL файлы с вопросами"
+    )
+    parser.add_argument("--greeting-ratio", type=float, default=0.2)
+    parser.add_argument("--typo-ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--timeout", type=float, default=REQUEST_TIMEOUT)
+    parser.add_argument(
+        "--no-warmup", dest="warmup", action="store_false", help="Без прогрева"
+    )
+    parser.add_argument(
+        "--encoder",
+        choices=ENCODER_BACKENDS,
+        help="Бэкенд эмбеддингов приложения (только с --asgi)",
+    )
+    parser.add_argument(
+        "--data-dir", help="Директория индекса приложения (только с --asgi)"
+    )
+    parser.add_argument("--output", help="Файл для JSON отчета")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Основная функция нагрузочного теста."""
+    args = parse_args(argv)
+    report = asyncio.run(run_load_test(args))
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(text, encoding="utf-8")
+
+    return 0 if report["errors"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,307 @@
+"""
+Бенчмарк этапов обработки /api/v1/ask с бюджетами по этапам.
+
+Прогоняет воспроизводимый корпус запросов (вопросы базы знаний и истории
+чата, часть с приветствием или опечаткой) через этапы конвейера:
+приветствия, нормализация, эмбеддинг, поиск FAISS, поиск ответа целиком,
+сериализация ответа, answer_question и эндпоинт /api/v1/ask через ASGI.
+Вместо bge-m3 используется детерминированная модель HashingEncoder,
+поэтому замер не требует весов модели и сети.
+
+Бюджеты этапов хранятся в benchmarks/baselines/pipeline.json вместе
+с временем калибровочной нагрузки: при сравнении результаты приводятся
+к скорости машины, на которой сохранен baseline. Те же бюджеты проверяет
+tests/test_perf.py.
+
+Запуск:
+    python -m benchmarks.pipeline_bench
+    python -m benchmarks.pipeline_bench --save-baseline
+    python -m benchmarks.pipeline_bench --compare
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import httpx
+from fastapi import FastAPI
+
+from benchmarks.common import (
+    CALIBRATION,
+    calibrate,
+    compare_calibrated,
+    load_baseline,
+    load_questions,
+    measure,
+    print_comparison,
+    print_results,
+    save_baseline,
+)
+from benchmarks.load_test import build_corpus
+from schemas.ask import AskResponse
+from utils import ask_pipeline
+from utils.analytics import analytics_store
+from utils.ask_pipeline import answer_question
+from utils.encoders import HashingEncoder
+from utils.excel_converter import ExcelToVectorDBConverter
+from utils.greetings import process_greeting_message
+from utils.search import TOP_K_RESULTS, SearchEngine
+from utils.text_normalize import clear_normalize_cache, normalize_text_forms
+
+# Настройка логирования
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+# Константы
+KB_FILE = "data/kb.jsonl"
+CORPUS_FILES = ["chat_history.jsonl", KB_FILE]
+BASELINE_FILE = "benchmarks/baselines/pipeline.json"
+CORPUS_SIZE = 100
+REPEATS = 5
+SEED = 42
+METRIC = "min_ns_per_op"
+# Допустимое замедление этапа: регрессией считается рост больше чем в 2 раза
+PERF_TOLERANCE = 1.0
+
+STAGES = (
+    "greeting",
+    "normalize",
+    "encode",
+    "faiss",
+    "search",
+    "serialize",
+    "pipeline",
+    "api",
+)
+
+
+def build_stub_engine(kb_file: str = KB_FILE) -> SearchEngine:
+    """
+    Собирает движок по базе знаний с моделью HashingEncoder в памяти.
+
+    Эмбеддинги и индекс строятся кодом конвертера, как при обычной сборке.
+
+    Args:
+        kb_file: Путь к базе знаний (JSONL)
+
+    Returns:
+        SearchEngine: Инициализированный движок без reranker и каскада
+    """
+    engine = SearchEngine(
+        enable_reranker=False, enable_cascade=False, encoder_backend="hashing"
+    )
+    with open(kb_file, "r", encoding="utf-8") as f:
+        engine.knowledge_base = [json.loads(line) for line in f if line.strip()]
+    engine.kb_by_id = {entry["id"]: entry for entry in engine.knowledge_base}
+
+    converter = ExcelToVectorDBConverter(encoder_backend="hashing")
+    converter.model = HashingEncoder()
+    embeddings = converter.generate_embeddings(
+        [entry["question"] for entry in engine.knowledge_base]
+    )
+    engine.index = converter.build_faiss_index(embeddings)
+    engine.model = converter.model
+    engine._is_initialized = True
+    return engine
+
+
+def build_queries(
+    files: Sequence[str] = CORPUS_FILES, size: int = CORPUS_SIZE, seed: int = SEED
+) -> List[str]:
+    """Строит воспроизводимый корпус запросов с приветствиями и опечатками."""
+    return build_corpus(load_questions(files), size, seed=seed)
+
+
+@contextmanager
+def stub_app(engine: SearchEngine) -> Iterator[FastAPI]:
+    """
+    Приложение с роутером /api/v1/ask, обслуживаемое переданным движком.
+
+    На время работы подменяет глобальный движок конвейера и отключает
+    запись аналитики, чтобы замер не писал в data/analytics.db.
+    """
+    from routers.ask import router
+
+    app = FastAPI()
+    app.include_router(router)
+    previous_engine = ask_pipeline.search_engine
+    previous_enabled = analytics_store.enabled
+    ask_pipeline.search_engine = engine
+    analytics_store.enabled = False
+    try:
+        yield app
+    finally:
+        ask_pipeline.search_engine = previous_engine
+        analytics_store.enabled = previous_enabled
+
+
+def run_stages(
+    engine: SearchEngine,
+    queries: Sequence[str],
+    repeats: int = REPEATS,
+    stages: Sequence[str] = STAGES,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Измеряет этапы конвейера и калибровочную нагрузку.
+
+    Args:
+        engine: Движок с загруженными данными
+        queries: Запросы пользователей
+        repeats: Количество повторов
+        stages: Измеряемые этапы
+
+    Returns:
+        Dict[str, Dict[str, float]]: Результаты measure по этапам
+        и по калибровочной нагрузке
+    """
+    loop = asyncio.new_event_loop()
+    # INFO сообщения поиска на каждый запрос исказили бы замеры
+    logging.disable(logging.INFO)
+    try:
+        search_queries = [
+            content or query
+            for query, (_, _, content) in zip(
+                queries, map(process_greeting_message, queries)
+            )
+        ]
+        search_texts = [normalize_text_forms(query).search for query in search_queries]
+        vectors = [engine.model.encode([text]) for text in search_texts]
+        answers = [
+            loop.run_until_complete(answer_question(query, engine)) for query in queries
+        ]
+
+        with stub_app(engine) as app:
+            client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://test"
+            )
+
+            def post(query: str) -> None:
+                response = loop.run_until_complete(
+                    client.post("/api/v1/ask", json={"query": query})
+                )
+                response.raise_for_status()
+
+            cases = {
+                "greeting": (process_greeting_message, queries, clear_normalize_cache),
+                "normalize": (normalize_text_forms, queries, clear_normalize_cache),
+                "encode": (
+                    lambda text: engine.model.encode([text]),
+                    search_texts,
+                    None,
+                ),
+                "faiss": (
+                    lambda vector: engine._search_index(vector, TOP_K_RESULTS),
+                    vectors,
+                    None,
+                ),
+                "search": (
+                    lambda query: loop.run_until_complete(
+                        engine.find_best_answer(query)
+                    ),
+                    search_queries,
+                    None,
+                ),
+                "serialize": (
+                    lambda result: AskResponse(
+                        **result.to_response()
+                    ).model_dump_json(),
+                    answers,
+                    None,
+                ),
+                "pipeline": (
+                    lambda query: loop.run_until_complete(
+                        answer_question(query, engine)
+                    ),
+                    queries,
+                    clear_normalize_cache,
+                ),
+                "api": (post, queries, clear_normalize_cache),
+            }
+
+            results = {CALIBRATION: calibrate(repeats)}
+            for name in stages:
+                func, inputs, setup = cases[name]
+                results[name] = measure(func, inputs, repeats=repeats, setup=setup)
+
+            loop.run_until_complete(client.aclose())
+    finally:
+        logging.disable(logging.NOTSET)
+        loop.close()
+    return results
+
+
+def check_budgets(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float = PERF_TOLERANCE,
+    metric: str = METRIC,
+) -> List[Dict[str, Any]]:
+    """
+    Сравнивает этапы с бюджетами baseline с поправкой на скорость машины.
+
+    Args:
+        results: Результаты run_stages
+        baseline: Бюджеты из baseline (с калибровкой)
+        tolerance: Допустимое относительное замедление
+        metric: Сравниваемая метрика
+
+    Returns:
+        List[Dict[str, Any]]: Сравнение по этапам с признаком регрессии
+    """
+    return compare_calibrated(results, baseline, tolerance, metric)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Основная функция бенчмарка."""
+    parser = argparse.ArgumentParser(description="Бенчмарк этапов /api/v1/ask")
+    parser.add_argument("--kb", default=KB_FILE, help="База знаний (JSONL)")
+    parser.add_argument("--size", type=int, default=CORPUS_SIZE, help="Запросов")
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="Повторы")
+    parser.add_argument(
+        "--baseline", default=BASELINE_FILE, help="Файл бюджетов этапов"
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Сохранить результаты как бюджеты"
+    )
+    parser.add_argument(
+        "--compare", action="store_true", help="Сравнить результаты с бюджетами"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=PERF_TOLERANCE,
+        help="Допустимое замедление относительно бюджета",
+    )
+    args = parser.parse_args(argv)
+
+    engine = build_stub_engine(args.kb)
+    results = run_stages(engine, build_queries(size=args.size), repeats=args.repeats)
+    print_results(results)
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        save_baseline(results, baseline_path)
+
+    if args.compare:
+        if not baseline_path.exists():
+            logger.error(f"Файл baseline {baseline_path} не найден")
+            return 1
+        comparison = check_budgets(
+            results, load_baseline(baseline_path), tolerance=args.tolerance
+        )
+        print_comparison(comparison)
+        regressions = [row["name"] for row in comparison if row["regression"]]
+        if regressions:
+            logger.error(f"Регрессии производительности: {', '.join(regressions)}")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,372 @@
+"""
+Воспроизведение записанных диалогов на новом индексе.
+
+Прогоняет вопросы из chat_history.jsonl (и других JSONL логов запросов)
+через тот же конвейер, что и /api/v1/ask, в нескольких рабочих процессах и
+сравнивает ответ, источник и уверенность с записанными значениями. Запросы
+каждого процесса кодируются пачками заранее, поэтому десятки тысяч вопросов
+обрабатываются за минуты.
+
+Запуск:
+    python -m benchmarks.replay_dialogues --data-dir data_new --workers 4
+    python -m benchmarks.replay_dialogues --input chat_history.jsonl logs/q.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from utils.ask_pipeline import answer_question
+from utils.greetings import process_greeting_message
+from utils.latency import summarize_latencies
+from utils.search import SearchEngine
+
+# Настройка логирования
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+# Константы
+INPUT_FILES = ["chat_history.jsonl"]
+ENCODE_BATCH_SIZE = 64
+CONFIDENCE_DRIFT_THRESHOLD = 0.05  # Изменение уверенности, попадающее в отчет
+REPLY_PREVIEW_LENGTH = 200
+
+# Источники, не являющиеся ответом из базы знаний
+NON_KB_SOURCES = (None, "greeting", "fallback_greeting")
+
+
+class PrecomputedEncoder:
+    """
+    Модель эмбеддингов с заранее вычисленными векторами.
+
+    Возвращает сохраненные векторы для известных текстов и передает
+    остальные исходной модели.
+    """
+
+    def __init__(self, model: Any, embeddings: Dict[str, np.ndarray]) -> None:
+        """
+        Инициализирует обертку.
+
+        Args:
+            model: Исходная модель эмбеддингов
+            embeddings: Векторы по нормализованному тексту
+        """
+        self.model = model
+        self.embeddings = embeddings
+
+    def encode(self, texts: List[str], **kwargs: Any) -> np.ndarray:
+        """Возвращает эмбеддинги текстов."""
+        if all(text in self.embeddings for text in texts):
+            return np.stack([self.embeddings[text] for text in texts])
+        return self.model.encode(texts, **kwargs)
+
+
+def load_records(files: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    Загружает записанные диалоги из JSONL файлов.
+
+    Args:
+        files: Пути к JSONL файлам с полем question (и, если записаны,
+            answer/reply, source, confidence)
+
+    Returns:
+        List[Dict[str, Any]]: Записи с вопросом и записанным результатом
+    """
+    records = []
+    for file in files:
+        path = Path(file)
+        if not path.exists():
+            logger.warning(f"Файл {file} не найден, пропускаем")
+            continue
+
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                question = entry.get("question") or entry.get("query")
+                if not question:
+                    continue
+                records.append(
+                    {
+                        "question": question,
+                        "reply": entry.get("answer", entry.get("reply")),
+                        "source": entry.get("source"),
+                        "confidence": entry.get("confidence"),
+                    }
+                )
+    return records
+
+
+def _search_text(engine: SearchEngine, question: str) -> Optional[str]:
+    """Возвращает нормализованный текст, который конвейер отправит в модель."""
+    is_greeting_flag, greeting_response, main_content = process_greeting_message(
+        question
+    )
+    if is_greeting_flag and greeting_response:
+        return None
+    return engine.normalize_text(main_content if main_content else question)
+
+
+def _precompute(engine: SearchEngine, texts: List[str], batch_size: int) -> None:
+    """Кодирует тексты пачками и подменяет модели движка на обертки."""
+    if engine.cascade_model is not None:
+        embeddings = engine.cascade_model.encode(
+            texts, batch_size=batch_size, convert_to_numpy=True
+        )
+        engine.cascade_model = PrecomputedEncoder(
+            engine.cascade_model, dict(zip(texts, embeddings))
+        )
+
+    embeddings = engine.model.encode(
+        texts, batch_size=batch_size, convert_to_numpy=True
+    )
+    engine.model = PrecomputedEncoder(engine.model, dict(zip(texts, embeddings)))
+
+
+async def _replay_async(
+    questions: List[str], data_dir: Optional[str], batch_size: int
+) -> Dict[str, Any]:
+    """Воспроизводит вопросы одного рабочего процесса."""
+    engine = SearchEngine(data_dir=data_dir)
+    await engine.initialize()
+
+    started = time.perf_counter()
+    texts = {_search_text(engine, question) for question in questions}
+    texts.discard(None)
+    if texts:
+        _precompute(engine, sorted(texts), batch_size)
+    encode_seconds = time.perf_counter() - started
+
+    results = []
+    for question in questions:
+        query_started = time.perf_counter()
+        result = await answer_question(question, engine)
+        results.append(
+            {
+                "reply": result.reply,
+                "source": result.source,
+                "confidence": result.confidence,
+                "outcome": result.outcome,
+                "latency_ms": (time.perf_counter() - query_started) * 1000,
+            }
+        )
+
+    return {"results": results, "encode_seconds": encode_seconds}
+
+
+def replay_chunk(
+    questions: List[str], data_dir: Optional[str], batch_size: int
+) -> Dict[str, Any]:
+    """
+    Воспроизводит часть вопросов (точка входа рабочего процесса).
+
+    Args:
+        questions: Вопросы
+        data_dir: Директория с индексом и базой знаний
+        batch_size: Размер пачки при кодировании
+
+    Returns:
+        Dict[str, Any]: Результаты в порядке вопросов и время кодирования
+    """
+    logging.getLogger().setLevel(logging.WARNING)
+    return asyncio.run(_replay_async(questions, data_dir, batch_size))
+
+
+def replay(
+    questions: List[str],
+    data_dir: Optional[str] = None,
+    workers: int = 1,
+    batch_size: int = ENCODE_BATCH_SIZE,
+) -> Dict[str, Any]:
+    """
+    Воспроизводит вопросы, распределяя их по рабочим процессам.
+
+    Args:
+        questions: Вопросы
+        data_dir: Директория с индексом и базой знаний
+        workers: Количество рабочих процессов (1 - в текущем процессе)
+        batch_size: Размер пачки при кодировании
+
+    Returns:
+        Dict[str, Any]: Результаты в порядке вопросов и суммарное время
+        кодирования
+    """
+    if workers <= 1 or len(questions) < 2:
+        return replay_chunk(questions, data_dir, batch_size)
+
+    chunk_size = -(-len(questions) // workers)
+    chunks = [
+        questions[start : start + chunk_size]
+        for start in range(0, len(questions), chunk_size)
+    ]
+    # spawn: модели не должны наследоваться форком из родительского процесса
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=len(chunks), mp_context=context) as pool:
+        outputs = list(
+            pool.map(
+                replay_chunk,
+                chunks,
+                [data_dir] * len(chunks),
+                [batch_size] * len(chunks),
+            )
+        )
+
+    return {
+        "results": [result for output in outputs for result in output["results"]],
+        "encode_seconds": sum(output["encode_seconds"] for output in outputs),
+    }
+
+
+def _preview(value: Dict[str, Any]) -> Dict[str, Any]:
+    """Сокращает запись для отчета."""
+    reply = value.get("reply") or ""
+    return {
+        "source": value.get("source"),
+        "confidence": value.get("confidence"),
+        "reply": reply[:REPLY_PREVIEW_LENGTH],
+    }
+
+
+def diff_results(
+    records: List[Dict[str, Any]],
+    results: List[Dict[str, Any]],
+    drift_threshold: float = CONFIDENCE_DRIFT_THRESHOLD,
+) -> Dict[str, Any]:
+    """
+    Сравнивает воспроизведенные ответы с записанными.
+
+    Args:
+        records: Записанные диалоги
+        results: Воспроизведенные результаты в том же порядке
+        drift_threshold: Минимальное изменение уверенности для отчета
+
+    Returns:
+        Dict[str, Any]: Счетчики и списки измененных, впервые эскалированных
+        (раньше был ответ из базы, теперь нет), впервые решенных
+        и изменивших уверенность вопросов
+    """
+    report: Dict[str, List[Dict[str, Any]]] = {
+        "changed": [],
+        "newly_escalated": [],
+        "newly_resolved": [],
+        "confidence_drift": [],
+    }
+    unchanged = 0
+    not_recorded = 0
+
+    for record, result in zip(records, results):
+        if record["reply"] is None and record["source"] is None:
+            not_recorded += 1
+            continue
+
+        item = {
+            "question": record["question"],
+            "recorded": _preview(record),
+            "replayed": _preview(result),
+        }
+        was_answered = record["source"] not in NON_KB_SOURCES
+        is_answered = result["source"] not in NON_KB_SOURCES
+
+        if was_answered and not is_answered:
+            report["newly_escalated"].append(item)
+        elif is_answered and not was_answered:
+            report["newly_resolved"].append(item)
+        elif record["source"] != result["source"] or (
+            record["reply"] is not None and record["reply"] != result["reply"]
+        ):
+            report["changed"].append(item)
+        elif (
+            record["confidence"] is not None
+            and abs(record["confidence"] - result["confidence"]) >= drift_threshold
+        ):
+            report["confidence_drift"].append(item)
+        else:
+            unchanged += 1
+
+    totals = {key: len(items) for key, items in report.items()}
+    totals.update(
+        {"replayed": len(results), "unchanged": unchanged, "not_recorded": not_recorded}
+    )
+    return {"totals": totals, **report}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Основная функция воспроизведения диалогов."""
+    parser = argparse.ArgumentParser(description="Воспроизведение диалогов")
+    parser.add_argument(
+        "--input", nargs="+", default=INPUT_FILES, help="JSONL логи вопросов"
+    )
+    parser.add_argument(
+        "--data-dir",
+        default=None,
+        help="Директория нового индекса (по умолчанию data/)",
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Рабочих процессов")
+    parser.add_argument("--batch-size", type=int, default=ENCODE_BATCH_SIZE)
+    parser.add_argument(
+        "--drift-threshold", type=float, default=CONFIDENCE_DRIFT_THRESHOLD
+    )
+    parser.add_argument("--output", help="Файл для JSON отчета")
+    parser.add_argument(
+        "--fail-on-change",
+        action="store_true",
+        help="Код возврата 1, если ответы изменились",
+    )
+    args = parser.parse_args(argv)
+
+    records = load_records(args.input)
+    if not records:
+        logger.error("Нет вопросов для воспроизведения")
+        return 1
+
+    started = time.perf_counter()
+    replayed = replay(
+        [record["question"] for record in records],
+        data_dir=args.data_dir,
+        workers=args.workers,
+        batch_size=args.batch_size,
+    )
+    wall_time = time.perf_counter() - started
+
+    report = diff_results(records, replayed["results"], args.drift_threshold)
+    report["timings"] = {
+        "wall_time_s": wall_time,
+        "encode_s": replayed["encode_seconds"],
+        "latency": summarize_latencies(
+            [result["latency_ms"] for result in replayed["results"]], wall_time
+        ),
+    }
+    report["config"] = {
+        "input": args.input,
+        "data_dir": args.data_dir or "data",
+        "workers": args.workers,
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+    }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(text, encoding="utf-8")
+    print(json.dumps(report["totals"], ensure_ascii=False, indent=2))
+
+    totals = report["totals"]
+    changed = totals["changed"] + totals["newly_escalated"] + totals["newly_resolved"]
+    return 1 if args.fail_on_change and changed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+"""
+Оценка качества и скорости поиска для нескольких конфигураций движка.
+
+Прогоняет размеченный набор (запрос, ожидаемый ID записи базы знаний) через
+SearchEngine в каждой конфигурации и выводит одну сравнительную таблицу:
+recall@1, recall@3, MRR, точность решения по порогам (high/medium/low)
+и задержки.
+
+Размеченный набор - JSONL с полями query, expected_id (null для вопросов вне
+базы знаний) и необязательным expected_level. Его можно собрать из вариантов
+вопросов базы знаний и 👍 обратной связи:
+
+    python -m benchmarks.retrieval_eval --build-set eval_set.jsonl
+
+Запуск сравнения (конфигурация - ИМЯ:ДИРЕКТОРИЯ[:reranker][:cascade][:БЭКЕНД],
+где БЭКЕНД - бэкенд эмбеддингов из ENCODER_BACKENDS, индекс в директории
+должен быть собран им же):
+
+    python -m benchmarks.retrieval_eval --eval-set eval_set.jsonl \\
+        --config flat:data --config sq8:data_sq8 --config pca:data_pca:reranker \\
+        --config hashing:data_hashing:hashing
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from benchmarks.common import make_typo
+from utils.encoders import ENCODER_BACKENDS
+from utils.greetings import process_greeting_message
+from utils.greetings_config import GREETING_PATTERNS
+from utils.latency import summarize_latencies
+from utils.search import SearchEngine
+from utils.storage_config import FEEDBACK_LOG_FILE
+
+# Настройка логирования
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+# Константы
+KB_FILE = "data/kb.jsonl"
+MRR_TOP_K = 10
+SEED = 42
+
+
+def build_eval_set(
+    kb_file: str = KB_FILE,
+    feedback_file: Optional[str] = FEEDBACK_LOG_FILE,
+    seed: int = SEED,
+) -> List[Dict[str, Any]]:
+    """
+    Собирает размеченный набор из вариантов вопросов и 👍 обратной связи.
+
+    Для каждой записи базы знаний добавляются варианты: без пунктуации
+    в нижнем регистре, с опечаткой и с приветствием. Из обратной связи
+    берутся запросы, ответ на которые пользователь оценил 👍.
+
+    Args:
+        kb_file: Путь к базе знаний (JSONL)
+        feedback_file: Путь к JSONL файлу обратной связи
+        seed: Зерно генератора случайных чисел
+
+    Returns:
+        List[Dict[str, Any]]: Пары (query, expected_id) с пометкой происхождения
+    """
+    rng = random.Random(seed)
+    eval_set = []
+
+    with open(kb_file, "r", encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+
+    for entry in entries:
+        question = entry["question"]
+        plain = question.lower().rstrip("?!. ")
+        words = plain.split()
+        idx = rng.randrange(len(words))
+        words[idx] = make_typo(words[idx], rng)
+        greeting = rng.choice(GREETING_PATTERNS).capitalize()
+
+        for variant, query in (
+            ("plain", plain),
+            ("typo", " ".join(words)),
+            ("greeting", f"{greeting}! {question}"),
+        ):
+            eval_set.append(
+                {"query": query, "expected_id": entry["id"], "origin": variant}
+            )
+
+    if feedback_file and Path(feedback_file).exists():
+        with open(feedback_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get("feedback") == "👍" and record.get("answer_id"):
+                    eval_set.append(
+                        {
+                            "query": record["query"],
+                            "expected_id": record["answer_id"],
+                            "origin": "feedback",
+                        }
+                    )
+
+    return eval_set
+
+
+def load_eval_set(path: str) -> List[Dict[str, Any]]:
+    """Загружает размеченный набор из JSONL файла."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def expected_level(item: Dict[str, Any]) -> str:
+    """Возвращает ожидаемое решение: high для вопросов из базы, иначе low."""
+    if item.get("expected_level"):
+        return item["expected_level"]
+    return "high" if item.get("expected_id") else "low"
+
+
+def decision_level(result: Dict[str, Any]) -> str:
+    """Определяет принятое движком решение по ответу find_best_answer."""
+    if result["source"]:
+        return "high"
+    return "medium" if result["similar_questions"] else "low"
+
+
+async def evaluate_engine(
+    engine: SearchEngine, eval_set: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Оценивает инициализированный движок на размеченном наборе.
+
+    Args:
+        engine: Поисковый движок
+        eval_set: Размеченный набор
+
+    Returns:
+        Dict[str, Any]: recall@1, recall@3, MRR, точность решения
+        и сводка задержек find_best_answer
+    """
+    hits_at_1 = hits_at_3 = decisions = 0
+    reciprocal_ranks = 0.0
+    labelled = 0
+    latencies = []
+
+    started = time.perf_counter()
+    for item in eval_set:
+        # Как и /ask, ищем по тексту без приветствия
+        _, _, main_content = process_greeting_message(item["query"])
+        query = main_content or item["query"]
+
+        query_started = time.perf_counter()
+        result = await engine.find_best_answer(query)
+        latencies.append((time.perf_counter() - query_started) * 1000)
+
+        # Уверенный ответ не той записью считается неверным решением
+        level = decision_level(result)
+        if level == expected_level(item) and (
+            level != "high" or result["source"] == item.get("expected_id")
+        ):
+            decisions += 1
+
+        if not item.get("expected_id"):
+            continue
+
+        labelled += 1
+        ranking = [
+            entry["id"]
+            for entry, _ in await engine.search_similar(query, top_k=MRR_TOP_K)
+        ]
+        if item["expected_id"] in ranking:
+            rank = ranking.index(item["expected_id"]) + 1
+            reciprocal_ranks += 1 / rank
+            hits_at_1 += rank == 1
+            hits_at_3 += rank <= 3
+
+    wall_time = time.perf_counter() - started
+    latency = summarize_latencies(latencies, wall_time)
+    return {
+        "queries": len(eval_set),
+        "recall_at_1": hits_at_1 / labelled if labelled else 0.0,
+        "recall_at_3": hits_at_3 / labelled if labelled else 0.0,
+        "mrr": reciprocal_ranks / labelled if labelled else 0.0,
+        "decision_accuracy": decisions / len(eval_set) if eval_set else 0.0,
+        "p50_ms": latency["p50_ms"],
+        "p95_ms": latency["p95_ms"],
+        "mean_ms": latency["mean_ms"],
+    }
+
+
+def parse_config(spec: str) -> Dict[str, Any]:
+    """
+    Разбирает описание конфигурации ИМЯ:ДИРЕКТОРИЯ[:reranker][:cascade][:БЭКЕНД].
+
+    Args:
+        spec: Описание конфигурации
+
+    Returns:
+        Dict[str, Any]: Имя и аргументы SearchEngine
+    """
+    name, _, rest = spec.partition(":")
+    parts = rest.split(":") if rest else []
+    data_dir = parts[0] if parts else "data"
+    flags = set(parts[1:])
+    backends = flags & set(ENCODER_BACKENDS)
+    unknown = flags - {"reranker", "cascade"} - backends
+    if unknown:
+        raise ValueError(f"Неизвестные флаги конфигурации: {', '.join(unknown)}")
+    if len(backends) > 1:
+        raise ValueError(f"Указано несколько бэкендов: {', '.join(backends)}")
+
+    engine_kwargs = {
+        "data_dir": data_dir,
+        "enable_reranker": "reranker" in flags,
+        "enable_cascade": "cascade" in flags,
+    }
+    if backends:
+        engine_kwargs["encoder_backend"] = backends.pop()
+    return {"name": name, "engine_kwargs": engine_kwargs}
+
+
+async def run_evaluation(
+    configs: List[Dict[str, Any]], eval_set: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Оценивает каждую конфигурацию движка.
+
+    Args:
+        configs: Конфигурации (имя и аргументы SearchEngine)
+        eval_set: Размеченный набор
+
+    Returns:
+        List[Dict[str, Any]]: Метрики по конфигурациям
+    """
+    rows = []
+    for config in configs:
+        engine = SearchEngine(**config["engine_kwargs"])
+        await engine.initialize()
+        metrics = await evaluate_engine(engine, eval_set)
+        rows.append(
+            {
+                "config": config["name"],
+                "encoder": engine.encoder_backend,
+                "quantization": engine.quantization,
+                "dimension": engine.index.d,
+                **metrics,
+            }
+        )
+    return rows
+
+
+def print_table(rows: List[Dict[str, Any]]) -> None:
+    """Выводит сравнительную таблицу."""
+    header = (
+        f"{'конфигурация':<16} {'бэкенд':<21} {'dim':>5} {'R@1':>6} {'R@3':>6} "
+        f"{'MRR':>6} {'решения':>8} {'p50 ms':>8} {'p95 ms':>8}"
+    )
+    print(header)
+    for row in rows:
+        print(
+            f"{row['config']:<16} {row['encoder']:<21} {row['dimension']:>5} "
+            f"{row['recall_at_1']:>6.3f} "
+            f"{row['recall_at_3']:>6.3f} {row['mrr']:>6.3f} "
+            f"{row['decision_accuracy']:>8.3f} {row['p50_ms']:>8.1f} "
+            f"{row['p95_ms']:>8.1f}"
+        )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Основная функция оценки."""
+    parser = argparse.ArgumentParser(description="Оценка качества и скорости поиска")
+    parser.add_argument("--build-set", help="Собрать размеченный набор в файл")
+    parser.add_argument("--kb", default=KB_FILE, help="База знаний для набора")
+    parser.add_argument("--feedback", default=FEEDBACK_LOG_FILE)
+    parser.add_argument("--eval-set", help="Размеченный набор (JSONL)")
+    parser.add_argument(
+        "--config",
+        action="append",
+        default=None,
+        help="Конфигурация ИМЯ:ДИРЕКТОРИЯ[:reranker][:cascade][:БЭКЕНД]",
+    )
+    parser.add_argument("--output", help="Файл для JSON результатов")
+    args = parser.parse_args(argv)
+
+    if args.build_set:
+        eval_set = build_eval_set(args.kb, args.feedback)
+        Path(args.build_set).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.build_set, "w", encoding="utf-8") as f:
+            for item in eval_set:
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+        print(f"Размеченный набор: {len(eval_set)} запросов -> {args.build_set}")
+        if not args.eval_set:
+            return 0
+
+    eval_set = (
+        load_eval_set(args.eval_set)
+        if args.eval_set
+        else build_eval_set(args.kb, args.feedback)
+    )
+    configs = [parse_config(spec) for spec in (args.config or ["default:data"])]
+    rows = asyncio.run(run_evaluation(configs, eval_set))
+    print_table(rows)
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,439 @@
+"""
+Бенчмарк масштабирования индекса на синтетической базе знаний.
+
+Для каждого размера базы и каждой конфигурации индекса собирает
+директорию индекса на синтетических векторах и измеряет:
+
+- время сборки (build_faiss_index, для pca - вместе с проекцией);
+- размер файла индекса и файла векторов для переоценки;
+- время загрузки данных движком (SearchEngine.load_data - то, что
+  initialize делает помимо загрузки моделей) и прирост RSS процесса;
+- задержку search_similar (эмбеддинги запросов вычислены заранее,
+  поэтому замер не включает модель) и recall@1 относительно точного
+  поиска.
+
+Recall@1 на синтетических векторах - оценка сверху: качество поиска
+на реальных вопросах проверяется benchmarks.retrieval_eval.
+
+По результатам для каждого размера выбирается рекомендуемая
+конфигурация: самая быстрая по p95 среди тех, что держат recall@1
+и укладываются в бюджет памяти.
+
+    python -m benchmarks.scaling_bench --sizes 10000,100000 \\
+        --output benchmarks/reports/scaling.json
+
+Размер 1M при размерности 1024 требует ~8 ГБ памяти на векторы
+и точный поиск; для быстрой проверки уменьшите --dim.
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from benchmarks.replay_dialogues import PrecomputedEncoder
+from benchmarks.synthetic_kb import (
+    EMBEDDING_DIM,
+    SEED,
+    load_seed_entries,
+    perturb_vectors,
+    synthesize_entries,
+    synthetic_vectors,
+    write_dataset,
+)
+from utils.latency import summarize_latencies
+from utils.search import SearchEngine
+from utils.search_config import REDUCED_DIM
+
+# Настройка логирования
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+# Конфигурации индекса: имя -> (квантование, снижение размерности)
+INDEX_CONFIGS = {
+    "flat": (None, None),
+    "fp16": ("fp16", None),
+    "sq8": ("sq8", None),
+    "binary": ("binary", None),
+    "pca": (None, "pca"),
+}
+DEFAULT_SIZES = [10_000, 100_000]
+DEFAULT_QUERIES = 200
+MIN_RECALL = 0.95
+TOP_K = 5
+EXACT_CHUNK_SIZE = 100_000
+
+
+def current_rss_bytes() -> int:
+    """
+    Возвращает текущий RSS процесса.
+
+    На Linux читается /proc/self/status; на других системах возвращается
+    пиковый RSS из getrusage (прирост по нему занижается).
+    """
+    try:
+        with open("/proc/self/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS возвращает байты, Linux - килобайты
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def exact_top1(vectors: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    """
+    Находит точного ближайшего соседа каждого запроса.
+
+    Сходства считаются частями по базе, чтобы матрица сходств
+    не занимала память на всю базу сразу.
+
+    Args:
+        vectors: Нормированные векторы базы (n, d)
+        queries: Нормированные запросы (m, d)
+
+    Returns:
+        np.ndarray: Номера ближайших записей (m,)
+    """
+    best_scores = np.full(len(queries), -np.inf, dtype="float32")
+    best_ids = np.zeros(len(queries), dtype="int64")
+    for start in range(0, len(vectors), EXACT_CHUNK_SIZE):
+        scores = vectors[start : start + EXACT_CHUNK_SIZE] @ queries.T
+        chunk_best = scores.argmax(axis=0)
+        chunk_scores = scores[chunk_best, np.arange(len(queries))]
+        better = chunk_scores > best_scores
+        best_scores[better] = chunk_scores[better]
+        best_ids[better] = chunk_best[better] + start
+    return best_ids
+
+
+async def measure_queries(
+    engine: SearchEngine, queries: np.ndarray, expected: np.ndarray
+) -> Dict[str, Any]:
+    """
+    Измеряет задержку search_similar и recall@1 относительно точного поиска.
+
+    Args:
+        engine: Движок с загруженными данными
+        queries: Эмбеддинги запросов полной размерности
+        expected: Номера точных ближайших записей
+
+    Returns:
+        Dict[str, Any]: recall_at_1 и сводка задержек
+    """
+    texts = [f"синтетический запрос {idx}" for idx in range(len(queries))]
+    engine.model = PrecomputedEncoder(
+        None,
+        {engine.normalize_text(text): vector for text, vector in zip(texts, queries)},
+    )
+    engine._is_initialized = True
+
+    hits = 0
+    latencies = []
+    started = time.perf_counter()
+    for text, expected_idx in zip(texts, expected):
+        query_started = time.perf_counter()
+        results = await engine.search_similar(text, TOP_K)
+        latencies.append((time.perf_counter() - query_started) * 1000)
+        if results and results[0][0]["id"] == f"q{expected_idx:03d}":
+            hits += 1
+    wall_time = time.perf_counter() - started
+
+    return {
+        "recall_at_1": hits / len(texts) if texts else 0.0,
+        **summarize_latencies(latencies, wall_time),
+    }
+
+
+def bench_config(
+    name: str,
+    entries: Sequence[Dict[str, Any]],
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    expected: np.ndarray,
+    workdir: Path,
+    reduced_dim: int = REDUCED_DIM,
+) -> Dict[str, Any]:
+    """
+    Собирает, загружает и опрашивает индекс одной конфигурации.
+
+    Args:
+        name: Имя конфигурации из INDEX_CONFIGS
+        entries: Записи базы знаний
+        vectors: Векторы записей
+        queries: Эмбеддинги запросов
+        expected: Номера точных ближайших записей
+        workdir: Директория для файлов индекса
+        reduced_dim: Целевая размерность для pca
+
+    Returns:
+        Dict[str, Any]: Строка отчета
+    """
+    quantization, reduction = INDEX_CONFIGS[name]
+    data_dir = workdir / f"{len(entries)}_{name}"
+    built = write_dataset(
+        str(data_dir), entries, vectors, quantization, reduction, reduced_dim
+    )
+
+    gc.collect()
+    rss_before = current_rss_bytes()
+    started = time.perf_counter()
+    engine = SearchEngine(
+        enable_reranker=False, enable_cascade=False, data_dir=str(data_dir)
+    )
+    engine.load_data()
+    load_seconds = time.perf_counter() - started
+    rss_delta = current_rss_bytes() - rss_before
+
+    measured = asyncio.run(measure_queries(engine, queries, expected))
+    del engine
+    shutil.rmtree(data_dir, ignore_errors=True)
+
+    return {
+        "size": len(entries),
+        "config": name,
+        "quantization": quantization,
+        "reduction": reduction,
+        "dimension": built["dimension"],
+        "build_seconds": built["build_seconds"],
+        "index_bytes": built["index_bytes"],
+        "vectors_bytes": built["vectors_bytes"],
+        "load_seconds": load_seconds,
+        "rss_delta_bytes": rss_delta,
+        **measured,
+    }
+
+
+def recommend(
+    rows: Sequence[Dict[str, Any]],
+    min_recall: float = MIN_RECALL,
+    memory_budget_bytes: Optional[int] = None,
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Выбирает конфигурацию индекса для каждого размера базы.
+
+    Из конфигураций, которые держат recall@1 не ниже min_recall и чей
+    индекс помещается в бюджет памяти, выбирается самая быстрая по p95
+    (при равенстве - меньшая по размеру). Если таких нет, выбирается
+    конфигурация с лучшим recall@1.
+
+    Args:
+        rows: Строки отчета bench_config
+        min_recall: Минимально допустимый recall@1
+        memory_budget_bytes: Бюджет на индекс в памяти (None - без ограничения)
+
+    Returns:
+        Dict[int, Dict[str, Any]]: Размер -> config и reason
+    """
+    by_size: Dict[int, List[Dict[str, Any]]] = {}
+    for row in rows:
+        by_size.setdefault(row["size"], []).append(row)
+
+    recommendations = {}
+    for size, size_rows in sorted(by_size.items()):
+        eligible = [
+            row
+            for row in size_rows
+            if row["recall_at_1"] >= min_recall
+            and (
+                memory_budget_bytes is None or row["index_bytes"] <= memory_budget_bytes
+            )
+        ]
+        if eligible:
+            best = min(eligible, key=lambda row: (row["p95_ms"], row["index_bytes"]))
+            reason = (
+                f"самая низкая p95 ({best['p95_ms']:.2f} мс) при "
+                f"recall@1 >= {min_recall:.2f}"
+            )
+        else:
+            best = max(size_rows, key=lambda row: row["recall_at_1"])
+            reason = (
+                f"ни одна конфигурация не держит recall@1 >= {min_recall:.2f} "
+                f"в бюджете памяти, выбран лучший recall@1"
+            )
+        recommendations[size] = {"config": best["config"], "reason": reason}
+    return recommendations
+
+
+def run_scaling(
+    sizes: Sequence[int],
+    configs: Sequence[str],
+    dim: int = EMBEDDING_DIM,
+    num_queries: int = DEFAULT_QUERIES,
+    seed_kb: Optional[str] = None,
+    workdir: Optional[str] = None,
+    reduced_dim: int = REDUCED_DIM,
+    seed: int = SEED,
+) -> List[Dict[str, Any]]:
+    """
+    Прогоняет все конфигурации на всех размерах базы.
+
+    Args:
+        sizes: Размеры базы знаний
+        configs: Имена конфигураций из INDEX_CONFIGS
+        dim: Размерность векторов
+        num_queries: Количество запросов на конфигурацию
+        seed_kb: База знаний для перефразирования вопросов
+        workdir: Директория для временных индексов (по умолчанию tmp)
+        reduced_dim: Целевая размерность для pca
+        seed: Зерно генераторов случайных чисел
+
+    Returns:
+        List[Dict[str, Any]]: Строки отчета
+    """
+    unknown = [name for name in configs if name not in INDEX_CONFIGS]
+    if unknown:
+        raise ValueError(
+            f"Неизвестные конфигурации: {', '.join(unknown)}. "
+            f"Поддерживаются: {', '.join(INDEX_CONFIGS)}"
+        )
+
+    seed_entries = load_seed_entries(seed_kb) if seed_kb else load_seed_entries()
+    base_dir = Path(workdir or tempfile.mkdtemp(prefix="scaling_bench_"))
+    rows = []
+    try:
+        for size in sizes:
+            entries = synthesize_entries(seed_entries, size, seed)
+            vectors = synthetic_vectors(size, dim, seed)
+            rng = np.random.default_rng(seed)
+            rows_idx = rng.choice(size, size=min(num_queries, size), replace=False)
+            queries = perturb_vectors(vectors[rows_idx], seed=seed)
+            expected = exact_top1(vectors, queries)
+
+            for name in configs:
+                row = bench_config(
+                    name, entries, vectors, queries, expected, base_dir, reduced_dim
+                )
+                rows.append(row)
+                print(
+                    f"  {size:>9} {name:<7} сборка {row['build_seconds']:.2f}с, "
+                    f"p95 {row['p95_ms']:.2f} мс, recall@1 {row['recall_at_1']:.3f}",
+                    file=sys.stderr,
+                )
+
+            del entries, vectors
+            gc.collect()
+    finally:
+        if workdir is None:
+            shutil.rmtree(base_dir, ignore_errors=True)
+    return rows
+
+
+def print_table(
+    rows: Sequence[Dict[str, Any]], recommendations: Dict[int, Dict[str, Any]]
+) -> None:
+    """Выводит сравнительную таблицу и рекомендации."""
+    header = (
+        f"{'size':>9} {'config':<7} {'dim':>5} {'build_s':>8} {'index_MB':>9} "
+        f"{'vectors_MB':>10} {'load_s':>7} {'rss_MB':>7} {'p50_ms':>7} "
+        f"{'p95_ms':>7} {'recall@1':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['size']:>9} {row['config']:<7} {row['dimension']:>5} "
+            f"{row['build_seconds']:>8.2f} {row['index_bytes'] / 2**20:>9.1f} "
+            f"{row['vectors_bytes'] / 2**20:>10.1f} {row['load_seconds']:>7.3f} "
+            f"{row['rss_delta_bytes'] / 2**20:>7.1f} {row['p50_ms']:>7.2f} "
+            f"{row['p95_ms']:>7.2f} {row['recall_at_1']:>8.3f}"
+        )
+
+    print("\nРекомендации:")
+    for size, recommendation in recommendations.items():
+        print(f"  {size:>9}: {recommendation['config']} - {recommendation['reason']}")
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """Разбирает аргументы командной строки."""
+    parser = argparse.ArgumentParser(
+        description="Бенчмарк масштабирования индекса на синтетической базе"
+    )
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(size) for size in DEFAULT_SIZES),
+        help="Размеры базы через запятую (например, 10000,100000,1000000)",
+    )
+    parser.add_argument(
+        "--configs",
+        default=",".join(INDEX_CONFIGS),
+        help=f"Конфигурации через запятую: {', '.join(INDEX_CONFIGS)}",
+    )
+    parser.add_argument("--dim", type=int, default=EMBEDDING_DIM)
+    parser.add_argument("--reduced-dim", type=int, default=REDUCED_DIM)
+    parser.add_argument("--queries", type=int, default=DEFAULT_QUERIES)
+    parser.add_argument("--seed-kb", default=None, help="База знаний для вопросов")
+    parser.add_argument("--workdir", default=None, help="Директория для индексов")
+    parser.add_argument("--min-recall", type=float, default=MIN_RECALL)
+    parser.add_argument(
+        "--memory-budget-mb",
+        type=float,
+        default=None,
+        help="Максимальный размер индекса в памяти",
+    )
+    parser.add_argument("--output", help="Сохранить отчет в JSON")
+    parser.add_argument("--seed", type=int, default=SEED)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Точка входа бенчмарка."""
+    args = parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    configs = [name.strip() for name in args.configs.split(",") if name.strip()]
+
+    try:
+        rows = run_scaling(
+            sizes,
+            configs,
+            args.dim,
+            args.queries,
+            args.seed_kb,
+            args.workdir,
+            args.reduced_dim,
+            args.seed,
+        )
+    except ValueError as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 2
+
+    budget = (
+        int(args.memory_budget_mb * 2**20)
+        if args.memory_budget_mb is not None
+        else None
+    )
+    recommendations = recommend(rows, args.min_recall, budget)
+    print_table(rows, recommendations)
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "rows": rows,
+                    "recommendations": {
+                        str(size): value for size, value in recommendations.items()
+                    },
+                },
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+        print(f"\nОтчет сохранен в {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,434 @@
+"""
+Генератор синтетической базы знаний большого размера.
+
+Реальная база знаний содержит ~150 записей, поэтому поведение индекса
+на 10k-1M записей проверяется на синтетических данных:
+
+- вопросы - перефразировки записей исходной базы (вводные слова,
+  уточнения, опечатки), ответы берутся у исходной записи;
+- векторы - случайные нормированные векторы с низкоранговой структурой,
+  похожей на настоящие эмбеддинги. Они годятся только для проверки
+  индекса (время сборки, размер, задержки): запросы, закодированные
+  реальной моделью, по таким векторам осмысленно не ищутся.
+
+Таблица Excel для полной конвертации реальной моделью:
+
+    python -m benchmarks.synthetic_kb --size 10000 --workbook data_10k.xlsx
+
+Готовая директория индекса (без модели, случайные векторы):
+
+    python -m benchmarks.synthetic_kb --size 100000 --output-dir data_100k \\
+        --quantization sq8
+"""
+
+import argparse
+import json
+import logging
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import FALLBACK_QUESTIONS, make_typo
+from utils.excel_converter import ExcelToVectorDBConverter
+from utils.search_config import (
+    CASCADE_INDEX_FILE,
+    NEIGHBORS_FILE,
+    PROJECTION_FILE,
+    REDUCED_DIM,
+    VECTORS_FILE,
+)
+from utils.text_normalize import normalize_text_forms
+from utils.vector_quantization import write_index
+from utils.vector_reduction import VectorProjection
+
+# Настройка логирования
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+# Константы
+KB_FILE = "data/kb.jsonl"
+INDEX_FILE = "data/faiss.index"
+EMBEDDING_DIM = 1024
+SEED = 42
+
+# Низкоранговая структура синтетических векторов: настоящие эмбеддинги
+# сосредоточены в подпространстве небольшой размерности
+VECTOR_RANK = 64
+VECTOR_NOISE = 0.3
+VECTOR_CHUNK_SIZE = 100_000
+
+# Шум запросов: косинусное сходство с исходной записью ~0.85,
+# как у перефразированных вопросов пользователей
+QUERY_NOISE = 0.6
+
+# PCA обучается на выборке, чтобы SVD не требовала памяти на всю базу
+PCA_SAMPLE_SIZE = 20_000
+
+PARAPHRASE_PREFIXES = [
+    "",
+    "подскажите, ",
+    "скажите пожалуйста, ",
+    "не подскажете, ",
+    "хочу узнать, ",
+    "вопрос: ",
+]
+PARAPHRASE_CONTEXTS = [
+    "",
+    " в приложении",
+    " для водителя",
+    " для пассажира",
+    " в межгороде",
+    " сегодня",
+    " с телефона",
+]
+PARAPHRASE_SUFFIXES = ["", "?", " пожалуйста", " срочно", ", заранее спасибо"]
+
+
+def load_seed_entries(kb_file: str = KB_FILE) -> List[Dict[str, str]]:
+    """
+    Загружает исходные записи для перефразирования.
+
+    Args:
+        kb_file: Путь к базе знаний (JSONL)
+
+    Returns:
+        List[Dict[str, str]]: Записи с полями question и answer; если файла
+        нет, используются встроенные примеры вопросов
+    """
+    path = Path(kb_file)
+    if not path.exists():
+        logger.warning(f"Файл {kb_file} не найден, используем встроенные вопросы")
+        return [
+            {"question": question, "answer": f"Ответ на вопрос: {question}"}
+            for question in FALLBACK_QUESTIONS
+        ]
+
+    with open(path, "r", encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    return [
+        {"question": entry["question"], "answer": entry["answer"]} for entry in entries
+    ]
+
+
+def paraphrase_question(question: str, rng: random.Random) -> str:
+    """
+    Строит вариант вопроса: вводное слово, уточнение и опечатка.
+
+    Args:
+        question: Исходный вопрос
+        rng: Генератор случайных чисел
+
+    Returns:
+        str: Перефразированный вопрос
+    """
+    words = question.rstrip("?!. ").split()
+    if len(words) > 3 and rng.random() < 0.3:
+        # Пропуск слова, как в коротких пользовательских запросах
+        del words[rng.randrange(1, len(words))]
+    if words and rng.random() < 0.3:
+        idx = rng.randrange(len(words))
+        words[idx] = make_typo(words[idx], rng)
+
+    text = " ".join(words)
+    prefix = rng.choice(PARAPHRASE_PREFIXES)
+    if prefix:
+        text = prefix + text[:1].lower() + text[1:]
+    return text + rng.choice(PARAPHRASE_CONTEXTS) + rng.choice(PARAPHRASE_SUFFIXES)
+
+
+def synthesize_entries(
+    seed_entries: Sequence[Dict[str, str]], size: int, seed: int = SEED
+) -> List[Dict[str, str]]:
+    """
+    Синтезирует записи базы знаний заданного размера.
+
+    Исходные записи входят в результат без изменений, остальные -
+    их перефразировки. Вопросы уникальны: конвертер удаляет дубликаты,
+    и без этого база получилась бы меньше заданного размера.
+
+    Args:
+        seed_entries: Исходные записи с полями question и answer
+        size: Количество записей
+        seed: Зерно генератора случайных чисел
+
+    Returns:
+        List[Dict[str, str]]: Записи с полями question, answer и seed_index
+        (номер исходной записи)
+    """
+    if not seed_entries:
+        raise ValueError("Нет исходных записей для синтеза базы знаний")
+
+    rng = random.Random(seed)
+    entries = []
+    seen = set()
+
+    for idx in range(size):
+        seed_index = idx % len(seed_entries)
+        source = seed_entries[seed_index]
+        if idx < len(seed_entries):
+            question = source["question"]
+        else:
+            question = paraphrase_question(source["question"], rng)
+        if question in seen:
+            question = f"{question} (вариант {idx})"
+        seen.add(question)
+        entries.append(
+            {
+                "question": question,
+                "answer": source["answer"],
+                "seed_index": seed_index,
+            }
+        )
+    return entries
+
+
+def write_workbook(entries: Sequence[Dict[str, Any]], file_path: str) -> None:
+    """
+    Сохраняет записи в Excel в формате, который читает конвертер.
+
+    Args:
+        entries: Записи с полями question и answer
+        file_path: Путь к .xlsx файлу
+    """
+    df = pd.DataFrame(
+        {
+            "question": [entry["question"] for entry in entries],
+            "answer": [entry["answer"] for entry in entries],
+        }
+    )
+    df.to_excel(file_path, index=False)
+    logger.info(f"Таблица из {len(df)} записей сохранена в {file_path}")
+
+
+def write_knowledge_base(entries: Sequence[Dict[str, Any]], file_path: str) -> None:
+    """
+    Сохраняет записи в JSONL формате базы знаний (как save_knowledge_base).
+
+    Args:
+        entries: Записи с полями question и answer
+        file_path: Путь к выходному файлу
+    """
+    with open(file_path, "w", encoding="utf-8") as f:
+        for idx, entry in enumerate(entries):
+            kb_entry = {
+                "id": f"q{idx:03d}",
+                "question": entry["question"],
+                "answer": entry["answer"],
+                "normalized_question": normalize_text_forms(entry["question"]).search,
+            }
+            f.write(json.dumps(kb_entry, ensure_ascii=False) + "\n")
+
+
+def synthetic_vectors(
+    size: int,
+    dim: int = EMBEDDING_DIM,
+    seed: int = SEED,
+    rank: int = VECTOR_RANK,
+    noise: float = VECTOR_NOISE,
+) -> np.ndarray:
+    """
+    Генерирует нормированные векторы с низкоранговой структурой.
+
+    Вектор - случайная комбинация rank базисных направлений плюс
+    изотропный шум. Векторы генерируются частями, чтобы временные
+    массивы не удваивали память на больших размерах.
+
+    Args:
+        size: Количество векторов
+        dim: Размерность
+        seed: Зерно генератора случайных чисел
+        rank: Размерность подпространства, в котором лежит сигнал
+        noise: Доля изотропного шума
+
+    Returns:
+        np.ndarray: Векторы float32 (size, dim) единичной длины
+    """
+    rng = np.random.default_rng(seed)
+    basis = rng.standard_normal((rank, dim), dtype="float32") / np.sqrt(rank)
+    vectors = np.empty((size, dim), dtype="float32")
+
+    for start in range(0, size, VECTOR_CHUNK_SIZE):
+        stop = min(start + VECTOR_CHUNK_SIZE, size)
+        chunk = rng.standard_normal((stop - start, rank), dtype="float32") @ basis
+        chunk += (noise / np.sqrt(dim)) * rng.standard_normal(
+            chunk.shape, dtype="float32"
+        )
+        chunk /= np.linalg.norm(chunk, axis=1, keepdims=True)
+        vectors[start:stop] = chunk
+
+    return vectors
+
+
+def perturb_vectors(
+    vectors: np.ndarray, noise: float = QUERY_NOISE, seed: int = SEED
+) -> np.ndarray:
+    """
+    Зашумляет векторы, имитируя эмбеддинги перефразированных запросов.
+
+    Args:
+        vectors: Нормированные векторы (n, d)
+        noise: Норма добавляемого шума
+        seed: Зерно генератора случайных чисел
+
+    Returns:
+        np.ndarray: Нормированные зашумленные векторы float32
+    """
+    rng = np.random.default_rng(seed)
+    perturbed = vectors + (noise / np.sqrt(vectors.shape[1])) * rng.standard_normal(
+        vectors.shape, dtype="float32"
+    )
+    perturbed /= np.linalg.norm(perturbed, axis=1, keepdims=True)
+    return perturbed.astype("float32")
+
+
+def write_dataset(
+    output_dir: str,
+    entries: Sequence[Dict[str, Any]],
+    vectors: np.ndarray,
+    quantization: Optional[str] = None,
+    reduction: Optional[str] = None,
+    reduced_dim: int = REDUCED_DIM,
+) -> Dict[str, Any]:
+    """
+    Собирает директорию индекса, которую загружает SearchEngine(data_dir=...).
+
+    Индекс строится тем же кодом, что и в конвертере. Граф соседей не
+    строится: на больших размерах он считается за O(n^2), а движок
+    работает и без него. Файлы прошлых сборок, которые не относятся к этой
+    конфигурации, удаляются, чтобы движок их не подхватил.
+
+    Args:
+        output_dir: Директория для файлов индекса
+        entries: Записи базы знаний
+        vectors: Нормированные векторы записей (float32)
+        quantization: Тип сжатия векторов ("fp16", "sq8", "binary" или None)
+        reduction: Метод снижения размерности ("pca", "truncate" или None)
+        reduced_dim: Целевая размерность при снижении
+
+    Returns:
+        Dict[str, Any]: Время сборки и размеры файлов
+    """
+    if len(entries) != len(vectors):
+        raise ValueError(
+            f"Количество записей ({len(entries)}) не совпадает "
+            f"с количеством векторов ({len(vectors)})"
+        )
+
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    converter = ExcelToVectorDBConverter(quantization=quantization)
+
+    # Устаревшие файлы: проекция и векторы другой конфигурации, граф соседей
+    # и индекс каскада по другим записям
+    stale_files = [NEIGHBORS_FILE, CASCADE_INDEX_FILE]
+    if not reduction:
+        stale_files.append(PROJECTION_FILE)
+    if not quantization:
+        stale_files.append(VECTORS_FILE)
+    for stale_file in stale_files:
+        (output_path / Path(stale_file).name).unlink(missing_ok=True)
+
+    started = time.perf_counter()
+    embeddings = vectors
+    if reduction:
+        sample = vectors[:PCA_SAMPLE_SIZE]
+        projection = VectorProjection.fit(sample, reduction, reduced_dim)
+        embeddings = projection.apply(vectors)
+        projection.save(str(output_path / Path(PROJECTION_FILE).name))
+    # build_faiss_index нормализует векторы на месте
+    index = converter.build_faiss_index(embeddings.copy(), quantization)
+    build_seconds = time.perf_counter() - started
+
+    index_file = output_path / Path(INDEX_FILE).name
+    write_index(index, str(index_file))
+
+    vectors_bytes = 0
+    if quantization:
+        vectors_file = output_path / Path(VECTORS_FILE).name
+        np.save(vectors_file, np.ascontiguousarray(embeddings, dtype="float32"))
+        vectors_bytes = vectors_file.stat().st_size
+
+    write_knowledge_base(entries, str(output_path / Path(KB_FILE).name))
+    converter.save_index_meta(
+        output_path,
+        {
+            "built_at": datetime.now().isoformat(),
+            "model": "synthetic",
+            "vectors": int(index.ntotal),
+            "dimension": int(embeddings.shape[1]),
+            "reduction": reduction,
+            "quantization": quantization,
+        },
+    )
+    logger.info(f"Синтетический индекс из {index.ntotal} векторов в {output_dir}")
+
+    return {
+        "build_seconds": build_seconds,
+        "index_bytes": index_file.stat().st_size,
+        "vectors_bytes": vectors_bytes,
+        "dimension": int(embeddings.shape[1]),
+    }
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """Разбирает аргументы командной строки."""
+    parser = argparse.ArgumentParser(
+        description="Генератор синтетической базы знаний большого размера"
+    )
+    parser.add_argument("--size", type=int, required=True, help="Количество записей")
+    parser.add_argument(
+        "--seed-kb", default=KB_FILE, help="База знаний для перефразирования"
+    )
+    parser.add_argument("--workbook", help="Сохранить вопросы и ответы в Excel")
+    parser.add_argument(
+        "--output-dir",
+        help="Собрать директорию индекса на случайных векторах",
+    )
+    parser.add_argument("--dim", type=int, default=EMBEDDING_DIM)
+    parser.add_argument(
+        "--quantization", choices=["fp16", "sq8", "binary"], default=None
+    )
+    parser.add_argument("--reduction", choices=["pca", "truncate"], default=None)
+    parser.add_argument("--reduced-dim", type=int, default=REDUCED_DIM)
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args(argv)
+    if not args.workbook and not args.output_dir:
+        parser.error("нужно указать --workbook и/или --output-dir")
+    return args
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Точка входа генератора."""
+    args = parse_args(argv)
+    entries = synthesize_entries(load_seed_entries(args.seed_kb), args.size, args.seed)
+
+    if args.workbook:
+        write_workbook(entries, args.workbook)
+        print(f"Таблица: {args.workbook} ({len(entries)} записей)")
+
+    if args.output_dir:
+        vectors = synthetic_vectors(args.size, args.dim, args.seed)
+        info = write_dataset(
+            args.output_dir,
+            entries,
+            vectors,
+            args.quantization,
+            args.reduction,
+            args.reduced_dim,
+        )
+        print(
+            f"Индекс: {args.output_dir} ({len(entries)} записей, "
+            f"сборка {info['build_seconds']:.2f}с, "
+            f"{info['index_bytes'] / 2**20:.1f} МБ)"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -35,6 +35,8 @@ async def main() -> None:
             logger.info(f"📊 Обработано записей: {result['records_processed']}")
             logger.info(f"📁 Индекс сохранен: {result['index_file']}")
             logger.info(f"📁 База знаний: {result['knowledge_base_file']}")
+            if "cascade_index_file" in result:
+                logger.info(f"⚡ Индекс быстрой модели: {result['cascade_index_file']}")
         else:
             logger.error(f"❌ Ошибка построения индекса: {result['error']}")
 
@@ -39,6 +39,8 @@ async def main() -> None:
             logger.info(f"📁 База знаний: {result['knowledge_base_file']}")
             logger.info(f"🤖 Модель: {result['model_used']}")
             logger.info(f"📐 Размерность эмбеддингов: {result['embedding_dimension']}")
+            if "cascade_index_file" in result:
+                logger.info(f"⚡ Индекс быстрой модели: {result['cascade_index_file']}")
         else:
             logger.error(f"❌ Ошибка конвертации: {result['error']}")
             sys.exit(1)
@@ -6,13 +6,18 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from routers.admin import router as admin_router
 from routers.ask import router as ask_router
+from routers.metrics import router as metrics_router
+from utils.analytics import analytics_store
+from utils.feedback_writer import feedback_writer
+from utils.monitoring_config import ENABLE_METRICS, REQUEST_ID_HEADER
 from utils.search import search_engine
+from utils.tracing import LOG_FORMAT, RequestIdMiddleware, install_log_record_factory
 
-# Настройка логирования
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+# Настройка логирования (с идентификатором запроса в каждой записи)
+install_log_record_factory()
+logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
 logger = logging.getLogger(__name__)
 
 
@@ -29,10 +34,16 @@ async def lifespan(app: FastAPI):
         # Приложение может работать без поискового движка,
         # но с ограниченной функциональностью
 
+    # Фоновая запись обратной связи и аналитики
+    await feedback_writer.start()
+    await analytics_store.start()
+
     yield
 
     # Очистка при завершении
     logger.info("Приложение завершает работу")
+    await feedback_writer.stop()
+    await analytics_store.stop()
 
 
 # Создаем экземпляр FastAPI
@@ -52,10 +63,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", REQUEST_ID_HEADER],
 )
 
+# Идентификатор запроса для логов и заголовка X-Request-ID
+app.add_middleware(RequestIdMiddleware)
+
 # Подключаем роутеры
 app.include_router(ask_router)
+app.include_router(admin_router)
+if ENABLE_METRICS:
+    app.include_router(metrics_router)
 
 
 @app.get("/")
@@ -0,0 +1,135 @@
+"""Роутер для служебных эндпоинтов администрирования."""
+
+import asyncio
+import logging
+import secrets
+import time
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+
+from utils.analytics import analytics_store
+from utils.fuzzy_greetings import clear_fuzzy_cache, get_fuzzy_cache_stats
+from utils.monitoring_config import ADMIN_API_TOKEN, ADMIN_TOKEN_HEADER
+from utils.search import search_engine
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+
+async def require_admin_token(
+    token: Optional[str] = Header(None, alias=ADMIN_TOKEN_HEADER)
+) -> None:
+    """
+    Проверяет токен администратора в заголовке запроса.
+
+    Args:
+        token: Значение заголовка ADMIN_TOKEN_HEADER
+
+    Raises:
+        HTTPException: 404, если токен не настроен; 401 при неверном токене
+    """
+    if not ADMIN_API_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if token is None or not secrets.compare_digest(
+        token.encode(), ADMIN_API_TOKEN.encode()
+    ):
+        logger.warning("Отклонен запрос к admin API с неверным токеном")
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+
+# Создаем роутер
+router = APIRouter(
+    prefix="/api/v1/admin",
+    tags=["Administration"],
+    dependencies=[Depends(require_admin_token)],
+)
+
+
+@router.get("/cache", response_model=Dict[str, Any])
+async def cache_stats() -> Dict[str, Any]:
+    """
+    Возвращает статистику кэшей ассистента.
+
+    Returns:
+        Размер, попадания, промахи и вытеснения каждого кэша
+    """
+    return {
+        "fuzzy_greetings": get_fuzzy_cache_stats(),
+        "reranker": (
+            search_engine.reranker.get_stats() if search_engine.reranker else None
+        ),
+    }
+
+
+@router.post("/cache/clear", response_model=Dict[str, Any])
+async def clear_cache() -> Dict[str, Any]:
+    """
+    Очищает кэш fuzzy matching приветствий.
+
+    Returns:
+        Статус операции
+    """
+    clear_fuzzy_cache()
+    logger.info("Кэш fuzzy matching очищен через admin API")
+    return {"status": "success"}
+
+
+def _since(hours: Optional[float]) -> Optional[float]:
+    """Переводит период в часах в момент начала (unix time)."""
+    return time.time() - hours * 3600 if hours is not None else None
+
+
+@router.get("/analytics/unanswered", response_model=List[Dict[str, Any]])
+async def unanswered_questions(
+    limit: int = Query(10, ge=1, le=1000),
+    since_hours: Optional[float] = Query(None, gt=0),
+) -> List[Dict[str, Any]]:
+    """
+    Возвращает самые частые вопросы без ответа.
+
+    Args:
+        limit: Максимальное количество вопросов
+        since_hours: Период в часах (по умолчанию - за все время)
+
+    Returns:
+        Вопросы с количеством обращений
+    """
+    return await asyncio.to_thread(
+        analytics_store.top_unanswered, limit, _since(since_hours)
+    )
+
+
+@router.get("/analytics/feedback", response_model=List[Dict[str, Any]])
+async def feedback_ratios(
+    limit: int = Query(20, ge=1, le=1000), min_votes: int = Query(1, ge=1)
+) -> List[Dict[str, Any]]:
+    """
+    Возвращает соотношение 👍/👎 по ответам.
+
+    Args:
+        limit: Максимальное количество ответов
+        min_votes: Минимальное количество оценок ответа
+
+    Returns:
+        Оценки по ответам
+    """
+    return await asyncio.to_thread(analytics_store.feedback_ratios, limit, min_votes)
+
+
+@router.get("/analytics/confidence", response_model=Dict[str, int])
+async def confidence_histogram(
+    since_hours: Optional[float] = Query(None, gt=0)
+) -> Dict[str, int]:
+    """
+    Возвращает гистограмму уверенности поиска.
+
+    Args:
+        since_hours: Период в часах (по умолчанию - за все время)
+
+    Returns:
+        Количество вопросов по корзинам уверенности
+    """
+    return await asyncio.to_thread(
+        analytics_store.confidence_histogram, _since(since_hours)
+    )
@@ -1,19 +1,27 @@
 """Роутер для обработки вопросов и обратной связи."""
 
 import logging
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, Response, status
 
-from schemas.ask import AskRequest, AskResponse, FeedbackRequest, FeedbackResponse
-from utils.greetings import (
-    get_fallback_greeting,
-    process_greeting_message,
-    should_use_fallback_greeting,
+from schemas.ask import (
+    AskRequest,
+    AskResponse,
+    FeedbackRequest,
+    FeedbackResponse,
+    RelatedQuestionsResponse,
 )
+from utils.analytics import OUTCOME_ANSWER, analytics_store
+from utils.ask_pipeline import answer_question
+from utils.feedback_writer import feedback_writer
+from utils.metrics import ask_in_flight, ask_requests, record_stage, stage_timer
+from utils.monitoring_config import ENABLE_DEBUG_TRACE, ENABLE_SERVER_TIMING
 from utils.search import search_engine
+from utils.tracing import request_trace
 
 # Настройка логирования
 logger = logging.getLogger(__name__)
@@ -21,16 +29,10 @@ logger = logging.getLogger(__name__)
 # Создаем роутер
 router = APIRouter(prefix="/api/v1", tags=["FAQ Assistant"])
 
-# Файл для логирования обратной связи
-FEEDBACK_LOG_FILE = "data/feedback.log"
-
 
 async def log_feedback(feedback_data: Dict[str, Any]) -> None:
-    """Логирует обратную связь в файл."""
+    """Ставит обратную связь в очередь фоновой записи в JSONL файл."""
     try:
-        # Создаем директорию data если не существует
-        Path("data").mkdir(exist_ok=True)
-
         # Формируем запись лога
         log_entry = {
             "timestamp": datetime.now().isoformat(),
@@ -39,23 +41,33 @@ async def log_feedback(feedback_data: Dict[str, Any]) -> None:
             "feedback": feedback_data["feedback"],
         }
 
-        # Записываем в файл
-        with open(FEEDBACK_LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(f"{log_entry}\n")
+        # Запись на диск выполняет фоновая задача
+        await feedback_writer.submit(log_entry)
 
-        logger.info(f"Обратная связь записана: {feedback_data['feedback']}")
+        logger.info(f"Обратная связь принята: {feedback_data['feedback']}")
 
     except Exception as e:
         logger.error(f"Ошибка записи обратной связи: {e}")
 
 
-@router.post("/ask", response_model=AskResponse)
-async def ask_question(request: AskRequest) -> AskResponse:
+@router.post("/ask", response_model=AskResponse, response_model_exclude_unset=True)
+async def ask_question(
+    request: AskRequest,
+    response: Response,
+    debug: bool = Query(
+        False, description="Вернуть трассировку обработки (если разрешено)"
+    ),
+) -> AskResponse:
     """
     Обрабатывает вопрос пользователя и возвращает ответ.
 
+    Длительность этапов возвращается в заголовке Server-Timing, а в режиме
+    отладки - еще и в поле trace вместе с кэшами и кандидатами FAISS.
+
     Args:
         request: Запрос с вопросом пользователя
+        response: Ответ для установки заголовков
+        debug: Запрошена отладочная трассировка
 
     Returns:
         Ответ ассистента с уровнем уверенности
@@ -63,64 +75,73 @@ async def ask_question(request: AskRequest) -> AskResponse:
     Raises:
         HTTPException: При ошибках обработки
     """
+    started = time.perf_counter()
+    ask_in_flight.inc()
     try:
-        # Обрабатываем приветствие
-        is_greeting_flag, greeting_response, main_content = process_greeting_message(
-            request.query
-        )
-
-        # Если это только приветствие - возвращаем стандартный ответ
-        if is_greeting_flag and greeting_response:
-            logger.info(f"Обработано приветствие: {request.query[:50]}...")
-            return AskResponse(
-                reply=greeting_response,
-                confidence=1.0,
-                source="greeting",
-                similar_questions=[],
+        with request_trace(debug=debug and ENABLE_DEBUG_TRACE) as trace:
+            result = await answer_question(request.query)
+
+            await analytics_store.record_question(
+                request.query,
+                result.outcome,
+                result.search_confidence,
+                result.source if result.outcome == OUTCOME_ANSWER else None,
             )
 
-        # Определяем текст для поиска в FAQ
-        search_query = main_content if main_content else request.query
-
-        # Проверяем, что поисковый движок инициализирован
-        if not search_engine._is_initialized:
-            await search_engine.initialize()
+            with stage_timer("response"):
+                answer = AskResponse(**result.to_response())
+            ask_requests.inc(result.source_outcome)
 
-        # Ищем лучший ответ
-        result = await search_engine.find_best_answer(search_query)
-
-        # Проверяем, нужно ли использовать fallback приветствие
-        if should_use_fallback_greeting(result["confidence"]):
-            logger.info(
-                f"Низкая уверенность ({result['confidence']:.3f}), "
-                f"используем fallback приветствие для: {request.query[:50]}..."
-            )
-            return AskResponse(
-                reply=get_fallback_greeting(),
-                confidence=1.0,
-                source="fallback_greeting",
-                similar_questions=[],
-            )
-
-        # Логируем запрос
-        logger.info(
-            f"Обработан вопрос: {request.query[:50]}... "
-            f"(confidence: {result['confidence']:.3f})"
-        )
-
-        return AskResponse(
-            reply=result["reply"],
-            confidence=result["confidence"],
-            source=result["source"],
-            similar_questions=result["similar_questions"],
-        )
+            if ENABLE_SERVER_TIMING:
+                response.headers["Server-Timing"] = trace.server_timing()
+            if trace.debug:
+                trace.events["outcome"] = result.outcome
+                answer.trace = trace.to_payload()
+            return answer
 
     except Exception as e:
+        ask_requests.inc("error")
         logger.error(f"Ошибка обработки вопроса: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Внутренняя ошибка сервера при обработке вопроса",
         )
+    finally:
+        ask_in_flight.dec()
+        record_stage("total", time.perf_counter() - started)
+
+
+@router.get("/related/{source_id}", response_model=RelatedQuestionsResponse)
+async def related_questions(
+    source_id: str, limit: int = Query(3, ge=1, le=20)
+) -> RelatedQuestionsResponse:
+    """
+    Возвращает похожие вопросы для записи базы знаний.
+
+    Использует заранее построенный граф соседей, без вызова модели.
+
+    Args:
+        source_id: ID записи базы знаний (поле source ответа /ask)
+        limit: Максимальное количество вопросов
+
+    Returns:
+        Список похожих вопросов
+
+    Raises:
+        HTTPException: Если запись не найдена
+    """
+    # Проверяем, что поисковый движок инициализирован
+    if not search_engine._is_initialized:
+        await search_engine.initialize()
+
+    related = search_engine.get_related_questions(source_id, limit)
+    if related is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Запись {source_id} не найдена в базе знаний",
+        )
+
+    return RelatedQuestionsResponse(source=source_id, related=related)
 
 
 @router.post("/feedback", response_model=FeedbackResponse)
@@ -146,6 +167,9 @@ async def submit_feedback(request: FeedbackRequest) -> FeedbackResponse:
         }
 
         await log_feedback(feedback_data)
+        await analytics_store.record_feedback(
+            request.query, request.answer_id, request.feedback
+        )
 
         # Логируем в систему
         logger.info(
@@ -192,6 +216,7 @@ async def health_check() -> Dict[str, Any]:
             "search_engine_ready": search_engine_ready,
             "index_file_exists": index_exists,
             "knowledge_base_exists": kb_exists,
+            "cascade": search_engine.get_cascade_stats(),
             "timestamp": datetime.now().isoformat(),
         }
 
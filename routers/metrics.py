@@ -0,0 +1,137 @@
+"""Роутер эндпоинта /metrics в формате Prometheus."""
+
+import logging
+from typing import Dict
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from utils.analytics import analytics_store
+from utils.feedback_writer import feedback_writer
+from utils.fuzzy_greetings import get_fuzzy_cache_stats
+from utils.metrics import Labels, metrics_registry
+from utils.search import search_engine
+from utils.text_normalize import get_normalize_cache_stats
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Создаем роутер
+router = APIRouter(tags=["Monitoring"])
+
+# Версия текстового формата Prometheus
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _hit_ratio(stats: Dict[str, int]) -> float:
+    """Доля попаданий в кэш по статистике hits/misses."""
+    lookups = stats["hits"] + stats["misses"]
+    return stats["hits"] / lookups if lookups else 0.0
+
+
+def _cache_stats() -> Dict[str, Dict[str, int]]:
+    """Статистика кэшей по названию кэша."""
+    caches = {
+        "normalize": get_normalize_cache_stats(),
+        "fuzzy_greetings": get_fuzzy_cache_stats(),
+    }
+    if search_engine.reranker is not None:
+        caches["reranker"] = search_engine.reranker.get_stats()["cache"]
+    return caches
+
+
+def _collect_cache_hit_ratio() -> Dict[Labels, float]:
+    return {(name,): _hit_ratio(stats) for name, stats in _cache_stats().items()}
+
+
+def _collect_cache_entries() -> Dict[Labels, float]:
+    return {(name,): stats["cache_size"] for name, stats in _cache_stats().items()}
+
+
+def _collect_writer_queue_depth() -> Dict[Labels, float]:
+    return {
+        ("feedback",): feedback_writer.get_stats()["pending"],
+        ("analytics",): analytics_store.get_stats()["pending"],
+    }
+
+
+def _collect_index_vectors() -> Dict[Labels, float]:
+    index = search_engine.index
+    return {(): index.ntotal if index is not None else 0}
+
+
+def _collect_index_info() -> Dict[Labels, float]:
+    meta = search_engine.index_meta
+    if search_engine.index is None:
+        return {}
+    return {
+        (
+            str(meta.get("built_at", "")),
+            str(meta.get("model", "")),
+            str(meta.get("quantization") or "none"),
+            str(meta.get("reduction") or "none"),
+            str(search_engine.index.d),
+        ): 1
+    }
+
+
+def _collect_cascade(field: str) -> Dict[Labels, float]:
+    return {(): search_engine.get_cascade_stats()[field]}
+
+
+metrics_registry.gauge(
+    "faq_search_engine_ready",
+    "Поисковый движок инициализирован (1) или нет (0)",
+    collector=lambda: {(): 1 if search_engine._is_initialized else 0},
+)
+metrics_registry.gauge(
+    "faq_cache_hit_ratio",
+    "Доля попаданий в кэш",
+    ("cache",),
+    collector=_collect_cache_hit_ratio,
+)
+metrics_registry.gauge(
+    "faq_cache_entries",
+    "Количество записей в кэше",
+    ("cache",),
+    collector=_collect_cache_entries,
+)
+metrics_registry.gauge(
+    "faq_writer_queue_depth",
+    "Записи в очереди фоновой записи",
+    ("writer",),
+    collector=_collect_writer_queue_depth,
+)
+metrics_registry.gauge(
+    "faq_index_vectors",
+    "Количество векторов в индексе",
+    collector=_collect_index_vectors,
+)
+metrics_registry.gauge(
+    "faq_index_info",
+    "Версия загруженного индекса (время сборки, модель, сжатие)",
+    ("built_at", "model", "quantization", "reduction", "dimension"),
+    collector=_collect_index_info,
+)
+metrics_registry.gauge(
+    "faq_cascade_queries",
+    "Запросы, обработанные быстрой моделью каскада",
+    collector=lambda: _collect_cascade("queries"),
+)
+metrics_registry.gauge(
+    "faq_cascade_escalations",
+    "Запросы, эскалированные от быстрой модели к основной",
+    collector=lambda: _collect_cascade("escalations"),
+)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """
+    Возвращает метрики сервиса в текстовом формате Prometheus.
+
+    Returns:
+        Счетчики запросов, гистограммы этапов, состояние кэшей, очередей
+        и индекса
+    """
+    return PlainTextResponse(metrics_registry.render(), media_type=CONTENT_TYPE)
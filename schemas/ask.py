@@ -1,6 +1,6 @@
 """Схемы для API вопросов и ответов."""
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -24,6 +24,26 @@ class AskResponse(BaseModel):
     similar_questions: List[str] = Field(
         default_factory=list, description="Похожие вопросы"
     )
+    trace: Optional[Dict[str, Any]] = Field(
+        None, description="Трассировка обработки (только в режиме отладки)"
+    )
+
+
+class RelatedQuestion(BaseModel):
+    """Схема похожего вопроса из базы знаний."""
+
+    id: str = Field(..., description="ID записи базы знаний")
+    question: str = Field(..., description="Текст вопроса")
+    score: float = Field(..., description="Сходство с исходной записью")
+
+
+class RelatedQuestionsResponse(BaseModel):
+    """Схема ответа со списком похожих вопросов."""
+
+    source: str = Field(..., description="ID исходной записи")
+    related: List[RelatedQuestion] = Field(
+        default_factory=list, description="Похожие вопросы"
+    )
 
 
 class FeedbackRequest(BaseModel):
@@ -33,7 +53,9 @@ class FeedbackRequest(BaseModel):
         ..., min_length=1, max_length=1000, description="Исходный вопрос"
     )
     answer_id: Optional[str] = Field(None, description="ID ответа")
-    feedback: str = Field(..., pattern="^(👍|👎)$", description="Оценка ответа (👍 или 👎)")
+    feedback: str = Field(
+        ..., pattern="^(👍|👎)$", description="Оценка ответа (👍 или 👎)"
+    )
 
 
 class FeedbackResponse(BaseModel):
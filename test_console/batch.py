@@ -0,0 +1,189 @@
+"""Модуль пакетной отправки вопросов ассистенту."""
+
+import asyncio
+import csv
+import json
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from utils.latency import summarize_latencies
+
+# Колонки/ключи с вопросом во входных CSV и JSONL файлах
+QUESTION_FIELDS = ("question", "query", "вопрос", "Запросы пассажиров")
+
+# Источники ответов, которые не являются записями базы знаний
+NON_KB_SOURCES = ("greeting", "fallback_greeting")
+
+AskFunction = Callable[[str], Awaitable[Dict[str, Any]]]
+
+
+def _question_from_record(record: Dict[str, Any]) -> Optional[str]:
+    """Извлекает текст вопроса из записи CSV или JSONL."""
+    for field in QUESTION_FIELDS:
+        value = record.get(field)
+        if value:
+            return str(value)
+    return None
+
+
+def load_questions(path: Path) -> List[str]:
+    """
+    Загружает вопросы из текстового, CSV или JSONL файла.
+
+    Текстовый файл - один вопрос на строку. В CSV вопрос берется из колонки
+    question/query/вопрос (иначе из первой колонки), в JSONL - из одноименного
+    ключа или из строки целиком.
+
+    Args:
+        path: Путь к файлу с вопросами
+
+    Returns:
+        List[str]: Непустые вопросы в исходном порядке
+    """
+    suffix = path.suffix.lower()
+    questions: List[Optional[str]] = []
+
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if suffix == ".csv":
+            reader = csv.DictReader(f)
+            fieldnames = reader.fieldnames or []
+            column = next(
+                (field for field in QUESTION_FIELDS if field in fieldnames),
+                fieldnames[0] if fieldnames else None,
+            )
+            questions = [row.get(column) for row in reader]
+        elif suffix in (".jsonl", ".json"):
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                questions.append(
+                    record if isinstance(record, str) else _question_from_record(record)
+                )
+        else:
+            questions = [line for line in f]
+
+    return [question.strip() for question in questions if question and question.strip()]
+
+
+def parse_batch_args(args: str) -> Tuple[str, Optional[int]]:
+    """
+    Разбирает аргументы команды batch.
+
+    Путь может содержать пробелы и быть заключен в кавычки; число в конце
+    строки - необязательное количество одновременных запросов.
+
+    Args:
+        args: Строка после названия команды
+
+    Returns:
+        Tuple[str, Optional[int]]: Путь к файлу и число одновременных запросов
+    """
+    path, concurrency = args.strip(), None
+    parts = path.rsplit(maxsplit=1)
+    if len(parts) == 2 and parts[1].isdigit():
+        path, concurrency = parts[0], int(parts[1])
+    if len(path) > 1 and path[0] == path[-1] and path[0] in "\"'":
+        path = path[1:-1]
+    return path, concurrency
+
+
+async def run_batch(
+    ask: AskFunction,
+    questions: List[str],
+    concurrency: int,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Tuple[List[Dict[str, Any]], float]:
+    """
+    Отправляет вопросы с ограничением числа одновременных запросов.
+
+    Args:
+        ask: Асинхронная функция, возвращающая ответ ассистента на вопрос
+        questions: Вопросы
+        concurrency: Максимальное число одновременных запросов
+        on_result: Вызывается после каждого ответа (например, для прогресс-бара)
+
+    Returns:
+        Tuple[List[Dict[str, Any]], float]: Результаты в порядке вопросов
+        и общее время выполнения в секундах
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    results: List[Dict[str, Any]] = [{} for _ in questions]
+
+    async def worker(idx: int, question: str) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await ask(question)
+                result = {
+                    "question": question,
+                    "reply": response["reply"],
+                    "confidence": response["confidence"],
+                    "source": response.get("source"),
+                    "similar_questions": response.get("similar_questions", []),
+                    "error": None,
+                }
+            except Exception as e:
+                result = {"question": question, "error": str(e) or type(e).__name__}
+            result["latency_ms"] = (time.perf_counter() - start) * 1000
+
+        results[idx] = result
+        if on_result is not None:
+            on_result(result)
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(worker(idx, question) for idx, question in enumerate(questions))
+    )
+    return results, time.perf_counter() - start
+
+
+def write_results(path: Path, results: List[Dict[str, Any]]) -> None:
+    """
+    Сохраняет результаты в JSONL или CSV (по расширению файла).
+
+    Args:
+        path: Путь к файлу результатов
+        results: Результаты пакетной отправки
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix.lower() == ".csv":
+        fields = ["question", "reply", "confidence", "source", "latency_ms", "error"]
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(results)
+        return
+
+    with open(path, "w", encoding="utf-8") as f:
+        for result in results:
+            f.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+
+def summarize_batch(
+    results: List[Dict[str, Any]], wall_time_s: float
+) -> Dict[str, Any]:
+    """
+    Считает сводку пакетного прогона.
+
+    Args:
+        results: Результаты пакетной отправки
+        wall_time_s: Общее время выполнения в секундах
+
+    Returns:
+        Dict[str, Any]: Перцентили задержек успешных запросов,
+        пропускная способность, количество ошибок и ответов из базы знаний
+        (приветствия и fallback приветствие ответами не считаются)
+    """
+    succeeded = [result for result in results if not result.get("error")]
+    summary = summarize_latencies(
+        [result["latency_ms"] for result in succeeded], wall_time_s
+    )
+    summary["errors"] = len(results) - len(succeeded)
+    summary["answered"] = sum(
+        1
+        for result in succeeded
+        if result.get("source") and result["source"] not in NON_KB_SOURCES
+    )
+    return summary
@@ -2,13 +2,23 @@
 
 import asyncio
 import sys
+from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import httpx
 
-from .config import API_BASE_URL, API_TIMEOUT
+from .batch import (
+    load_questions,
+    parse_batch_args,
+    run_batch,
+    summarize_batch,
+    write_results,
+)
+from .config import API_BASE_URL, API_TIMEOUT, BATCH_CONCURRENCY, BATCH_RESULTS_SUFFIX
 from .display import (
+    batch_progress,
     print_answer,
+    print_batch_summary,
     print_error,
     print_goodbye,
     print_help,
@@ -24,16 +34,53 @@ from .history import HistoryManager
 class CommandProcessor:
     """Процессор команд консольного приложения."""
 
-    def __init__(self, history_manager: HistoryManager) -> None:
+    def __init__(self, history_manager: HistoryManager, local: bool = False) -> None:
         """
         Инициализирует процессор команд.
 
         Args:
             history_manager: Менеджер истории
+            local: Обрабатывать вопросы в процессе, без обращения к API
         """
         self.history_manager = history_manager
+        self.local = local
         self.client = httpx.AsyncClient(timeout=API_TIMEOUT)
 
+    async def _ask(self, question: str) -> Dict[str, Any]:
+        """
+        Получает ответ ассистента через API или локальный конвейер.
+
+        Args:
+            question: Вопрос пользователя
+
+        Returns:
+            Ответ в формате API /ask
+        """
+        if self.local:
+            # Модели загружаются только в локальном режиме
+            from utils.ask_pipeline import answer_question
+
+            result = await answer_question(question)
+            return result.to_response()
+
+        return await self._ask_api(question)
+
+    async def _ask_api(self, question: str) -> Dict[str, Any]:
+        """
+        Отправляет вопрос в API ассистента.
+
+        Args:
+            question: Вопрос пользователя
+
+        Returns:
+            Ответ API
+        """
+        response = await self.client.post(
+            f"{API_BASE_URL}/api/v1/ask", json={"query": question}
+        )
+        response.raise_for_status()
+        return response.json()
+
     async def ask_command(self, question: str) -> None:
         """
         Обрабатывает команду ask.
@@ -48,12 +95,8 @@ class CommandProcessor:
         try:
             # Показываем прогресс
             with show_progress("Поиск ответа..."):
-                # Отправляем запрос к API
-                response = await self.client.post(
-                    f"{API_BASE_URL}/api/v1/ask", json={"query": question}
-                )
-                response.raise_for_status()
-                result = response.json()
+                # Отправляем запрос к API или локальному конвейеру
+                result = await self._ask(question)
 
             # Выводим ответ
             print_answer(
@@ -80,6 +123,47 @@ class CommandProcessor:
         except Exception as e:
             print_error(f"Неожиданная ошибка: {e}")
 
+    async def batch_command(
+        self, file_path: str, concurrency: int = BATCH_CONCURRENCY
+    ) -> None:
+        """
+        Обрабатывает команду batch.
+
+        Args:
+            file_path: Путь к txt/csv/jsonl файлу с вопросами
+            concurrency: Максимальное число одновременных запросов
+        """
+        path = Path(file_path).expanduser()
+        if not path.exists():
+            print_error(f"Файл {path} не найден")
+            return
+
+        try:
+            questions = load_questions(path)
+            if not questions:
+                print_error(f"В файле {path} нет вопросов")
+                return
+
+            print_info(
+                f"Отправляем {len(questions)} вопросов, "
+                f"одновременно до {concurrency}..."
+            )
+            with batch_progress() as progress:
+                task = progress.add_task("Обработка вопросов", total=len(questions))
+                results, wall_time = await run_batch(
+                    self._ask,
+                    questions,
+                    concurrency,
+                    on_result=lambda _: progress.advance(task),
+                )
+
+            results_file = path.with_name(path.name + BATCH_RESULTS_SUFFIX)
+            write_results(results_file, results)
+            print_batch_summary(summarize_batch(results, wall_time), str(results_file))
+
+        except Exception as e:
+            print_error(f"Ошибка пакетной отправки: {e}")
+
     async def stats_command(self) -> None:
         """Обрабатывает команду stats."""
         try:
@@ -94,6 +178,20 @@ class CommandProcessor:
                 "index_ready": True,
             }
 
+            # В локальном режиме берем реальные параметры движка
+            if self.local:
+                from utils.search import search_engine
+
+                stats.update(
+                    {
+                        "records": len(search_engine.knowledge_base),
+                        "embedding_dim": (
+                            search_engine.index.d if search_engine.index else 0
+                        ),
+                        "index_ready": search_engine._is_initialized,
+                    }
+                )
+
             # Добавляем статистику из истории
             stats.update(history_stats)
 
@@ -151,7 +249,7 @@ class CommandProcessor:
         args = parts[1] if len(parts) > 1 else ""
 
         # Список известных команд
-        known_commands = {"ask", "stats", "history", "help", "clear", "exit"}
+        known_commands = {"ask", "batch", "stats", "history", "help", "clear", "exit"}
 
         # Если ввод начинается с известной команды - обрабатываем как команду
         if cmd in known_commands:
@@ -162,6 +260,13 @@ class CommandProcessor:
                     return
                 await self.ask_command(args)
 
+            elif cmd == "batch":
+                file_path, concurrency = parse_batch_args(args)
+                if not file_path:
+                    print_error("Использование: batch <файл> [одновременных запросов]")
+                    return
+                await self.batch_command(file_path, concurrency or BATCH_CONCURRENCY)
+
             elif cmd == "stats":
                 await self.stats_command()
 
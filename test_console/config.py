@@ -17,6 +17,10 @@ CONFIDENCE_THRESHOLDS = {
 
 # Настройки истории
 MAX_HISTORY_ENTRIES = 1000
+# Файл истории дописывается и сжимается до MAX_HISTORY_ENTRIES записей,
+# когда в нем становится больше MAX_HISTORY_ENTRIES * HISTORY_COMPACTION_FACTOR
+HISTORY_COMPACTION_FACTOR = 2
+HISTORY_TAIL_BLOCK_SIZE = 64 * 1024  # Размер блока при чтении файла с конца
 HISTORY_AUTO_SAVE = True
 
 # Настройки отображения
@@ -32,6 +36,10 @@ COLORS = {
 API_BASE_URL = "http://localhost:8000"
 API_TIMEOUT = 30
 
+# Пакетная отправка вопросов (команда batch)
+BATCH_CONCURRENCY = 8  # Одновременных запросов по умолчанию
+BATCH_RESULTS_SUFFIX = ".results.jsonl"  # Добавляется к имени входного файла
+
 # Настройки прогресс-баров
 PROGRESS_BAR_STYLE = "█"
 PROGRESS_BAR_WIDTH = 50
@@ -6,7 +6,14 @@ from typing import Any, Dict, List, Optional
 
 from rich.console import Console
 from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
+from rich.progress import (
+    BarColumn,
+    MofNCompleteColumn,
+    Progress,
+    SpinnerColumn,
+    TextColumn,
+    TimeElapsedColumn,
+)
 from rich.table import Table
 from rich.text import Text
 
@@ -112,6 +119,7 @@ def print_help() -> None:
 
 [bold cyan]Доступные команды:[/bold cyan]
 
+[bold]batch <файл> [N][/bold]  - Вопросы из txt/csv/jsonl файла (N одновременно)
 [bold]stats[/bold]            - Показать статистику базы знаний
 [bold]history[/bold]          - Показать историю диалогов
 [bold]clear[/bold]            - Очистить экран
@@ -165,6 +173,35 @@ def show_progress(message: str) -> Progress:
     return progress
 
 
+def batch_progress() -> Progress:
+    """Создает прогресс-бар пакетной отправки вопросов."""
+    return Progress(
+        SpinnerColumn(),
+        TextColumn("[blue]{task.description}[/blue]"),
+        BarColumn(),
+        MofNCompleteColumn(),
+        TimeElapsedColumn(),
+        console=console,
+    )
+
+
+def print_batch_summary(summary: Dict[str, Any], results_file: str) -> None:
+    """Выводит сводку пакетной отправки вопросов."""
+    table = Table(title="📦 Итоги пакетной отправки")
+    table.add_column("Параметр", style="cyan")
+    table.add_column("Значение", style="green")
+
+    table.add_row("Успешных запросов", str(summary["count"]))
+    table.add_row("Найден ответ", str(summary["answered"]))
+    table.add_row("Ошибок", str(summary["errors"]))
+    table.add_row("Пропускная способность", f"{summary['throughput_rps']:.1f} запр/с")
+    for key in ("mean_ms", "p50_ms", "p90_ms", "p95_ms", "p99_ms", "max_ms"):
+        table.add_row(key.replace("_ms", ""), f"{summary[key]:.1f} мс")
+    table.add_row("Файл результатов", results_file)
+
+    console.print(table)
+
+
 def print_goodbye() -> None:
     """Выводит прощальное сообщение."""
     console.print(
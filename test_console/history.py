@@ -1,11 +1,161 @@
 """Модуль для работы с историей диалогов."""
 
+import bisect
 import json
+import os
+import re
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .config import (
+    CONFIDENCE_THRESHOLDS,
+    HISTORY_COMPACTION_FACTOR,
+    HISTORY_FILE,
+    HISTORY_TAIL_BLOCK_SIZE,
+    MAX_HISTORY_ENTRIES,
+)
+
+# Слова для инвертированного индекса истории
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def read_tail_lines(
+    path: Path, limit: int, block_size: int = HISTORY_TAIL_BLOCK_SIZE
+) -> Tuple[List[str], bool]:
+    """
+    Читает последние непустые строки файла, двигаясь блоками с конца.
+
+    Args:
+        path: Путь к файлу
+        limit: Сколько последних строк нужно
+        block_size: Размер блока чтения в байтах
+
+    Returns:
+        Tuple[List[str], bool]: Строки в исходном порядке и признак того,
+        что файл прочитан целиком
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        buffer = b""
+        lines: List[bytes] = []
+
+        while position > 0 and len(lines) <= limit:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            buffer = f.read(read_size) + buffer
+            # Первая строка блока может быть неполной - оставляем ее в буфере
+            parts = buffer.split(b"\n")
+            buffer = parts[0]
+            lines = [part for part in parts[1:] if part.strip()] + lines
+
+        if position == 0 and buffer.strip():
+            lines.insert(0, buffer)
+
+    reached_start = position == 0 and len(lines) <= limit
+    return [line.decode("utf-8") for line in lines[-limit:]], reached_start
+
+
+def _entry_tokens(entry: Dict[str, Any]) -> Set[str]:
+    """Возвращает множество слов вопроса и ответа записи."""
+    text = f"{entry.get('question', '')} {entry.get('answer', '')}".lower()
+    return set(_TOKEN_RE.findall(text))
+
+
+class HistoryIndex:
+    """
+    Инвертированный индекс слов и счетчики статистики истории.
+
+    Записи идентифицируются порядковыми номерами: запись с номером
+    entry_id лежит в истории на позиции entry_id - first_id.
+    """
+
+    def __init__(self) -> None:
+        """Инициализирует пустой индекс."""
+        self.first_id = 0
+        self.next_id = 0
+        self.postings: Dict[str, Set[int]] = {}
+        # Отсортированный словарь для поиска слов по префиксу
+        self.vocabulary: List[str] = []
+        self.total = 0
+        self.confidence_sum = 0.0
+        self.buckets = {"high": 0, "medium": 0, "low": 0}
+
+    @staticmethod
+    def _bucket(confidence: float) -> str:
+        """Возвращает уровень уверенности записи."""
+        if confidence >= CONFIDENCE_THRESHOLDS["high"]:
+            return "high"
+        if confidence >= CONFIDENCE_THRESHOLDS["medium"]:
+            return "medium"
+        return "low"
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        """Добавляет запись в конец индекса."""
+        entry_id = self.next_id
+        self.next_id += 1
+        for token in _entry_tokens(entry):
+            ids = self.postings.get(token)
+            if ids is None:
+                ids = self.postings[token] = set()
+                bisect.insort(self.vocabulary, token)
+            ids.add(entry_id)
+
+        confidence = entry.get("confidence", 0.0)
+        self.total += 1
+        self.confidence_sum += confidence
+        self.buckets[self._bucket(confidence)] += 1
+
+    def remove_oldest(self, entry: Dict[str, Any]) -> None:
+        """Удаляет из индекса самую старую запись."""
+        entry_id = self.first_id
+        self.first_id += 1
+        for token in _entry_tokens(entry):
+            ids = self.postings[token]
+            ids.discard(entry_id)
+            if not ids:
+                del self.postings[token]
+                del self.vocabulary[bisect.bisect_left(self.vocabulary, token)]
+
+        confidence = entry.get("confidence", 0.0)
+        self.total -= 1
+        self.confidence_sum -= confidence
+        self.buckets[self._bucket(confidence)] -= 1
+
+    def _ids_with_prefix(self, prefix: str) -> Set[int]:
+        """Возвращает записи, содержащие слово с данным префиксом."""
+        ids: Set[int] = set()
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        for token in self.vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            ids |= self.postings[token]
+        return ids
+
+    def candidates(self, query: str) -> Optional[List[int]]:
+        """
+        Возвращает номера записей, содержащих слова с префиксами из запроса.
 
-from .config import HISTORY_FILE, MAX_HISTORY_ENTRIES
+        Args:
+            query: Поисковый запрос в нижнем регистре
+
+        Returns:
+            Optional[List[int]]: Отсортированные номера записей или None,
+            если в запросе нет слов
+        """
+        tokens = sorted(set(_TOKEN_RE.findall(query)), key=len, reverse=True)
+        if not tokens:
+            return None
+
+        ids: Optional[Set[int]] = None
+        for token in tokens:
+            token_ids = self._ids_with_prefix(token)
+            ids = token_ids if ids is None else ids & token_ids
+            if not ids:
+                return []
+        return sorted(ids)
 
 
 class HistoryManager:
@@ -20,32 +170,82 @@ class HistoryManager:
         """
         self.history_file = history_file
         self.history: List[Dict[str, Any]] = []
+        # Количество записей в файле (None - неизвестно, файл не прочитан целиком)
+        self._file_entries: Optional[int] = 0
+        self._index = HistoryIndex()
         self._load_history()
 
     def _load_history(self) -> None:
-        """Загружает историю из файла."""
+        """Загружает последние MAX_HISTORY_ENTRIES записей, читая файл с конца."""
         try:
             if self.history_file.exists():
-                with open(self.history_file, "r", encoding="utf-8") as f:
-                    self.history = [json.loads(line) for line in f if line.strip()]
-
-                # Ограничиваем количество записей
-                if len(self.history) > MAX_HISTORY_ENTRIES:
-                    self.history = self.history[-MAX_HISTORY_ENTRIES:]
+                lines, reached_start = read_tail_lines(
+                    self.history_file, MAX_HISTORY_ENTRIES
+                )
+                self.history = []
+                broken_lines = 0
+                for line in lines:
+                    try:
+                        self.history.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # Оборванная при аварийном завершении строка
+                        broken_lines += 1
+
+                # Файл с оборванными строками перезаписывается при первой записи
+                self._file_entries = (
+                    len(lines) if reached_start and not broken_lines else None
+                )
 
         except Exception as e:
             print(f"Ошибка загрузки истории: {e}")
             self.history = []
 
+        self._rebuild_index()
+
+    def _rebuild_index(self) -> None:
+        """Строит индекс и счетчики по текущей истории."""
+        self._index = HistoryIndex()
+        for entry in self.history:
+            self._index.add(entry)
+
     def save_history(self) -> None:
-        """Сохраняет историю в файл."""
+        """Перезаписывает файл истории текущими записями (сжатие файла)."""
         try:
             # Создаем директорию если не существует
             self.history_file.parent.mkdir(parents=True, exist_ok=True)
 
-            with open(self.history_file, "w", encoding="utf-8") as f:
+            # Пишем во временный файл и атомарно заменяем исходный
+            tmp_file = self.history_file.with_name(self.history_file.name + ".tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
                 for entry in self.history:
                     f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            os.replace(tmp_file, self.history_file)
+
+            self._file_entries = len(self.history)
+
+        except Exception as e:
+            print(f"Ошибка сохранения истории: {e}")
+
+    def _append_entry(self, entry: Dict[str, Any]) -> None:
+        """Дописывает запись в конец файла, при необходимости сжимая файл."""
+        if (
+            self._file_entries is None
+            or self._file_entries >= MAX_HISTORY_ENTRIES * HISTORY_COMPACTION_FACTOR
+        ):
+            self.save_history()
+            return
+
+        try:
+            self.history_file.parent.mkdir(parents=True, exist_ok=True)
+            line = json.dumps(entry, ensure_ascii=False) + "\n"
+            with open(self.history_file, "a+b") as f:
+                # Файл мог оборваться посреди строки: новая запись - с новой строки
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+                f.write(line.encode("utf-8"))
+            self._file_entries += 1
 
         except Exception as e:
             print(f"Ошибка сохранения истории: {e}")
@@ -79,13 +279,17 @@ class HistoryManager:
         }
 
         self.history.append(entry)
+        self._index.add(entry)
 
         # Ограничиваем количество записей
         if len(self.history) > MAX_HISTORY_ENTRIES:
-            self.history = self.history[-MAX_HISTORY_ENTRIES:]
+            removed = len(self.history) - MAX_HISTORY_ENTRIES
+            for old_entry in self.history[:removed]:
+                self._index.remove_oldest(old_entry)
+            self.history = self.history[removed:]
 
-        # Автосохранение
-        self.save_history()
+        # Автосохранение: дописываем запись, а не перезаписываем файл
+        self._append_entry(entry)
 
     def get_history(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
@@ -105,32 +309,21 @@ class HistoryManager:
         """
         Возвращает статистику по истории.
 
+        Счетчики поддерживаются при добавлении записей, поэтому
+        статистика не требует прохода по истории.
+
         Returns:
             Словарь со статистикой
         """
-        if not self.history:
-            return {
-                "total_questions": 0,
-                "average_confidence": 0.0,
-                "high_confidence_count": 0,
-                "medium_confidence_count": 0,
-                "low_confidence_count": 0,
-            }
-
-        total_questions = len(self.history)
-        confidences = [entry["confidence"] for entry in self.history]
-        average_confidence = sum(confidences) / len(confidences)
-
-        high_confidence_count = sum(1 for c in confidences if c >= 0.8)
-        medium_confidence_count = sum(1 for c in confidences if 0.6 <= c < 0.8)
-        low_confidence_count = sum(1 for c in confidences if c < 0.6)
-
+        index = self._index
         return {
-            "total_questions": total_questions,
-            "average_confidence": average_confidence,
-            "high_confidence_count": high_confidence_count,
-            "medium_confidence_count": medium_confidence_count,
-            "low_confidence_count": low_confidence_count,
+            "total_questions": index.total,
+            "average_confidence": (
+                index.confidence_sum / index.total if index.total else 0.0
+            ),
+            "high_confidence_count": index.buckets["high"],
+            "medium_confidence_count": index.buckets["medium"],
+            "low_confidence_count": index.buckets["low"],
         }
 
     def export_to_csv(self, output_file: Path) -> None:
@@ -159,12 +352,17 @@ class HistoryManager:
     def clear_history(self) -> None:
         """Очищает историю."""
         self.history = []
+        self._rebuild_index()
         self.save_history()
 
     def search_history(self, query: str) -> List[Dict[str, Any]]:
         """
         Ищет в истории по запросу.
 
+        Кандидаты отбираются по инвертированному индексу слов (слова запроса
+        ищутся как префиксы слов записи), затем проверяется вхождение
+        всего запроса в вопрос или ответ.
+
         Args:
             query: Поисковый запрос
 
@@ -172,9 +370,21 @@ class HistoryManager:
             Список найденных записей
         """
         query_lower = query.lower()
-        results = []
+        candidate_ids = self._index.candidates(query_lower)
+        if candidate_ids is None:
+            # В запросе нет слов (например, только знаки препинания)
+            candidates = self.history
+        else:
+            first_id = self._index.first_id
+            candidates = [
+                self.history[entry_id - first_id] for entry_id in candidate_ids
+            ]
+            # Запрос из одного слова уже найден индексом как префикс слова
+            if _TOKEN_RE.fullmatch(query_lower):
+                return candidates
 
-        for entry in self.history:
+        results = []
+        for entry in candidates:
             if (
                 query_lower in entry["question"].lower()
                 or query_lower in entry["answer"].lower()
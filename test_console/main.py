@@ -1,8 +1,10 @@
 """Главный файл консольного приложения для тестирования FAQ-ассистента."""
 
+import argparse
 import asyncio
 import sys
 from pathlib import Path
+from typing import Optional, Sequence
 
 from rich.console import Console
 
@@ -46,30 +48,51 @@ def check_data_files() -> bool:
     return True
 
 
-async def main() -> None:
+async def init_local_engine() -> None:
+    """Загружает поисковый движок для работы без API."""
+    from utils.search import search_engine
+
+    with console.status("[blue]Загрузка моделей и индекса...[/blue]"):
+        await search_engine.initialize()
+
+
+async def main(argv: Optional[Sequence[str]] = None) -> None:
     """Главная функция приложения."""
+    parser = argparse.ArgumentParser(description="Консоль FAQ-ассистента")
+    parser.add_argument(
+        "--local",
+        action="store_true",
+        help="Отвечать в процессе по data/faiss.index, без запуска сервера",
+    )
+    args = parser.parse_args(argv)
+
     try:
         # Проверяем файлы данных
         if not check_data_files():
             console.print("\n[bold red]❌ Не удается запустить приложение[/bold red]")
             sys.exit(1)
 
-        # Проверяем API
-        api_available = await check_api_availability()
-        if not api_available:
+        # Проверяем API, если не выбран локальный режим
+        local = args.local
+        if not local and not await check_api_availability():
             console.print("\n[bold yellow]⚠️ API недоступен. Запустите сервер: python main.py[/bold yellow]")
-            console.print("[dim]Приложение будет работать в режиме демо[/dim]")
+            console.print("[dim]Приложение будет отвечать локально, без API[/dim]")
+            local = True
+
+        if local:
+            await init_local_engine()
 
         # Инициализируем компоненты
         history_manager = HistoryManager()
-        command_processor = CommandProcessor(history_manager)
+        command_processor = CommandProcessor(history_manager, local=local)
 
         # Выводим заголовок
         print_header()
+        if local:
+            print_info("Локальный режим: ответы вычисляются в процессе консоли")
 
         # Показываем статистику
-        if api_available:
-            await command_processor.stats_command()
+        await command_processor.stats_command()
 
         print_separator()
 
@@ -1,9 +1,37 @@
 """Конфигурация pytest для тестов."""
 
+import os
+
 import pytest
 from fastapi.testclient import TestClient
 from httpx import AsyncClient
 
+# Переменная окружения, включающая тесты производительности
+RUN_PERF_ENV = "RUN_PERF_TESTS"
+
+
+def pytest_configure(config):
+    """Регистрирует маркер тестов производительности."""
+    config.addinivalue_line(
+        "markers", f"perf: бюджеты производительности (запуск: {RUN_PERF_ENV}=1)"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """
+    Пропускает тесты производительности в обычном прогоне.
+
+    Замеры по времени нестабильны на загруженной машине, поэтому они
+    запускаются отдельной задачей CI: RUN_PERF_TESTS=1 pytest -m perf tests
+    """
+    if os.environ.get(RUN_PERF_ENV) == "1":
+        return
+
+    skip_perf = pytest.mark.skip(reason=f"тест производительности ({RUN_PERF_ENV}=1)")
+    for item in items:
+        if "perf" in item.keywords:
+            item.add_marker(skip_perf)
+
 
 @pytest.fixture
 def client():
@@ -0,0 +1,92 @@
+"""Тесты для хранилища аналитики."""
+
+import time
+
+import pytest
+
+from utils.analytics import (
+    OUTCOME_ANSWER,
+    OUTCOME_CLARIFICATION,
+    OUTCOME_FALLBACK,
+    OUTCOME_GREETING,
+    AnalyticsStore,
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Хранилище аналитики во временной директории."""
+    analytics = AnalyticsStore(db_path=str(tmp_path / "analytics.db"))
+    yield analytics
+    analytics.close()
+
+
+async def fill(store: AnalyticsStore) -> None:
+    """Заполняет хранилище событиями через фоновую задачу и дожидается записи."""
+    await store.start()
+    await store.record_question("Как заказать такси?", OUTCOME_ANSWER, 0.92, "q000")
+    await store.record_question("Где мой водитель", OUTCOME_CLARIFICATION, 0.65)
+    await store.record_question("где  мой водитель?", OUTCOME_CLARIFICATION, 0.61)
+    await store.record_question("Сколько стоит межгород", OUTCOME_FALLBACK, 0.3)
+    await store.record_question("Привет", OUTCOME_GREETING, 1.0)
+    await store.record_feedback("Как заказать такси?", "q000", "👍")
+    await store.record_feedback("Как заказать такси?", "q000", "👍")
+    await store.record_feedback("Как заказать такси?", "q000", "👎")
+    await store.stop()
+
+
+@pytest.mark.asyncio
+async def test_top_unanswered_groups_normalized_questions(store):
+    """Вопросы без ответа группируются по нормализованному тексту."""
+    await fill(store)
+
+    top = store.top_unanswered(limit=5)
+
+    assert [item["count"] for item in top] == [2, 1]
+    assert top[0]["query"] == "где  мой водитель?"
+    assert store.top_unanswered(limit=5, since=time.time() - 60) == top
+    assert store.top_unanswered(limit=5, since=time.time() + 60) == []
+
+
+@pytest.mark.asyncio
+async def test_feedback_ratios_and_confidence_histogram(store):
+    """Оценки и гистограмма уверенности (без приветствий) агрегируются при записи."""
+    await fill(store)
+
+    ratios = store.feedback_ratios()
+    histogram = store.confidence_histogram()
+
+    assert ratios == [
+        {
+            "answer_id": "q000",
+            "positive": 2,
+            "negative": 1,
+            "total": 3,
+            "positive_ratio": pytest.approx(2 / 3),
+        }
+    ]
+    assert histogram["0.9-1.0"] == 1
+    assert histogram["0.6-0.7"] == 2
+    assert histogram["0.3-0.4"] == 1
+    assert sum(histogram.values()) == 4
+    assert store.confidence_histogram(since=time.time() - 60) == histogram
+
+
+@pytest.mark.asyncio
+async def test_store_uses_wal_mode(store):
+    """База работает в режиме WAL."""
+    await fill(store)
+
+    mode = store._query("PRAGMA journal_mode")[0][0]
+
+    assert mode == "wal"
+
+
+@pytest.mark.asyncio
+async def test_disabled_store_does_not_write(tmp_path):
+    """Выключенное хранилище не создает базу."""
+    analytics = AnalyticsStore(db_path=str(tmp_path / "analytics.db"), enabled=False)
+
+    await analytics.record_question("вопрос", OUTCOME_ANSWER, 0.9, "q000")
+
+    assert not (tmp_path / "analytics.db").exists()
@@ -0,0 +1,59 @@
+"""Тесты для эндпоинтов API ассистента."""
+
+from fastapi import status
+
+import routers.admin
+from utils.search import search_engine
+
+
+def test_related_questions_endpoint(client, monkeypatch):
+    """Эндпоинт похожих вопросов отдает соседей из графа."""
+    monkeypatch.setattr(search_engine, "_is_initialized", True)
+    monkeypatch.setattr(
+        search_engine,
+        "kb_by_id",
+        {
+            "q000": {"id": "q000", "question": "Как заказать такси?"},
+            "q001": {"id": "q001", "question": "Как отменить заказ?"},
+        },
+    )
+    monkeypatch.setattr(
+        search_engine, "neighbors", {"q000": [{"id": "q001", "score": 0.71}]}
+    )
+
+    response = client.get("/api/v1/related/q000")
+    missing = client.get("/api/v1/related/q999")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "source": "q000",
+        "related": [{"id": "q001", "question": "Как отменить заказ?", "score": 0.71}],
+    }
+    assert missing.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_admin_cache_stats_endpoint(client, monkeypatch):
+    """Admin эндпоинт отдает статистику кэша fuzzy matching."""
+    monkeypatch.setattr(routers.admin, "ADMIN_API_TOKEN", "secret")
+
+    response = client.get("/api/v1/admin/cache", headers={"X-Admin-Token": "secret"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert {"hits", "misses", "evictions", "hit_rate"} <= set(
+        response.json()["fuzzy_greetings"]
+    )
+
+
+def test_admin_endpoints_require_token(client, monkeypatch):
+    """Без настроенного токена admin API отключен, с токеном - проверяет его."""
+    disabled = client.get("/api/v1/admin/analytics/unanswered")
+
+    monkeypatch.setattr(routers.admin, "ADMIN_API_TOKEN", "secret")
+    missing = client.post("/api/v1/admin/cache/clear")
+    wrong = client.get(
+        "/api/v1/admin/analytics/confidence", headers={"X-Admin-Token": "wrong"}
+    )
+
+    assert disabled.status_code == status.HTTP_404_NOT_FOUND
+    assert missing.status_code == status.HTTP_401_UNAUTHORIZED
+    assert wrong.status_code == status.HTTP_401_UNAUTHORIZED
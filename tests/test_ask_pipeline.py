@@ -0,0 +1,110 @@
+"""Тесты для общего конвейера обработки вопросов."""
+
+import pytest
+from fastapi import status
+
+from test_console.commands import CommandProcessor
+from test_console.history import HistoryManager
+from utils import ask_pipeline
+from utils.analytics import analytics_store
+from utils.ask_pipeline import answer_question
+
+
+class FakeEngine:
+    """Поисковый движок с заранее заданным ответом."""
+
+    _is_initialized = True
+
+    def __init__(self, result):
+        self.result = result
+        self.queries = []
+
+    async def find_best_answer(self, query):
+        self.queries.append(query)
+        return self.result
+
+
+ANSWER = {
+    "reply": "Через приложение",
+    "confidence": 0.93,
+    "source": "q000",
+    "similar_questions": [],
+}
+
+
+@pytest.mark.asyncio
+async def test_greeting_is_answered_without_search():
+    """Чистое приветствие не доходит до поиска."""
+    engine = FakeEngine(ANSWER)
+
+    result = await answer_question("Здравствуйте!", engine)
+
+    assert result.outcome == "greeting"
+    assert result.source == "greeting"
+    assert engine.queries == []
+
+
+@pytest.mark.asyncio
+async def test_greeting_is_stripped_before_search():
+    """Приветствие убирается из запроса перед поиском."""
+    engine = FakeEngine(ANSWER)
+
+    result = await answer_question("Здравствуйте, как заказать такси?", engine)
+
+    assert result.outcome == "answer"
+    assert result.to_response() == ANSWER
+    assert engine.queries == ["как заказать такси?"]
+
+
+@pytest.mark.asyncio
+async def test_low_confidence_returns_fallback_greeting():
+    """Низкая уверенность поиска заменяется fallback приветствием."""
+    engine = FakeEngine({**ANSWER, "confidence": 0.3, "source": None})
+
+    result = await answer_question("что-то непонятное", engine)
+
+    assert result.outcome == "fallback"
+    assert result.source == "fallback_greeting"
+    assert result.search_confidence == 0.3
+    assert result.source_outcome == "fallback_greeting"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "similar_questions, outcome",
+    [(["Как заказать такси?"], "clarification"), ([], "operator")],
+)
+async def test_unanswered_search_outcomes(monkeypatch, similar_questions, outcome):
+    """Без ответа поиск просит уточнить вопрос или передает его оператору."""
+    monkeypatch.setattr(ask_pipeline, "should_use_fallback_greeting", lambda c: False)
+    engine = FakeEngine(
+        {**ANSWER, "source": None, "similar_questions": similar_questions}
+    )
+
+    result = await answer_question("что-то непонятное", engine)
+
+    assert result.outcome == outcome
+    assert result.source_outcome == outcome
+
+
+def test_ask_endpoint_uses_pipeline(client, monkeypatch):
+    """Эндпоинт /ask отвечает через общий конвейер."""
+    monkeypatch.setattr(ask_pipeline, "search_engine", FakeEngine(ANSWER))
+    monkeypatch.setattr(analytics_store, "enabled", False)
+
+    response = client.post("/api/v1/ask", json={"query": "Как заказать такси?"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == ANSWER
+
+
+@pytest.mark.asyncio
+async def test_console_local_mode_uses_pipeline(tmp_path, monkeypatch):
+    """Консоль в локальном режиме отвечает без обращения к API."""
+    monkeypatch.setattr(ask_pipeline, "search_engine", FakeEngine(ANSWER))
+    processor = CommandProcessor(HistoryManager(tmp_path / "history.jsonl"), local=True)
+
+    try:
+        assert await processor._ask("Как заказать такси?") == ANSWER
+    finally:
+        await processor.close()
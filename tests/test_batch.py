@@ -0,0 +1,103 @@
+"""Тесты для пакетной отправки вопросов из тестовой консоли."""
+
+import asyncio
+import json
+
+import pytest
+
+from test_console.batch import (
+    load_questions,
+    parse_batch_args,
+    run_batch,
+    summarize_batch,
+    write_results,
+)
+from utils.latency import percentile
+
+
+def test_load_questions_from_txt_csv_and_jsonl(tmp_path):
+    """Вопросы читаются из текстового, CSV и JSONL файлов."""
+    txt = tmp_path / "questions.txt"
+    txt.write_text("Как заказать такси?\n\n  Как оплатить?  \n", encoding="utf-8")
+    csv_file = tmp_path / "questions.csv"
+    csv_file.write_text("id,вопрос\n1,Как заказать такси?\n2,\n", encoding="utf-8")
+    jsonl = tmp_path / "questions.jsonl"
+    jsonl.write_text(
+        '{"question": "Как заказать такси?"}\n"Как оплатить?"\n', encoding="utf-8"
+    )
+
+    assert load_questions(txt) == ["Как заказать такси?", "Как оплатить?"]
+    assert load_questions(csv_file) == ["Как заказать такси?"]
+    assert load_questions(jsonl) == ["Как заказать такси?", "Как оплатить?"]
+
+
+@pytest.mark.asyncio
+async def test_run_batch_limits_concurrency_and_keeps_order(tmp_path):
+    """Одновременных запросов не больше лимита, результаты в порядке вопросов."""
+    in_flight = 0
+    max_in_flight = 0
+
+    async def ask(question):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if question == "ошибка":
+            raise RuntimeError("сбой API")
+        return {"reply": f"ответ: {question}", "confidence": 0.9, "source": "q000"}
+
+    questions = [f"вопрос {idx}" for idx in range(10)] + ["ошибка"]
+    progress = []
+
+    results, wall_time = await run_batch(ask, questions, 3, on_result=progress.append)
+    summary = summarize_batch(results, wall_time)
+
+    assert max_in_flight == 3
+    assert len(progress) == len(questions)
+    assert [result["question"] for result in results] == questions
+    assert results[0]["reply"] == "ответ: вопрос 0"
+    assert results[-1]["error"] == "сбой API"
+    assert summary["count"] == 10
+    assert summary["errors"] == 1
+    assert summary["p50_ms"] >= 10
+
+    output = tmp_path / "results.jsonl"
+    write_results(output, results)
+    lines = output.read_text(encoding="utf-8").splitlines()
+    assert json.loads(lines[0])["latency_ms"] > 0
+
+
+def test_summary_counts_only_knowledge_base_answers():
+    """Приветствия и fallback приветствие не считаются найденными ответами."""
+    results = [
+        {"source": source, "latency_ms": 1.0, "error": None}
+        for source in ("q001", "greeting", "fallback_greeting", None)
+    ]
+
+    assert summarize_batch(results, 1.0)["answered"] == 1
+
+
+@pytest.mark.parametrize(
+    "args, expected",
+    [
+        ("questions.txt", ("questions.txt", None)),
+        ("questions.txt 8", ("questions.txt", 8)),
+        ("my questions.csv", ("my questions.csv", None)),
+        ("~/Мои файлы/вопросы.jsonl 4", ("~/Мои файлы/вопросы.jsonl", 4)),
+        ('"file 2024.txt"', ("file 2024.txt", None)),
+        ("", ("", None)),
+    ],
+)
+def test_parse_batch_args_keeps_spaces_in_path(args, expected):
+    """Путь с пробелами не разбивается, число в конце - параллельность."""
+    assert parse_batch_args(args) == expected
+
+
+def test_percentile_interpolates():
+    """Перцентиль вычисляется с линейной интерполяцией."""
+    values = [10.0, 20.0, 30.0, 40.0]
+
+    assert percentile(values, 50) == 25.0
+    assert percentile(values, 100) == 40.0
+    assert percentile([], 95) == 0.0
@@ -0,0 +1,123 @@
+"""Тесты для инструментов бенчмарков."""
+
+import json
+from pathlib import Path
+
+from benchmarks.common import CALIBRATION, compare_with_baseline, load_baseline
+from benchmarks.greetings_bench import (
+    BASELINE_FILE,
+    MIX_WEIGHTS,
+    build_cases,
+    build_message_mix,
+    main,
+)
+from benchmarks.load_test import build_corpus, latency_histogram
+from benchmarks.load_test import main as load_test_main
+
+
+def test_message_mix_is_reproducible():
+    """Смесь сообщений воспроизводима и содержит все категории."""
+    questions = ["Как заказать такси?", "Как оплатить картой?"]
+
+    first = build_message_mix(questions, size=50)
+    second = build_message_mix(questions, size=50)
+
+    assert first == second
+    assert set(first) == set(MIX_WEIGHTS)
+    assert all(first.values())
+
+
+def test_compare_with_baseline_flags_regressions():
+    """Замедление сверх допуска отмечается как регрессия."""
+    baseline = {"fast": {"ns_per_op": 100.0}, "slow": {"ns_per_op": 100.0}}
+    results = {
+        "fast": {"ns_per_op": 110.0},
+        "slow": {"ns_per_op": 200.0},
+        "new": {"ns_per_op": 50.0},
+    }
+
+    comparison = compare_with_baseline(results, baseline, tolerance=0.25)
+
+    assert {row["name"]: row["regression"] for row in comparison} == {
+        "fast": False,
+        "slow": True,
+    }
+
+
+def test_benchmark_saves_and_compares_baseline(tmp_path):
+    """Бенчмарк сохраняет baseline и сравнивается с ним."""
+    baseline = tmp_path / "greetings.json"
+    args = ["--history", str(tmp_path / "missing.jsonl"), "--size", "20"]
+    args += ["--repeats", "1", "--baseline", str(baseline)]
+
+    assert main(args + ["--save-baseline"]) == 0
+    assert baseline.exists()
+    assert main(args + ["--compare", "--tolerance", "100"]) == 0
+
+
+def test_committed_baseline_covers_all_cases():
+    """Сохраненный baseline содержит калибровку и все сценарии бенчмарка."""
+    baseline = load_baseline(Path(BASELINE_FILE))
+    mix = build_message_mix(["Как заказать такси?"], size=20)
+
+    assert CALIBRATION in baseline
+    assert {name for name, *_ in build_cases(mix)} <= set(baseline)
+
+
+def test_load_corpus_mixes_greetings_and_typos():
+    """Корпус нагрузочного теста воспроизводим и содержит приветствия."""
+    questions = ["Как заказать такси?", "Как оплатить картой?"]
+
+    corpus = build_corpus(questions, 50, greeting_ratio=1.0, typo_ratio=0.0)
+
+    assert corpus == build_corpus(questions, 50, greeting_ratio=1.0, typo_ratio=0.0)
+    assert all(query.split("!")[1].strip() in questions for query in corpus)
+
+
+def test_latency_histogram_buckets():
+    """Задержки раскладываются по корзинам гистограммы."""
+    histogram = latency_histogram([1.0, 7.0, 7.5, 10000.0])
+
+    assert histogram["<=5ms"] == 1
+    assert histogram["<=10ms"] == 2
+    assert histogram[">5000ms"] == 1
+
+
+def test_load_test_against_asgi_app(monkeypatch, tmp_path):
+    """Нагрузочный тест работает с приложением в процессе через ASGI."""
+    import main as main_module
+    from utils import ask_pipeline
+    from utils.analytics import analytics_store
+
+    class FakeEngine:
+        _is_initialized = True
+
+        async def find_best_answer(self, query):
+            return {
+                "reply": "Ответ",
+                "confidence": 0.9,
+                "source": "q000",
+                "similar_questions": [],
+            }
+
+    async def initialize():
+        return None
+
+    monkeypatch.setattr(ask_pipeline, "search_engine", FakeEngine())
+    monkeypatch.setattr(main_module.search_engine, "initialize", initialize)
+    monkeypatch.setattr(analytics_store, "enabled", False)
+    output = tmp_path / "report.json"
+    feedback_path = main_module.feedback_writer.path
+
+    code = load_test_main(
+        ["--asgi", "--requests", "20", "--concurrency", "4", "--output", str(output)]
+    )
+    report = json.loads(output.read_text(encoding="utf-8"))
+
+    assert code == 0
+    assert report["requests"] == 20
+    assert report["error_rate"] == 0.0
+    assert report["latency"]["count"] == 20
+    assert sum(report["histogram"].values()) == 20
+    # Писатели возвращаются к рабочим файлам после теста
+    assert main_module.feedback_writer.path == feedback_path
@@ -0,0 +1,216 @@
+"""Тесты для моделей эмбеддингов и офлайн-пути конвертация -> поиск -> API."""
+
+import asyncio
+import json
+import subprocess
+import sys
+import threading
+
+import httpx
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.load_test import main as load_test_main
+from utils.encoders import (
+    HashingEncoder,
+    ModelServerEncoder,
+    check_cascade_backend,
+    create_encoder,
+)
+from utils.excel_converter import convert_excel_to_vector_db
+from utils.search import SearchEngine
+
+FAQ_ROWS = [
+    ("Как заказать такси?", "Через приложение"),
+    ("Как отменить заказ?", "Нажмите отмена"),
+    ("Как оплатить картой?", "Привяжите карту в профиле"),
+    ("Почему удерживается комиссия?", "Комиссия сервиса за заказ"),
+]
+
+
+def test_hashing_encoder_is_deterministic_and_normalized():
+    """Заглушка возвращает одинаковые нормированные векторы для одного текста."""
+    encoder = HashingEncoder(dim=256)
+
+    first = encoder.encode(["как заказать такси", "как оплатить картой"])
+    second = HashingEncoder(dim=256).encode(["как заказать такси"])
+
+    assert first.shape == (2, 256)
+    assert first.dtype == np.float32
+    assert np.allclose(np.linalg.norm(first, axis=1), 1.0)
+    assert np.array_equal(first[0], second[0])
+
+
+def test_hashing_encoder_keeps_typos_close():
+    """Текст с опечаткой ближе к исходному, чем другой вопрос."""
+    vectors = HashingEncoder().encode(
+        ["как заказать такси", "как заказть такси", "как оплатить картой"]
+    )
+
+    assert vectors[0] @ vectors[1] > vectors[0] @ vectors[2]
+
+
+def test_model_server_encoder_splits_batches():
+    """Клиент сервера моделей отправляет пачки не больше batch_size."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        inputs = json.loads(request.content)["inputs"]
+        requests.append(inputs)
+        return httpx.Response(200, json=[[1.0, 0.0, 0.0]] * len(inputs))
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    encoder = ModelServerEncoder(
+        "BAAI/bge-m3", url="http://models/", batch_size=2, client=client
+    )
+
+    embeddings = encoder.encode(["a", "b", "c"])
+
+    assert embeddings.shape == (3, 3)
+    assert [len(batch) for batch in requests] == [2, 1]
+    assert encoder.dimension == 3
+    assert encoder.model_id == "BAAI/bge-m3"
+
+
+def test_model_server_encoder_runs_outside_event_loop():
+    """Запрос к серверу моделей выполняется в пуле потоков."""
+    threads = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        threads.append(threading.current_thread())
+        return httpx.Response(200, json=[[1.0, 0.0, 0.0]])
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    engine = SearchEngine(enable_reranker=False, enable_cascade=False)
+    engine.model = ModelServerEncoder("BAAI/bge-m3", url="http://models", client=client)
+    engine._is_initialized = True
+
+    embedding = asyncio.run(engine.generate_embedding("как заказать такси"))
+
+    assert embedding.shape == (1, 3)
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_search_import_does_not_load_torch():
+    """Импорт движка не загружает sentence-transformers и torch."""
+    code = (
+        "import sys, main, utils.search; "
+        "assert 'sentence_transformers' not in sys.modules; "
+        "assert 'torch' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_create_encoder_rejects_unknown_backend():
+    """Неизвестный бэкенд - понятная ошибка."""
+    with pytest.raises(ValueError, match="бэкенд"):
+        create_encoder("BAAI/bge-m3", "onnx")
+
+
+@pytest.fixture
+def hashing_data_dir(tmp_path):
+    """Директория индекса, собранного из Excel заглушкой без сети."""
+    excel_file = tmp_path / "faq.xlsx"
+    pd.DataFrame(FAQ_ROWS, columns=["question", "answer"]).to_excel(
+        excel_file, index=False
+    )
+    result = asyncio.run(
+        convert_excel_to_vector_db(
+            str(excel_file),
+            str(tmp_path / "data"),
+            cascade_model_name=None,
+            reduction=None,
+            quantization=None,
+            encoder_backend="hashing",
+        )
+    )
+    assert result["status"] == "success", result
+    return tmp_path / "data"
+
+
+@pytest.mark.asyncio
+async def test_offline_ingest_index_search(hashing_data_dir):
+    """Конвертация, загрузка и поиск работают с заглушкой без весов модели."""
+    engine = SearchEngine(
+        enable_reranker=False,
+        enable_cascade=False,
+        data_dir=str(hashing_data_dir),
+        encoder_backend="hashing",
+    )
+    await engine.initialize()
+
+    result = await engine.find_best_answer("как оплатить картой")
+
+    assert engine.index_meta["model"] == engine.model.model_id
+    assert result["source"] == "q002"
+    assert result["confidence"] >= 0.8
+
+
+def test_offline_load_test_through_api(monkeypatch, hashing_data_dir):
+    """Нагрузочный тест проходит через API приложения с заглушкой."""
+    from utils.analytics import analytics_store
+    from utils.search import search_engine
+
+    # Восстанавливаем состояние глобального движка после теста
+    for name, value in list(vars(search_engine).items()):
+        monkeypatch.setattr(search_engine, name, value)
+    monkeypatch.setattr(analytics_store, "enabled", False)
+
+    code = load_test_main(
+        [
+            "--asgi",
+            "--encoder",
+            "hashing",
+            "--data-dir",
+            str(hashing_data_dir),
+            "--corpus",
+            str(hashing_data_dir / "kb.jsonl"),
+            "--requests",
+            "20",
+            "--concurrency",
+            "4",
+        ]
+    )
+
+    assert code == 0
+    assert search_engine.model.model_id.startswith("hashing")
+
+
+def test_cascade_requires_multi_model_backend(hashing_data_dir):
+    """Каскад отключается, если бэкенд не загружает отдельную быструю модель."""
+    with pytest.raises(ValueError, match="каскад"):
+        check_cascade_backend("model-server")
+
+    engine = SearchEngine(
+        enable_reranker=False,
+        enable_cascade=True,
+        data_dir=str(hashing_data_dir),
+        encoder_backend="hashing",
+    )
+    asyncio.run(engine.initialize())
+
+    assert engine.cascade_model is None
+    assert not engine.get_cascade_stats()["enabled"]
+
+
+def test_converter_skips_cascade_index_for_hashing_backend(tmp_path):
+    """Конвертер не строит индекс быстрой модели, совпадающей с основной."""
+    excel_file = tmp_path / "faq.xlsx"
+    pd.DataFrame(FAQ_ROWS, columns=["question", "answer"]).to_excel(
+        excel_file, index=False
+    )
+
+    result = asyncio.run(
+        convert_excel_to_vector_db(
+            str(excel_file),
+            str(tmp_path / "data"),
+            cascade_model_name="small-model",
+            reduction=None,
+            quantization=None,
+            encoder_backend="hashing",
+        )
+    )
+
+    assert result["status"] == "success", result
+    assert "cascade_index_file" not in result
@@ -0,0 +1,116 @@
+"""Тесты для фоновой записи обратной связи."""
+
+import asyncio
+import json
+from datetime import date, timedelta
+
+import pytest
+
+from utils.batch_writer import BackgroundBatchWriter
+from utils.feedback_writer import FeedbackWriter
+
+
+def read_records(path):
+    """Читает записи JSONL файла."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.mark.asyncio
+async def test_background_writer_batches_and_flushes_on_stop(tmp_path):
+    """Запущенный писатель пишет JSONL пачками и сбрасывает все при остановке."""
+    path = tmp_path / "feedback.log"
+    writer = FeedbackWriter(path=str(path), batch_size=10)
+    await writer.start()
+
+    for idx in range(25):
+        await writer.submit({"query": f"вопрос {idx}", "feedback": "👍"})
+    assert not path.exists() or len(read_records(path)) < 25
+
+    await writer.stop()
+
+    records = read_records(path)
+    stats = writer.get_stats()
+    assert [record["query"] for record in records] == [
+        f"вопрос {idx}" for idx in range(25)
+    ]
+    assert records[0]["feedback"] == "👍"
+    assert stats["written"] == 25
+    assert stats["batches"] >= 3
+    assert not stats["running"]
+
+
+@pytest.mark.asyncio
+async def test_flush_error_does_not_stop_background_task(tmp_path):
+    """Ошибка сброса на диск учитывается, а фоновая задача продолжает писать."""
+    path = tmp_path / "feedback.log"
+    writer = FeedbackWriter(path=str(path), fsync_interval=0.01)
+    flushes = []
+
+    def failing_flush():
+        flushes.append(1)
+        raise OSError("fsync failed")
+
+    writer.flush = failing_flush
+    await writer.start()
+    await asyncio.sleep(0.05)
+
+    await writer.submit({"query": "после ошибки", "feedback": "👍"})
+    await writer.stop()
+
+    assert flushes
+    assert writer.get_stats()["errors"] >= 1
+    assert [record["query"] for record in read_records(path)] == ["после ошибки"]
+
+
+def test_writer_requires_write_batch():
+    """Наследник без write_batch не создается."""
+
+    class IncompleteWriter(BackgroundBatchWriter):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteWriter(batch_size=1, queue_size=1, flush_interval=1.0)
+
+
+@pytest.mark.asyncio
+async def test_writer_without_start_writes_directly(tmp_path):
+    """Без запуска фоновой задачи запись выполняется сразу."""
+    path = tmp_path / "feedback.log"
+    writer = FeedbackWriter(path=str(path))
+
+    await writer.submit({"query": "вопрос", "feedback": "👎"})
+    writer.close()
+
+    assert read_records(path) == [{"query": "вопрос", "feedback": "👎"}]
+
+
+def test_rotation_by_size(tmp_path):
+    """Файл ротируется при превышении размера."""
+    path = tmp_path / "feedback.log"
+    writer = FeedbackWriter(path=str(path), max_bytes=100)
+
+    for idx in range(5):
+        writer.write_batch([{"query": "x" * 60, "idx": idx}])
+    writer.close()
+
+    rotated = sorted(tmp_path.glob("feedback-*.log"))
+    total = sum(len(read_records(file)) for file in rotated + [path])
+    assert rotated
+    assert total == 5
+
+
+def test_rotation_by_date(tmp_path):
+    """Файл за прошлый день ротируется при следующей записи."""
+    path = tmp_path / "feedback.log"
+    writer = FeedbackWriter(path=str(path))
+    writer.write_batch([{"idx": 0}])
+    writer._file_date = date.today() - timedelta(days=1)
+
+    writer.write_batch([{"idx": 1}])
+    writer.close()
+
+    rotated = list(tmp_path.glob("feedback-*.log"))
+    assert len(rotated) == 1
+    assert read_records(rotated[0]) == [{"idx": 0}]
+    assert read_records(path) == [{"idx": 1}]
@@ -0,0 +1,156 @@
+"""Тесты для обработки приветствий."""
+
+import pytest
+
+from utils.greetings import parse_greeting, process_greeting_message
+
+
+@pytest.mark.parametrize(
+    "message, pattern",
+    [
+        ("Здравствуйте!", "здравствуйте"),
+        ("приветт", "привет"),
+        ("Добрый вечер", "добрый вечер"),
+        ("Добро пожаловать в службу поддержки", "добро пожаловать в службу поддержки"),
+    ],
+)
+def test_pure_greeting(message, pattern):
+    """Чистое приветствие распознается целиком."""
+    match = parse_greeting(message)
+
+    assert match.is_greeting
+    assert match.pattern == pattern
+    assert match.remainder == ""
+
+
+def test_greeting_with_question_returns_span_and_remainder():
+    """Приветствие с вопросом отделяется от вопроса в исходном регистре."""
+    message = "Добрый вечер, как заказать такси?"
+    match = parse_greeting(message)
+
+    assert match.pattern == "добрый вечер"
+    assert message[match.span[0] : match.span[1]] == "Добрый вечер"
+    assert match.remainder == "как заказать такси?"
+    assert process_greeting_message(message) == (True, None, "как заказать такси?")
+
+
+def test_question_starting_with_greeting_word_is_not_greeting():
+    """Вопрос, начинающийся со слова из приветствия, не считается приветствием."""
+    match = parse_greeting("Как заказать такси?")
+
+    assert not match.is_greeting
+    assert process_greeting_message("Как заказать такси?") == (
+        False,
+        None,
+        "Как заказать такси?",
+    )
+
+
+@pytest.mark.parametrize(
+    "message, remainder",
+    [
+        ("Добрый!", ""),
+        ("доброе", ""),
+        ("привет-привет", ""),
+        ("Привет, привет", ""),
+        ("спасибо большое за помощь", ""),
+        ("привет привет, как заказать такси?", "привет, как заказать такси?"),
+        ("Привет! Как дела у моего заказа", "Как дела у моего заказа"),
+        ("спасибо большое, а за помощь платить?", "а за помощь платить?"),
+        ("добрый, как заказать такси?", "как заказать такси?"),
+    ],
+)
+def test_short_repeated_and_filler_greetings(message, remainder):
+    """Повторы и слова-связки входят в приветствие, только если вопроса нет."""
+    match = parse_greeting(message)
+
+    assert match.is_greeting
+    assert match.remainder == remainder
+
+
+def test_short_greeting_with_typo_prefers_fuzzy_matching():
+    """Приветствие "добрый" с опечаткой во втором слове распознается целиком."""
+    match = parse_greeting("добрый днь")
+
+    assert match.pattern == "добрый день"
+    assert match.remainder == ""
+
+
+def test_greeting_with_typo_uses_fuzzy_matching():
+    """Приветствие с опечаткой распознается fuzzy matching."""
+    match = parse_greeting("добрй ден")
+
+    assert match.is_greeting
+    assert match.method.startswith("fuzzy_")
+    assert match.remainder == ""
+
+
+def test_batch_parsing_matches_single_parsing():
+    """Пакетный разбор дает те же результаты, что и поштучный."""
+    from utils.greetings import parse_greetings_batch
+
+    messages = ["привет", "добрй ден", "Как заказать такси?", "хелоу", "", "спасибо"]
+
+    assert parse_greetings_batch(messages) == [parse_greeting(m) for m in messages]
+
+
+def test_fuzzy_cache_is_bounded_lru_with_stats():
+    """Кэш fuzzy matching вытесняет старые записи, а не очищается целиком."""
+    from utils.fuzzy_greetings import (
+        _fuzzy_cache,
+        clear_fuzzy_cache,
+        fuzzy_greeting_match,
+        get_fuzzy_cache_stats,
+    )
+
+    clear_fuzzy_cache()
+    max_size = _fuzzy_cache.max_size
+    for i in range(max_size + 10):
+        fuzzy_greeting_match(f"сообщение {i}", ["привет"])
+    fuzzy_greeting_match(f"сообщение {max_size + 9}", ["привет"])
+    fuzzy_greeting_match(f"сообщение {max_size + 9}", ["привет", "пока"])
+
+    stats = get_fuzzy_cache_stats()
+    assert stats["cache_size"] == max_size
+    assert stats["evictions"] == 11
+    assert stats["hits"] == 1
+    assert stats["misses"] == max_size + 11
+    clear_fuzzy_cache()
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("привет", True),
+        ("хелло", True),
+        ("hello", True),
+        ("сәлем", True),
+        ("привет, у меня проблема", False),
+        ("что такое межгород", False),
+    ],
+)
+def test_potential_greeting_keywords(text, expected):
+    """Слова-приветствия и стоп-слова распознаются одним проходом."""
+    from utils.smart_normalize import is_potential_greeting
+
+    assert is_potential_greeting(text) is expected
+
+
+def test_english_and_kazakh_greetings_are_recognized():
+    """Английские и казахские приветствия из конфигурации используются."""
+    assert parse_greeting("Good morning!").pattern == "good morning"
+    assert parse_greeting("Сәлем, как оплатить?").remainder == "как оплатить?"
+
+
+def test_greeting_parser_does_not_rehash_patterns(monkeypatch):
+    """Версия набора паттернов вычисляется один раз, а не на каждом вызове."""
+    from utils import fuzzy_greetings
+    from utils.greetings import parse_greeting
+
+    def fail(patterns):
+        raise AssertionError("patterns_version вызван при разборе сообщения")
+
+    monkeypatch.setattr(fuzzy_greetings, "patterns_version", fail)
+    fuzzy_greetings.clear_fuzzy_cache()
+
+    assert parse_greeting("добрый днь").method.startswith("fuzzy")
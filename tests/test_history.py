@@ -0,0 +1,134 @@
+"""Тесты для истории диалогов тестовой консоли."""
+
+import json
+
+import pytest
+
+from test_console import history as history_module
+from test_console.history import HistoryManager, read_tail_lines
+
+
+def write_entries(path, count):
+    """Записывает в файл истории count записей."""
+    with open(path, "w", encoding="utf-8") as f:
+        for idx in range(count):
+            entry = {"question": f"вопрос {idx}", "answer": "ответ", "confidence": 0.9}
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def count_lines(path):
+    """Считает строки в файле."""
+    with open(path, "r", encoding="utf-8") as f:
+        return sum(1 for _ in f)
+
+
+def test_read_tail_lines_reads_only_last_entries(tmp_path):
+    """Чтение с конца возвращает последние строки при любом размере блока."""
+    path = tmp_path / "history.jsonl"
+    write_entries(path, 50)
+
+    for block_size in (16, 1024):
+        lines, reached_start = read_tail_lines(path, 10, block_size=block_size)
+        assert [json.loads(line)["question"] for line in lines] == [
+            f"вопрос {idx}" for idx in range(40, 50)
+        ]
+        assert not reached_start
+
+    lines, reached_start = read_tail_lines(path, 100)
+    assert len(lines) == 50
+    assert reached_start
+
+
+def test_add_entry_appends_and_compacts(tmp_path, monkeypatch):
+    """Записи дописываются в файл, а файл сжимается при превышении порога."""
+    monkeypatch.setattr(history_module, "MAX_HISTORY_ENTRIES", 5)
+    monkeypatch.setattr(history_module, "HISTORY_COMPACTION_FACTOR", 2)
+    path = tmp_path / "history.jsonl"
+    manager = HistoryManager(path)
+
+    for idx in range(10):
+        manager.add_entry(f"вопрос {idx}", "ответ", 0.9)
+    assert count_lines(path) == 10
+
+    manager.add_entry("вопрос 10", "ответ", 0.9)
+    assert count_lines(path) == 5
+
+    reloaded = HistoryManager(path)
+    assert [entry["question"] for entry in reloaded.history] == [
+        f"вопрос {idx}" for idx in range(6, 11)
+    ]
+
+
+def test_large_history_file_is_compacted_on_first_append(tmp_path, monkeypatch):
+    """Файл больше лимита загружается с конца и сжимается при первой записи."""
+    monkeypatch.setattr(history_module, "MAX_HISTORY_ENTRIES", 5)
+    path = tmp_path / "history.jsonl"
+    write_entries(path, 100)
+
+    manager = HistoryManager(path)
+    assert manager.history[0]["question"] == "вопрос 95"
+
+    manager.add_entry("новый вопрос", "ответ", 0.5)
+    assert count_lines(path) == 5
+
+
+@pytest.mark.parametrize("reload_before_append", [True, False])
+def test_truncated_tail_does_not_swallow_next_entry(tmp_path, reload_before_append):
+    """Запись после оборванной строки не склеивается с ней и не теряется."""
+    path = tmp_path / "history.jsonl"
+    manager = HistoryManager(path)
+    manager.add_entry("первый", "ответ", 0.9)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"question": "оборв')
+
+    if reload_before_append:
+        manager = HistoryManager(path)
+    manager.add_entry("второй", "ответ", 0.9)
+
+    reloaded = HistoryManager(path)
+    assert [entry["question"] for entry in reloaded.history] == ["первый", "второй"]
+
+
+def test_search_uses_index_and_matches_full_scan(tmp_path, monkeypatch):
+    """Поиск по индексу находит те же записи, что и полный просмотр."""
+    monkeypatch.setattr(history_module, "MAX_HISTORY_ENTRIES", 20)
+    manager = HistoryManager(tmp_path / "history.jsonl")
+    questions = ["Как заказать такси?", "Как отменить заказ", "Оплата картой"]
+    for idx in range(30):
+        manager.add_entry(questions[idx % 3], f"Ответ номер {idx}", 0.5)
+
+    for query in ["заказ", "Как отменить", "ответ номер 2", "карт", "нет такого"]:
+        expected = [
+            entry
+            for entry in manager.history
+            if query.lower() in entry["question"].lower()
+            or query.lower() in entry["answer"].lower()
+        ]
+        assert manager.search_history(query) == expected
+
+    # Удаленные из истории записи не попадают в результаты
+    assert manager.search_history("номер 5") == []
+
+
+def test_stats_are_maintained_incrementally(tmp_path, monkeypatch):
+    """Счетчики статистики учитывают добавление и вытеснение записей."""
+    monkeypatch.setattr(history_module, "MAX_HISTORY_ENTRIES", 3)
+    manager = HistoryManager(tmp_path / "history.jsonl")
+    for confidence in (0.9, 0.7, 0.3, 0.85):
+        manager.add_entry("вопрос", "ответ", confidence)
+
+    stats = manager.get_stats()
+
+    assert stats["total_questions"] == 3
+    assert stats["average_confidence"] == pytest.approx((0.7 + 0.3 + 0.85) / 3)
+    assert stats["high_confidence_count"] == 1
+    assert stats["medium_confidence_count"] == 1
+    assert stats["low_confidence_count"] == 1
+    reloaded = HistoryManager(tmp_path / "history.jsonl").get_stats()
+    assert reloaded == {
+        **stats,
+        "average_confidence": pytest.approx(stats["average_confidence"]),
+    }
+
+    manager.clear_history()
+    assert manager.get_stats()["total_questions"] == 0
@@ -0,0 +1,72 @@
+"""Тесты для метрик Prometheus и эндпоинта /metrics."""
+
+import asyncio
+
+import httpx
+
+from benchmarks.pipeline_bench import build_stub_engine
+from utils import ask_pipeline
+from utils.metrics import MetricsRegistry, ask_requests, stage_latency
+
+
+def test_histogram_buckets_are_cumulative():
+    """Корзины гистограммы накопительные, последняя - +Inf."""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency", "Задержка", ("stage",), (0.1, 1.0))
+
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, "encode")
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE latency histogram" in lines
+    assert 'latency_bucket{stage="encode",le="0.1"} 1' in lines
+    assert 'latency_bucket{stage="encode",le="1"} 2' in lines
+    assert 'latency_bucket{stage="encode",le="+Inf"} 3' in lines
+    assert 'latency_count{stage="encode"} 3' in lines
+    assert histogram.count("encode") == 3
+
+
+def test_counter_and_gauge_render_labels():
+    """Значения меток экранируются, gauge берет значения из collector."""
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Запросы", ("outcome",))
+    counter.inc('a"b')
+    counter.inc('a"b', amount=2)
+    registry.gauge("queue", "Очередь", ("writer",), collector=lambda: {("x",): 4})
+
+    text = registry.render()
+
+    assert 'requests_total{outcome="a\\"b"} 3' in text
+    assert 'queue{writer="x"} 4' in text
+
+
+def test_metrics_endpoint_counts_ask_requests(monkeypatch):
+    """Запросы /api/v1/ask считаются по source ответа и по этапам."""
+    from main import app
+    from utils.analytics import analytics_store
+
+    monkeypatch.setattr(ask_pipeline, "search_engine", build_stub_engine())
+    monkeypatch.setattr(analytics_store, "enabled", False)
+    greetings_before = ask_requests.value("greeting")
+    fallbacks_before = ask_requests.value("fallback_greeting")
+    total_before = stage_latency.count("total")
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            await c.post("/api/v1/ask", json={"query": "Привет"})
+            await c.post("/api/v1/ask", json={"query": "абвгд"})
+            return await c.get("/metrics")
+
+    response = asyncio.run(run())
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert ask_requests.value("greeting") == greetings_before + 1
+    assert ask_requests.value("fallback_greeting") == fallbacks_before + 1
+    assert stage_latency.count("total") == total_before + 2
+    assert 'faq_ask_requests_total{source="operator"}' in response.text
+    assert 'faq_encoder_queue_depth{model="main"} 0' in response.text
+    assert "faq_stage_duration_seconds_bucket" in response.text
+    assert 'faq_writer_queue_depth{writer="feedback"}' in response.text
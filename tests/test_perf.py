@@ -0,0 +1,51 @@
+"""Проверка бюджетов производительности этапов /api/v1/ask."""
+
+from pathlib import Path
+
+import pytest
+
+from benchmarks.common import load_baseline
+from benchmarks.pipeline_bench import (
+    BASELINE_FILE,
+    CALIBRATION,
+    STAGES,
+    build_queries,
+    build_stub_engine,
+    check_budgets,
+    run_stages,
+)
+
+
+def test_check_budgets_scales_by_calibration():
+    """На медленной машине бюджеты растут пропорционально калибровке."""
+    baseline = {
+        CALIBRATION: {"min_ns_per_op": 100.0},
+        "search": {"min_ns_per_op": 1000.0},
+    }
+    slow_machine = {
+        CALIBRATION: {"min_ns_per_op": 300.0},
+        "search": {"min_ns_per_op": 4500.0},
+    }
+    regressed = {
+        CALIBRATION: {"min_ns_per_op": 100.0},
+        "search": {"min_ns_per_op": 2500.0},
+    }
+
+    assert not check_budgets(slow_machine, baseline)[0]["regression"]
+    assert check_budgets(regressed, baseline)[0]["regression"]
+
+
+@pytest.mark.perf
+def test_pipeline_stages_within_budget():
+    """Ни один этап конвейера не замедлился сверх допуска."""
+    baseline = load_baseline(Path(BASELINE_FILE))
+    engine = build_stub_engine()
+
+    results = run_stages(engine, build_queries(size=50), repeats=3)
+    comparison = check_budgets(results, baseline)
+
+    assert {row["name"] for row in comparison} == set(STAGES)
+    regressions = [
+        f"{row['name']}: {row['ratio']:.2f}x" for row in comparison if row["regression"]
+    ]
+    assert not regressions, f"Регрессии производительности: {regressions}"
@@ -0,0 +1,89 @@
+"""Тесты для воспроизведения записанных диалогов."""
+
+import faiss
+
+from benchmarks import replay_dialogues
+from benchmarks.replay_dialogues import diff_results, replay
+from tests.test_search import KB_VECTORS, KNOWLEDGE_BASE, FakeModel, _unit
+from utils.search import SearchEngine
+
+
+class CountingModel(FakeModel):
+    """Модель, считающая вызовы encode."""
+
+    def __init__(self, vectors):
+        super().__init__(vectors)
+        self.calls = []
+
+    def encode(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        return super().encode(texts, **kwargs)
+
+
+MODEL = CountingModel(
+    {
+        "как заказать такси?": _unit([1.0]),
+        "как оплатить картой": _unit([0.0, 0.0, 1.0]),
+    }
+)
+
+
+class FakeSearchEngine(SearchEngine):
+    """Движок с моделью и индексом из тестовых данных."""
+
+    async def initialize(self):
+        self.model = MODEL
+        self.index = faiss.IndexFlatIP(KB_VECTORS.shape[1])
+        self.index.add(KB_VECTORS)
+        self.knowledge_base = KNOWLEDGE_BASE
+        self._is_initialized = True
+
+
+def test_replay_encodes_questions_in_one_batch(monkeypatch):
+    """Вопросы кодируются одной пачкой до прохода по конвейеру."""
+    monkeypatch.setattr(replay_dialogues, "SearchEngine", FakeSearchEngine)
+    MODEL.calls.clear()
+
+    replayed = replay(
+        ["Здравствуйте! Как заказать такси?", "как оплатить картой", "Привет"]
+    )
+
+    assert MODEL.calls == [["как заказать такси?", "как оплатить картой"]]
+    assert [result["source"] for result in replayed["results"]] == [
+        "q000",
+        "q002",
+        "greeting",
+    ]
+
+
+def test_diff_classifies_changes():
+    """Изменения ответов раскладываются по категориям."""
+    records = [
+        {"question": "a", "reply": "A", "source": "q000", "confidence": 0.9},
+        {"question": "b", "reply": "B", "source": "q001", "confidence": 0.9},
+        {"question": "c", "reply": "C", "source": None, "confidence": 0.7},
+        {"question": "d", "reply": "D", "source": "q002", "confidence": 0.9},
+        {"question": "e", "reply": "E", "source": "q002", "confidence": 0.9},
+        {"question": "f", "reply": None, "source": None, "confidence": None},
+    ]
+    results = [
+        {"reply": "A", "source": "q000", "confidence": 0.91},
+        {"reply": "X", "source": None, "confidence": 0.7},
+        {"reply": "C2", "source": "q001", "confidence": 0.85},
+        {"reply": "D2", "source": "q001", "confidence": 0.9},
+        {"reply": "E", "source": "q002", "confidence": 0.8},
+        {"reply": "F", "source": "q000", "confidence": 0.9},
+    ]
+
+    report = diff_results(records, results)
+
+    assert report["totals"] == {
+        "changed": 1,
+        "newly_escalated": 1,
+        "newly_resolved": 1,
+        "confidence_drift": 1,
+        "replayed": 6,
+        "unchanged": 1,
+        "not_recorded": 1,
+    }
+    assert report["newly_escalated"][0]["question"] == "b"
@@ -0,0 +1,85 @@
+"""Тесты для оценки качества поиска."""
+
+import json
+
+import pytest
+
+from benchmarks.retrieval_eval import build_eval_set, evaluate_engine, parse_config
+from tests.test_search import AMBIGUOUS_QUERY, AMBIGUOUS_VECTORS, _unit, make_engine
+
+
+def test_build_eval_set_from_kb_and_feedback(tmp_path):
+    """Набор содержит варианты вопросов базы и запросы с 👍."""
+    kb = tmp_path / "kb.jsonl"
+    kb.write_text(
+        json.dumps({"id": "q000", "question": "Как заказать такси?"}) + "\n",
+        encoding="utf-8",
+    )
+    feedback = tmp_path / "feedback.log"
+    feedback.write_text(
+        json.dumps({"query": "заказ такси", "answer_id": "q000", "feedback": "👍"})
+        + "\n"
+        + json.dumps({"query": "плохо", "answer_id": "q000", "feedback": "👎"})
+        + "\n",
+        encoding="utf-8",
+    )
+
+    eval_set = build_eval_set(str(kb), str(feedback))
+
+    assert {item["origin"] for item in eval_set} == {
+        "plain",
+        "typo",
+        "greeting",
+        "feedback",
+    }
+    assert all(item["expected_id"] == "q000" for item in eval_set)
+    assert eval_set[0]["query"] == "как заказать такси"
+
+
+@pytest.mark.asyncio
+async def test_evaluate_engine_metrics():
+    """Метрики учитывают ранг ожидаемой записи и решение по порогам."""
+    engine = make_engine(
+        {
+            "такси": _unit([1.0, 0.1]),
+            "отменить": _unit([0.3, 0.2, 1.0]),
+            "погода": _unit([0.1, 0.1, 0.1, 1.0]),
+            **AMBIGUOUS_VECTORS,
+        }
+    )
+    eval_set = [
+        {"query": "такси", "expected_id": "q000"},
+        {"query": "отменить", "expected_id": "q001"},
+        {"query": AMBIGUOUS_QUERY, "expected_id": "q000", "expected_level": "medium"},
+        {"query": "погода", "expected_id": None},
+    ]
+
+    metrics = await evaluate_engine(engine, eval_set)
+
+    assert metrics["recall_at_1"] == pytest.approx(2 / 3)
+    assert metrics["recall_at_3"] == 1.0
+    assert metrics["mrr"] == pytest.approx((1 + 1 / 3 + 1) / 3)
+    assert metrics["decision_accuracy"] == pytest.approx(3 / 4)
+    assert metrics["p50_ms"] >= 0
+
+
+def test_parse_config():
+    """Описание конфигурации разбирается в аргументы движка."""
+    config = parse_config("sq8:data_sq8:reranker")
+
+    assert config["name"] == "sq8"
+    assert config["engine_kwargs"] == {
+        "data_dir": "data_sq8",
+        "enable_reranker": True,
+        "enable_cascade": False,
+    }
+    assert parse_config("hash:data_hashing:hashing")["engine_kwargs"] == {
+        "data_dir": "data_hashing",
+        "enable_reranker": False,
+        "enable_cascade": False,
+        "encoder_backend": "hashing",
+    }
+    with pytest.raises(ValueError):
+        parse_config("bad:data:gpu")
+    with pytest.raises(ValueError):
+        parse_config("bad:data:hashing:model-server")
@@ -0,0 +1,115 @@
+"""Тесты для генератора синтетической базы и бенчмарка масштабирования."""
+
+from benchmarks.scaling_bench import recommend, run_scaling
+from benchmarks.synthetic_kb import (
+    synthesize_entries,
+    synthetic_vectors,
+    write_dataset,
+)
+from utils.search import SearchEngine
+
+SEED_ENTRIES = [
+    {"question": "Как заказать такси?", "answer": "Через приложение"},
+    {"question": "Как отменить заказ?", "answer": "Нажмите отмена"},
+]
+
+
+def test_synthesize_entries_are_unique_paraphrases():
+    """Синтезированные вопросы уникальны и сохраняют ответ исходной записи."""
+    entries = synthesize_entries(SEED_ENTRIES, 500)
+
+    assert len(entries) == 500
+    assert len({entry["question"] for entry in entries}) == 500
+    assert entries[0]["question"] == "Как заказать такси?"
+    assert all(
+        entry["answer"] == SEED_ENTRIES[entry["seed_index"]]["answer"]
+        for entry in entries
+    )
+
+
+def test_synthetic_dataset_loads_into_engine(tmp_path):
+    """Движок загружает собранную директорию со сжатым индексом."""
+    entries = synthesize_entries(SEED_ENTRIES, 200)
+    vectors = synthetic_vectors(200, dim=32)
+
+    info = write_dataset(str(tmp_path), entries, vectors, quantization="sq8")
+    engine = SearchEngine(data_dir=str(tmp_path))
+    engine.load_data()
+
+    assert info["vectors_bytes"] > 0
+    assert engine.quantization == "sq8"
+    assert engine.index.ntotal == 200
+    assert engine.vectors.shape == (200, 32)
+    assert len(engine.knowledge_base) == 200
+
+
+def test_dataset_rebuild_removes_stale_artifacts(tmp_path):
+    """Пересборка без сжатия и PCA удаляет векторы и проекцию прошлой сборки."""
+    entries = synthesize_entries(SEED_ENTRIES, 100)
+    vectors = synthetic_vectors(100, dim=32)
+    write_dataset(
+        str(tmp_path),
+        entries,
+        vectors,
+        quantization="sq8",
+        reduction="pca",
+        reduced_dim=16,
+    )
+
+    write_dataset(str(tmp_path), entries, vectors)
+    engine = SearchEngine(data_dir=str(tmp_path))
+    engine.load_data()
+
+    assert not (tmp_path / "vectors.npy").exists()
+    assert not (tmp_path / "projection.npz").exists()
+    assert engine.projection is None
+    assert engine.index.d == 32
+
+
+def test_run_scaling_reports_every_config(tmp_path):
+    """Бенчмарк возвращает строку на каждую пару (размер, конфигурация)."""
+    rows = run_scaling(
+        [300],
+        ["flat", "binary", "pca"],
+        dim=32,
+        num_queries=20,
+        workdir=str(tmp_path),
+        reduced_dim=16,
+    )
+
+    assert [row["config"] for row in rows] == ["flat", "binary", "pca"]
+    flat = rows[0]
+    assert flat["recall_at_1"] == 1.0
+    assert flat["count"] == 20
+    assert rows[2]["dimension"] == 16
+
+
+def test_recommend_respects_recall_and_memory_budget():
+    """Рекомендация учитывает минимальный recall@1 и бюджет памяти."""
+    rows = [
+        {
+            "size": 1000,
+            "config": "flat",
+            "recall_at_1": 1.0,
+            "p95_ms": 5.0,
+            "index_bytes": 4000,
+        },
+        {
+            "size": 1000,
+            "config": "sq8",
+            "recall_at_1": 0.99,
+            "p95_ms": 2.0,
+            "index_bytes": 1000,
+        },
+        {
+            "size": 1000,
+            "config": "binary",
+            "recall_at_1": 0.8,
+            "p95_ms": 0.5,
+            "index_bytes": 100,
+        },
+    ]
+
+    assert recommend(rows)[1000]["config"] == "sq8"
+    assert recommend(rows, memory_budget_bytes=500)[1000]["config"] == "flat"
+    assert recommend(rows, min_recall=0.7)[1000]["config"] == "binary"
@@ -0,0 +1,285 @@
+"""Тесты для поискового движка."""
+
+import asyncio
+import threading
+from typing import Dict, List
+
+import faiss
+import numpy as np
+import pytest
+
+from utils.reranker import CrossEncoderReranker
+from utils.search import SearchEngine
+
+KNOWLEDGE_BASE = [
+    {"id": "q000", "question": "как заказать такси", "answer": "Через приложение"},
+    {"id": "q001", "question": "как отменить заказ", "answer": "Нажмите отмена"},
+    {"id": "q002", "question": "как оплатить картой", "answer": "Привяжите карту"},
+]
+
+# Вектора базы знаний: ортонормированный базис
+KB_VECTORS = np.eye(3, 8, dtype="float32")
+
+
+def _unit(vector: List[float]) -> np.ndarray:
+    """Возвращает нормированный вектор размерности 8."""
+    array = np.zeros(8, dtype="float32")
+    array[: len(vector)] = vector
+    return array / np.linalg.norm(array)
+
+
+class FakeModel:
+    """Модель эмбеддингов с заранее заданными векторами."""
+
+    def __init__(self, vectors: Dict[str, np.ndarray]) -> None:
+        self.vectors = vectors
+
+    def encode(self, texts: List[str], **kwargs) -> np.ndarray:
+        return np.stack([self.vectors[text] for text in texts]).astype("float32")
+
+
+class FakeCrossEncoder:
+    """Cross-encoder с заранее заданными оценками по вопросу."""
+
+    def __init__(self, scores: Dict[str, float]) -> None:
+        self.scores = scores
+        self.calls = 0
+
+    def predict(self, pairs, **kwargs) -> np.ndarray:
+        self.calls += 1
+        return np.array([self.scores[question] for _, question in pairs])
+
+
+def make_engine(vectors: Dict[str, np.ndarray], **kwargs) -> SearchEngine:
+    """Создает инициализированный движок без загрузки моделей с диска."""
+    engine = SearchEngine(**kwargs)
+    engine.model = FakeModel(vectors)
+    engine.index = faiss.IndexFlatIP(KB_VECTORS.shape[1])
+    engine.index.add(KB_VECTORS)
+    engine.knowledge_base = KNOWLEDGE_BASE
+    engine._is_initialized = True
+    return engine
+
+
+# Запрос в зоне средней уверенности: сходство ~0.7 с q000 и ~0.65 с q001
+AMBIGUOUS_QUERY = "такси заказ"
+AMBIGUOUS_VECTORS = {AMBIGUOUS_QUERY: _unit([0.7, 0.65, 0.1, 0.28])}
+
+
+@pytest.mark.asyncio
+async def test_medium_confidence_without_reranker_asks_clarification():
+    """Без reranker средняя уверенность приводит к уточнению."""
+    engine = make_engine(AMBIGUOUS_VECTORS)
+
+    result = await engine.find_best_answer(AMBIGUOUS_QUERY)
+
+    assert result["source"] is None
+    assert result["similar_questions"][0] == "как заказать такси"
+
+
+@pytest.mark.asyncio
+async def test_reranker_resolves_medium_confidence():
+    """Уверенный reranker сразу возвращает ответ и кэширует оценки."""
+    engine = make_engine(AMBIGUOUS_VECTORS)
+    cross_encoder = FakeCrossEncoder(
+        {
+            "как заказать такси": 0.3,
+            "как отменить заказ": 0.95,
+            "как оплатить картой": 0.1,
+        }
+    )
+    engine.reranker = CrossEncoderReranker()
+    engine.reranker.model = cross_encoder
+
+    first = await engine.find_best_answer(AMBIGUOUS_QUERY)
+    second = await engine.find_best_answer(AMBIGUOUS_QUERY)
+
+    assert first["source"] == "q001"
+    assert first["confidence"] == pytest.approx(0.95)
+    assert second == first
+    assert cross_encoder.calls == 1
+    assert engine.reranker.get_stats()["cache"]["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_reranker_without_margin_keeps_clarification():
+    """При близких оценках reranker уточнение сохраняется."""
+    engine = make_engine(AMBIGUOUS_VECTORS)
+    engine.reranker = CrossEncoderReranker()
+    engine.reranker.model = FakeCrossEncoder(
+        {
+            "как заказать такси": 0.9,
+            "как отменить заказ": 0.88,
+            "как оплатить картой": 0.1,
+        }
+    )
+
+    result = await engine.find_best_answer(AMBIGUOUS_QUERY)
+
+    assert result["source"] is None
+    assert len(result["similar_questions"]) == 3
+
+
+class SlowCrossEncoder(FakeCrossEncoder):
+    """Cross-encoder, отвечающий только после сигнала теста."""
+
+    def __init__(self, scores: Dict[str, float]) -> None:
+        super().__init__(scores)
+        self.release = threading.Event()
+
+    def predict(self, pairs, **kwargs) -> np.ndarray:
+        self.release.wait(timeout=5)
+        return super().predict(pairs, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_slow_reranker_falls_back_to_first_stage():
+    """Reranker за бюджетом времени не блокирует ответ и не копит потоки."""
+    engine = make_engine(AMBIGUOUS_VECTORS)
+    cross_encoder = SlowCrossEncoder(
+        {
+            "как заказать такси": 0.3,
+            "как отменить заказ": 0.95,
+            "как оплатить картой": 0.1,
+        }
+    )
+    engine.reranker = CrossEncoderReranker(timeout=0.05, max_in_flight=1)
+    engine.reranker.model = cross_encoder
+
+    first = await engine.find_best_answer(AMBIGUOUS_QUERY)
+    second = await engine.find_best_answer(AMBIGUOUS_QUERY)
+    stats = engine.reranker.get_stats()
+
+    assert first == second
+    assert first["source"] is None
+    assert first["confidence"] == pytest.approx(0.7, abs=0.01)
+    assert len(first["similar_questions"]) == 3
+    assert stats["timeouts"] == 1
+    assert stats["skipped_busy"] == 1
+
+    # Поздний результат попадает в кэш, когда поток освобождается
+    cross_encoder.release.set()
+    while engine.reranker._in_flight:
+        await asyncio.sleep(0.01)
+    third = await engine.find_best_answer(AMBIGUOUS_QUERY)
+
+    assert third["source"] == "q001"
+    assert cross_encoder.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_cascade_answers_confident_queries_with_small_model():
+    """Уверенная быстрая модель отвечает без обращения к основной."""
+    engine = make_engine({})
+    engine.cascade_model = FakeModel({"заказать такси": _unit([1.0, 0.1])})
+    engine.cascade_index = engine.index
+
+    result = await engine.find_best_answer("заказать такси")
+    stats = engine.get_cascade_stats()
+
+    assert result["source"] == "q000"
+    assert stats["queries"] == 1
+    assert stats["escalations"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cascade_escalates_uncertain_queries():
+    """Неуверенный ответ быстрой модели эскалируется к основной."""
+    engine = make_engine({"оплата": _unit([0.05, 0.0, 1.0])})
+    engine.cascade_model = FakeModel({"оплата": _unit([0.6, 0.5, 0.4])})
+    engine.cascade_index = engine.index
+
+    result = await engine.find_best_answer("оплата")
+    stats = engine.get_cascade_stats()
+
+    assert result["source"] == "q002"
+    assert stats["escalations"] == 1
+    assert stats["escalation_rate"] == 1.0
+
+
+@pytest.mark.asyncio
+async def test_cascade_confidence_is_calibrated_to_main_scale():
+    """Порог и confidence каскада применяются к оценкам в шкале bge-m3."""
+    query_vector = _unit([0.9, np.sqrt(1 - 0.81)])
+
+    engine = make_engine({})
+    engine.cascade_model = FakeModel({"заказать такси": query_vector})
+    engine.cascade_index = engine.index
+    engine.cascade_calibration = (0.5, 0.5)
+    accepted = await engine.find_best_answer("заказать такси")
+
+    strict = make_engine({"заказать такси": _unit([1.0])})
+    strict.cascade_model = FakeModel({"заказать такси": query_vector})
+    strict.cascade_index = strict.index
+    strict.cascade_calibration = (1.0, -0.1)
+    escalated = await strict.find_best_answer("заказать такси")
+
+    assert accepted["source"] == "q000"
+    assert accepted["confidence"] == pytest.approx(0.95, abs=1e-4)
+    assert strict.get_cascade_stats()["escalations"] == 1
+    assert escalated["confidence"] == pytest.approx(1.0)
+
+
+def test_cascade_calibration_of_identical_models_is_identity():
+    """Для одинаковых эмбеддингов калибровка не меняет оценки."""
+    from utils.excel_converter import ExcelToVectorDBConverter
+
+    vectors = np.random.default_rng(0).normal(size=(200, 16)).astype("float32")
+    faiss.normalize_L2(vectors)
+
+    calibration = ExcelToVectorDBConverter().calibrate_cascade(vectors, vectors)
+
+    assert calibration["slope"] == pytest.approx(1.0, abs=1e-3)
+    assert calibration["intercept"] == pytest.approx(0.0, abs=1e-3)
+
+
+@pytest.mark.parametrize("quantization", ["fp16", "sq8", "binary"])
+def test_quantized_index_rescoring_matches_flat_index(quantization):
+    """Сжатый индекс с переоценкой возвращает точные сходства плоского индекса."""
+    from utils.excel_converter import ExcelToVectorDBConverter
+
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(500, 64)).astype("float32")
+    converter = ExcelToVectorDBConverter()
+    flat_index = converter.build_faiss_index(vectors.copy())
+
+    engine = SearchEngine()
+    engine.index = converter.build_faiss_index(vectors, quantization)
+    engine.quantization = quantization
+    engine.vectors = vectors
+
+    # Запросы - зашумленные копии векторов базы, как перефразированные вопросы
+    queries = vectors[:20] + 0.05 * rng.normal(size=(20, 64)).astype("float32")
+    faiss.normalize_L2(queries)
+    for query in queries:
+        expected_scores, expected_ids = flat_index.search(query[None, :], 3)
+        scores, ids = engine._search_index(query[None, :], 3)
+
+        assert ids[0][0] == expected_ids[0][0]
+        assert scores[0][0] == pytest.approx(expected_scores[0][0], abs=1e-5)
+
+
+def test_neighbor_graph_excludes_entry_itself():
+    """Граф соседей не содержит саму запись и отсортирован по сходству."""
+    from utils.excel_converter import ExcelToVectorDBConverter
+
+    vectors = np.stack([_unit([1.0]), _unit([0.9, 0.1]), _unit([0.0, 0.0, 1.0])])
+    graph = ExcelToVectorDBConverter().build_neighbor_graph(
+        vectors, ["q000", "q001", "q002"], top_k=2
+    )
+
+    assert [neighbor["id"] for neighbor in graph["q000"]] == ["q001", "q002"]
+    assert graph["q000"][0]["score"] > graph["q000"][1]["score"]
+
+
+def test_related_questions_use_precomputed_graph():
+    """Похожие вопросы берутся из графа без обращения к модели."""
+    engine = make_engine({})
+    engine.kb_by_id = {entry["id"]: entry for entry in KNOWLEDGE_BASE}
+    engine.neighbors = {"q000": [{"id": "q001", "score": 0.7}]}
+
+    assert engine.get_related_questions("q000") == [
+        {"id": "q001", "question": "как отменить заказ", "score": 0.7}
+    ]
+    assert engine.get_related_questions("q002") == []
+    assert engine.get_related_questions("q999") is None
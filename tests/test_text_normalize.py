@@ -0,0 +1,44 @@
+"""Тесты для единого модуля нормализации текста."""
+
+from utils import text_normalize
+from utils.text_normalize import normalization_scope, normalize_text_forms
+
+
+def test_forms_are_computed_together():
+    """Формы для поиска, приветствий и fuzzy matching вычисляются вместе."""
+    forms = normalize_text_forms("  Приветт   в  службу!!  ")
+
+    assert forms.search == "приветт в службу!!"
+    assert forms.greeting == "привет в службу"
+    assert forms.fuzzy == "привет службу"
+
+
+def test_common_fixes_apply_to_whole_text():
+    """Частые опечатки исправляются только при точном совпадении."""
+    assert normalize_text_forms("Здраствуйте").greeting == "здравствуйте"
+    assert normalize_text_forms("Добрый ден!").greeting == "добрый день"
+
+
+def test_empty_text():
+    """Пустой текст дает пустые формы."""
+    assert normalize_text_forms("") == ("", "", "")
+    assert normalize_text_forms(None) == ("", "", "")
+
+
+def test_request_scope_reuses_forms(monkeypatch):
+    """В рамках запроса повторная нормализация не пересчитывает формы."""
+    calls = []
+    original = text_normalize._compute_forms
+
+    def counting(text):
+        calls.append(text)
+        return original(text)
+
+    monkeypatch.setattr(text_normalize, "_compute_forms", counting)
+
+    with normalization_scope():
+        first = normalize_text_forms("как заказать такси")
+        second = normalize_text_forms("как заказать такси")
+
+    assert first is second
+    assert calls == ["как заказать такси"]
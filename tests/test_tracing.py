@@ -0,0 +1,104 @@
+"""Тесты для Server-Timing, отладочной трассировки и request id в логах."""
+
+import asyncio
+import logging
+
+import httpx
+import pytest
+
+import routers.ask
+from benchmarks.pipeline_bench import build_stub_engine
+from utils import ask_pipeline
+from utils.tracing import RequestTrace, get_request_id, request_trace
+
+
+@pytest.fixture
+def app(monkeypatch):
+    """Приложение с движком на заглушке эмбеддингов и без записи аналитики."""
+    from main import app
+    from utils.analytics import analytics_store
+
+    monkeypatch.setattr(ask_pipeline, "search_engine", build_stub_engine())
+    monkeypatch.setattr(analytics_store, "enabled", False)
+    return app
+
+
+def ask(app, query, params=None, headers=None) -> httpx.Response:
+    """Отправляет запрос в /api/v1/ask через ASGI."""
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://t") as c:
+            return await c.post(
+                "/api/v1/ask", json={"query": query}, params=params, headers=headers
+            )
+
+    return asyncio.run(run())
+
+
+def test_server_timing_format():
+    """Этапы и общее время в миллисекундах, повторные этапы суммируются."""
+    trace = RequestTrace("id")
+    trace.add_stage("encode", 0.002)
+    trace.add_stage("encode", 0.001)
+
+    timing = trace.server_timing()
+
+    assert timing.startswith("encode;dur=3.00, total;dur=")
+
+
+def test_request_trace_generates_request_id():
+    """Без middleware request id генерируется на время запроса."""
+    with request_trace() as trace:
+        assert get_request_id() == trace.request_id != "-"
+    assert get_request_id() == "-"
+
+
+def test_ask_returns_server_timing_and_request_id(app):
+    """Ответ содержит Server-Timing по этапам и переданный X-Request-ID."""
+    response = ask(app, "Как заказать такси?", headers={"X-Request-ID": "req-42"})
+
+    stages = [
+        item.split(";")[0] for item in response.headers["server-timing"].split(", ")
+    ]
+
+    assert response.headers["x-request-id"] == "req-42"
+    assert {"greeting", "encode", "search", "total"} <= set(stages)
+    assert "trace" not in response.json()
+
+
+def test_debug_trace_requires_config_flag(app):
+    """Без ENABLE_DEBUG_TRACE параметр debug игнорируется."""
+    response = ask(app, "абвгд", params={"debug": "true"})
+
+    assert "trace" not in response.json()
+
+
+def test_debug_trace_payload(app, monkeypatch):
+    """В режиме отладки ответ содержит кандидатов FAISS, кэши и этапы."""
+    monkeypatch.setattr(routers.ask, "ENABLE_DEBUG_TRACE", True)
+
+    trace = ask(app, "абвгд", params={"debug": "true"}).json()["trace"]
+
+    assert trace["outcome"] == "fallback"
+    assert trace["greeting_method"] == "no_match"
+    assert trace["caches"]["normalize"] in ("hit", "miss")
+    assert len(trace["candidates"]) == 3
+    assert {"id", "score"} == set(trace["candidates"][0])
+    assert "encode" in trace["stages_ms"]
+
+    greeting = ask(app, "Привет", params={"debug": "true"}).json()["trace"]
+    assert greeting["fast_path"] == "greeting"
+
+
+def test_request_id_in_log_records(app, caplog):
+    """Записи логов приветствий и поиска помечены request id запроса."""
+    with caplog.at_level(logging.INFO):
+        ask(app, "Привет, как заказать такси?", headers={"X-Request-ID": "slow-1"})
+
+    loggers = {
+        record.name
+        for record in caplog.records
+        if getattr(record, "request_id", None) == "slow-1"
+    }
+    assert {"utils.greetings", "utils.search"} <= loggers
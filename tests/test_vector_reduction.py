@@ -0,0 +1,72 @@
+"""Тесты для снижения размерности векторов."""
+
+import logging
+
+import numpy as np
+import pytest
+
+from utils.vector_reduction import (
+    VectorProjection,
+    cross_validate_reduction,
+    reduction_report,
+)
+
+
+@pytest.fixture
+def embeddings():
+    """Нормализованные векторы с энергией в первых 16 измерениях."""
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(200, 64)).astype("float32")
+    vectors[:, 16:] *= 0.05
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_pca_projection_preserves_neighbours(embeddings, tmp_path):
+    """PCA сохраняет соседей и переживает сохранение на диск."""
+    projection = VectorProjection.fit(embeddings, "pca", 16)
+    projection.save(str(tmp_path / "projection.npz"))
+    loaded = VectorProjection.load(str(tmp_path / "projection.npz"))
+
+    reduced = loaded.apply(embeddings)
+    report = cross_validate_reduction(embeddings, "pca", 16, top_k=5, folds=5)
+
+    assert loaded.method == "pca"
+    assert reduced.shape == (200, 16)
+    assert np.allclose(np.linalg.norm(reduced, axis=1), 1.0, atol=1e-5)
+    assert report["queries"] == 200
+    assert report["recall_at_k"] > 0.8
+    assert report["mean_score_drift"] < 0.05
+
+
+def test_report_on_training_vectors_is_optimistic(caplog):
+    """PCA по всем векторам воспроизводит их точно, оценка на отложенных - нет."""
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(40, 64)).astype("float32")
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    with caplog.at_level(logging.WARNING):
+        projection = VectorProjection.fit(vectors, "pca", 48)
+    in_sample = reduction_report(vectors, projection, top_k=5)
+    held_out = cross_validate_reduction(vectors, "pca", 40, top_k=5, folds=5)
+
+    assert projection.output_dim == 40
+    assert "PCA ограничена 40 компонентами" in caplog.text
+    assert in_sample["recall_at_k"] == 1.0
+    assert in_sample["max_score_drift"] < 1e-4
+    assert held_out["recall_at_k"] < 1.0
+    assert held_out["mean_score_drift"] > 0.01
+
+
+def test_truncate_projection_keeps_prefix(embeddings):
+    """Усечение оставляет префикс вектора."""
+    projection = VectorProjection.fit(embeddings, "truncate", 8)
+    reduced = projection.apply(embeddings[:1])
+    expected = embeddings[0, :8] / np.linalg.norm(embeddings[0, :8])
+
+    assert np.allclose(reduced[0], expected, atol=1e-6)
+
+
+def test_unknown_reduction_method_is_rejected(embeddings):
+    """Неизвестный метод снижения размерности отклоняется."""
+    with pytest.raises(ValueError):
+        VectorProjection.fit(embeddings, "svd", 8)
@@ -0,0 +1,374 @@
+"""Встроенное хранилище аналитики вопросов, ответов и обратной связи."""
+
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .batch_writer import BackgroundBatchWriter
+from .storage_config import (
+    ANALYTICS_BATCH_SIZE,
+    ANALYTICS_DB_FILE,
+    ANALYTICS_FLUSH_INTERVAL,
+    ANALYTICS_QUEUE_SIZE,
+    ENABLE_ANALYTICS,
+)
+from .text_normalize import normalize_text_forms
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Исходы обработки вопроса
+OUTCOME_ANSWER = "answer"
+OUTCOME_CLARIFICATION = "clarification"
+OUTCOME_FALLBACK = "fallback"
+OUTCOME_GREETING = "greeting"
+OUTCOME_OPERATOR = "operator"
+UNANSWERED_OUTCOMES = (OUTCOME_CLARIFICATION, OUTCOME_FALLBACK, OUTCOME_OPERATOR)
+
+# Количество корзин гистограммы уверенности (ширина 0.1)
+CONFIDENCE_BUCKETS = 10
+
+# Сырые события хранятся для запросов за период, агрегаты за все время
+# поддерживаются при записи, поэтому их чтение не зависит от числа строк
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    query TEXT NOT NULL,
+    normalized TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    source TEXT,
+    confidence REAL NOT NULL,
+    confidence_bucket INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_questions_ts ON questions(ts);
+CREATE INDEX IF NOT EXISTS idx_questions_source ON questions(source);
+CREATE INDEX IF NOT EXISTS idx_questions_bucket
+    ON questions(confidence_bucket, ts);
+
+CREATE TABLE IF NOT EXISTS feedback (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    query TEXT NOT NULL,
+    answer_id TEXT,
+    positive INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_feedback_ts ON feedback(ts);
+CREATE INDEX IF NOT EXISTS idx_feedback_answer ON feedback(answer_id);
+
+CREATE TABLE IF NOT EXISTS unanswered_questions (
+    normalized TEXT PRIMARY KEY,
+    query TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    last_ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_unanswered_count
+    ON unanswered_questions(count);
+
+CREATE TABLE IF NOT EXISTS answer_feedback (
+    answer_id TEXT PRIMARY KEY,
+    positive INTEGER NOT NULL,
+    negative INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS confidence_histogram (
+    bucket INTEGER PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+"""
+
+
+def confidence_bucket(confidence: float) -> int:
+    """Возвращает номер корзины гистограммы для уровня уверенности."""
+    return min(max(int(confidence * CONFIDENCE_BUCKETS), 0), CONFIDENCE_BUCKETS - 1)
+
+
+class AnalyticsStore(BackgroundBatchWriter):
+    """Хранилище аналитики в SQLite, пополняемое в фоновой задаче."""
+
+    def __init__(
+        self,
+        db_path: str = ANALYTICS_DB_FILE,
+        enabled: bool = ENABLE_ANALYTICS,
+        batch_size: int = ANALYTICS_BATCH_SIZE,
+        queue_size: int = ANALYTICS_QUEUE_SIZE,
+        flush_interval: float = ANALYTICS_FLUSH_INTERVAL,
+    ) -> None:
+        """
+        Инициализирует хранилище аналитики.
+
+        Args:
+            db_path: Путь к файлу базы SQLite
+            enabled: Записывать ли события
+            batch_size: Максимум записей в одной транзакции
+            queue_size: Максимальный размер очереди в памяти
+            flush_interval: Интервал простоя перед checkpoint WAL
+        """
+        super().__init__(batch_size, queue_size, flush_interval)
+        self.db_path = Path(db_path)
+        self.enabled = enabled
+        self._write_conn: Optional[sqlite3.Connection] = None
+        self._read_conn: Optional[sqlite3.Connection] = None
+        self._write_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Открывает соединение с базой и создает схему."""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        # WAL: чтение отчетов не блокирует запись событий
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def _writer(self) -> sqlite3.Connection:
+        """Возвращает соединение для записи."""
+        if self._write_conn is None:
+            self._write_conn = self._connect()
+        return self._write_conn
+
+    def _reader(self) -> sqlite3.Connection:
+        """Возвращает соединение для чтения."""
+        if self._read_conn is None:
+            self._read_conn = self._connect()
+        return self._read_conn
+
+    async def record_question(
+        self,
+        query: str,
+        outcome: str,
+        confidence: float,
+        source: Optional[str] = None,
+    ) -> None:
+        """
+        Ставит в очередь событие обработки вопроса.
+
+        Args:
+            query: Вопрос пользователя
+            outcome: Исход обработки (answer, clarification, fallback, greeting)
+            confidence: Уверенность поиска
+            source: ID записи базы знаний, если найден ответ
+        """
+        if not self.enabled:
+            return
+        await self.submit(
+            {
+                "kind": "question",
+                "ts": time.time(),
+                "query": query,
+                "outcome": outcome,
+                "confidence": confidence,
+                "source": source,
+            }
+        )
+
+    async def record_feedback(
+        self, query: str, answer_id: Optional[str], feedback: str
+    ) -> None:
+        """
+        Ставит в очередь событие обратной связи.
+
+        Args:
+            query: Вопрос пользователя
+            answer_id: ID ответа
+            feedback: Оценка (👍 или 👎)
+        """
+        if not self.enabled:
+            return
+        await self.submit(
+            {
+                "kind": "feedback",
+                "ts": time.time(),
+                "query": query,
+                "answer_id": answer_id,
+                "positive": feedback == "👍",
+            }
+        )
+
+    def write_batch(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Записывает пачку событий и обновляет агрегаты в одной транзакции.
+
+        Args:
+            records: События вопросов и обратной связи
+        """
+        questions = []
+        unanswered = []
+        buckets = []
+        feedback = []
+        votes = []
+        for record in records:
+            if record["kind"] == "question":
+                # Вопросы, различающиеся только регистром, пробелами
+                # и конечной пунктуацией, считаются одним вопросом
+                normalized = normalize_text_forms(record["query"]).search
+                normalized = normalized.rstrip("?!. ")
+                bucket = confidence_bucket(record["confidence"])
+                questions.append(
+                    (
+                        record["ts"],
+                        record["query"],
+                        normalized,
+                        record["outcome"],
+                        record["source"],
+                        record["confidence"],
+                        bucket,
+                    )
+                )
+                # Приветствия обрабатываются без поиска: их уверенность 1.0
+                # не относится к качеству поиска
+                if record["outcome"] != OUTCOME_GREETING:
+                    buckets.append((bucket,))
+                if record["outcome"] in UNANSWERED_OUTCOMES:
+                    unanswered.append((normalized, record["query"], record["ts"]))
+            elif record["kind"] == "feedback":
+                positive = int(record["positive"])
+                feedback.append(
+                    (record["ts"], record["query"], record["answer_id"], positive)
+                )
+                if record["answer_id"]:
+                    votes.append((record["answer_id"], positive, 1 - positive))
+
+        with self._write_lock:
+            conn = self._writer()
+            with conn:
+                conn.executemany(
+                    "INSERT INTO questions (ts, query, normalized, outcome, source, "
+                    "confidence, confidence_bucket) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    questions,
+                )
+                conn.executemany(
+                    "INSERT INTO confidence_histogram (bucket, count) VALUES (?, 1) "
+                    "ON CONFLICT(bucket) DO UPDATE SET count = count + 1",
+                    buckets,
+                )
+                conn.executemany(
+                    "INSERT INTO unanswered_questions (normalized, query, count, "
+                    "last_ts) VALUES (?, ?, 1, ?) ON CONFLICT(normalized) DO UPDATE "
+                    "SET count = count + 1, query = excluded.query, "
+                    "last_ts = excluded.last_ts",
+                    unanswered,
+                )
+                conn.executemany(
+                    "INSERT INTO feedback (ts, query, answer_id, positive) "
+                    "VALUES (?, ?, ?, ?)",
+                    feedback,
+                )
+                conn.executemany(
+                    "INSERT INTO answer_feedback (answer_id, positive, negative) "
+                    "VALUES (?, ?, ?) ON CONFLICT(answer_id) DO UPDATE SET "
+                    "positive = positive + excluded.positive, "
+                    "negative = negative + excluded.negative",
+                    votes,
+                )
+
+    def flush(self) -> None:
+        """Переносит WAL в основной файл базы после простоя."""
+        with self._write_lock:
+            if self._write_conn is not None:
+                self._write_conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def close(self) -> None:
+        """Закрывает соединения с базой."""
+        with self._write_lock:
+            if self._write_conn is not None:
+                self._write_conn.close()
+                self._write_conn = None
+        with self._read_lock:
+            if self._read_conn is not None:
+                self._read_conn.close()
+                self._read_conn = None
+
+    def _query(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        """Выполняет запрос на чтение."""
+        with self._read_lock:
+            return self._reader().execute(sql, params).fetchall()
+
+    def top_unanswered(
+        self, limit: int = 10, since: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Возвращает самые частые вопросы без ответа.
+
+        Args:
+            limit: Максимальное количество вопросов
+            since: Учитывать только события после этого момента (unix time)
+
+        Returns:
+            List[Dict[str, Any]]: Вопрос, количество и время последнего запроса
+        """
+        if since is None:
+            rows = self._query(
+                "SELECT query, count, last_ts FROM unanswered_questions "
+                "ORDER BY count DESC LIMIT ?",
+                (limit,),
+            )
+        else:
+            placeholders = ", ".join("?" for _ in UNANSWERED_OUTCOMES)
+            rows = self._query(
+                "SELECT MAX(query) AS query, COUNT(*) AS count, MAX(ts) AS last_ts "
+                f"FROM questions WHERE ts >= ? AND outcome IN ({placeholders}) "
+                "GROUP BY normalized ORDER BY count DESC LIMIT ?",
+                (since, *UNANSWERED_OUTCOMES, limit),
+            )
+        return [dict(row) for row in rows]
+
+    def feedback_ratios(
+        self, limit: int = 20, min_votes: int = 1
+    ) -> List[Dict[str, Any]]:
+        """
+        Возвращает соотношение 👍/👎 по ответам.
+
+        Args:
+            limit: Максимальное количество ответов
+            min_votes: Минимальное количество оценок ответа
+
+        Returns:
+            List[Dict[str, Any]]: ID ответа, число оценок и доля 👍,
+            отсортированные по числу оценок
+        """
+        rows = self._query(
+            "SELECT answer_id, positive, negative, positive + negative AS total "
+            "FROM answer_feedback WHERE positive + negative >= ? "
+            "ORDER BY total DESC LIMIT ?",
+            (min_votes, limit),
+        )
+        return [
+            {**dict(row), "positive_ratio": row["positive"] / row["total"]}
+            for row in rows
+        ]
+
+    def confidence_histogram(self, since: Optional[float] = None) -> Dict[str, int]:
+        """
+        Возвращает гистограмму уверенности поиска (без приветствий).
+
+        Args:
+            since: Учитывать только события после этого момента (unix time)
+
+        Returns:
+            Dict[str, int]: Количество вопросов по корзинам ("0.0-0.1" и т.д.)
+        """
+        if since is None:
+            rows = self._query("SELECT bucket, count FROM confidence_histogram")
+        else:
+            rows = self._query(
+                "SELECT confidence_bucket AS bucket, COUNT(*) AS count "
+                "FROM questions WHERE ts >= ? AND outcome != ? "
+                "GROUP BY confidence_bucket",
+                (since, OUTCOME_GREETING),
+            )
+        counts = {row["bucket"]: row["count"] for row in rows}
+        width = 1 / CONFIDENCE_BUCKETS
+        return {
+            f"{bucket * width:.1f}-{(bucket + 1) * width:.1f}": counts.get(bucket, 0)
+            for bucket in range(CONFIDENCE_BUCKETS)
+        }
+
+
+# Глобальный экземпляр хранилища аналитики
+analytics_store = AnalyticsStore()
@@ -0,0 +1,165 @@
+"""Конвейер обработки вопроса: приветствия, поиск и fallback приветствие."""
+
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from .analytics import (
+    OUTCOME_ANSWER,
+    OUTCOME_CLARIFICATION,
+    OUTCOME_FALLBACK,
+    OUTCOME_GREETING,
+    OUTCOME_OPERATOR,
+)
+from .greetings import (
+    get_fallback_greeting,
+    process_greeting_message,
+    should_use_fallback_greeting,
+)
+from .metrics import ask_requests, stage_timer
+from .search import SearchEngine, search_engine
+from .text_normalize import (
+    get_normalize_cache_stats,
+    normalization_scope,
+    normalize_text_forms,
+)
+from .tracing import debug_trace, trace_cache, trace_event
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+
+# Значения source ответа без записи базы знаний
+SOURCE_GREETING = "greeting"
+SOURCE_FALLBACK_GREETING = "fallback_greeting"
+
+# Исходы для метрики faq_ask_requests_total{source}
+SOURCE_OUTCOMES = (
+    SOURCE_GREETING,
+    SOURCE_FALLBACK_GREETING,
+    OUTCOME_ANSWER,
+    OUTCOME_CLARIFICATION,
+    OUTCOME_OPERATOR,
+)
+
+# Нулевые счетчики, чтобы редкие исходы были видны в /metrics с запуска
+for _source in SOURCE_OUTCOMES:
+    ask_requests.inc(_source, amount=0)
+
+
+class AskResult(NamedTuple):
+    """Результат обработки вопроса."""
+
+    reply: str
+    confidence: float
+    source: Optional[str]
+    similar_questions: List[str]
+    outcome: str  # answer, clarification, operator, fallback или greeting
+    search_confidence: float  # Уверенность поиска до замены на fallback
+
+    @property
+    def source_outcome(self) -> str:
+        """Исход по полю source ответа (ID записи базы знаний - "answer")."""
+        if self.outcome in (OUTCOME_GREETING, OUTCOME_FALLBACK):
+            return self.source
+        return self.outcome
+
+    def to_response(self) -> Dict[str, Any]:
+        """Возвращает поля ответа API /ask."""
+        return {
+            "reply": self.reply,
+            "confidence": self.confidence,
+            "source": self.source,
+            "similar_questions": self.similar_questions,
+        }
+
+
+def _search_outcome(result: Dict[str, Any]) -> str:
+    """Исход поиска: ответ, уточнение или передача оператору."""
+    if result["source"]:
+        return OUTCOME_ANSWER
+    return OUTCOME_CLARIFICATION if result["similar_questions"] else OUTCOME_OPERATOR
+
+
+async def answer_question(
+    query: str, engine: Optional[SearchEngine] = None
+) -> AskResult:
+    """
+    Обрабатывает вопрос пользователя так же, как эндпоинт /api/v1/ask.
+
+    Используется и API, и тестовой консолью в локальном режиме.
+
+    Args:
+        query: Вопрос пользователя
+        engine: Поисковый движок (по умолчанию глобальный)
+
+    Returns:
+        AskResult: Ответ ассистента и исход обработки
+    """
+    engine = engine or search_engine
+
+    # Нормализованные формы запроса вычисляются один раз на запрос
+    with normalization_scope():
+        # Нормализованные формы запоминаются и переиспользуются этапами ниже
+        trace = debug_trace()
+        normalize_hits = get_normalize_cache_stats()["hits"] if trace else 0
+        with stage_timer("normalize"):
+            normalize_text_forms(query)
+        if trace is not None:
+            trace_cache(
+                "normalize", get_normalize_cache_stats()["hits"] > normalize_hits
+            )
+
+        # Обрабатываем приветствие
+        with stage_timer("greeting"):
+            is_greeting_flag, greeting_response, main_content = (
+                process_greeting_message(query)
+            )
+
+        # Если это только приветствие - возвращаем стандартный ответ
+        if is_greeting_flag and greeting_response:
+            logger.info(f"Обработано приветствие: {query[:50]}...")
+            trace_event("fast_path", "greeting")
+            return AskResult(
+                greeting_response, 1.0, SOURCE_GREETING, [], OUTCOME_GREETING, 1.0
+            )
+
+        # Определяем текст для поиска в FAQ
+        search_query = main_content if main_content else query
+
+        # Проверяем, что поисковый движок инициализирован
+        if not engine._is_initialized:
+            await engine.initialize()
+
+        # Ищем лучший ответ
+        with stage_timer("search"):
+            result = await engine.find_best_answer(search_query)
+
+        # Проверяем, нужно ли использовать fallback приветствие
+        if should_use_fallback_greeting(result["confidence"]):
+            logger.info(
+                f"Низкая уверенность ({result['confidence']:.3f}), "
+                f"используем fallback приветствие для: {query[:50]}..."
+            )
+            return AskResult(
+                get_fallback_greeting(),
+                1.0,
+                SOURCE_FALLBACK_GREETING,
+                [],
+                OUTCOME_FALLBACK,
+                result["confidence"],
+            )
+
+        # Логируем запрос
+        logger.info(
+            f"Обработан вопрос: {query[:50]}... "
+            f"(confidence: {result['confidence']:.3f})"
+        )
+
+        return AskResult(
+            result["reply"],
+            result["confidence"],
+            result["source"],
+            result["similar_questions"],
+            _search_outcome(result),
+            result["confidence"],
+        )
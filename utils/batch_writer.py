@@ -0,0 +1,144 @@
+"""Базовый класс фоновой пакетной записи с очередью в памяти."""
+
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Маркер остановки фоновой задачи
+_STOP = object()
+
+
+class BackgroundBatchWriter(ABC):
+    """
+    Пишет записи пачками в фоновой задаче.
+
+    Эндпоинты только кладут запись в очередь и не касаются диска. Фоновая
+    задача забирает все накопившиеся записи и передает их в write_batch,
+    который выполняется в пуле потоков. Если писатель не запущен (например,
+    вне lifespan приложения), запись выполняется сразу в пуле потоков.
+
+    Наследники реализуют write_batch, а при необходимости flush и close.
+    """
+
+    def __init__(self, batch_size: int, queue_size: int, flush_interval: float) -> None:
+        """
+        Инициализирует писатель.
+
+        Args:
+            batch_size: Максимум записей в одной пачке
+            queue_size: Максимальный размер очереди в памяти
+            flush_interval: Через сколько секунд простоя вызывается flush
+        """
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"submitted": 0, "written": 0, "batches": 0, "errors": 0}
+
+    @property
+    def is_running(self) -> bool:
+        """Проверяет, запущена ли фоновая задача."""
+        return self._task is not None and not self._task.done()
+
+    @abstractmethod
+    def write_batch(self, records: List[Dict[str, Any]]) -> None:
+        """Записывает пачку записей (выполняется в пуле потоков)."""
+
+    def flush(self) -> None:
+        """Сбрасывает буферы на диск (выполняется в пуле потоков)."""
+
+    def close(self) -> None:
+        """Освобождает ресурсы после остановки."""
+
+    async def start(self) -> None:
+        """Запускает фоновую задачу записи."""
+        if self.is_running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"{type(self).__name__} запущен")
+
+    async def stop(self) -> None:
+        """Записывает оставшиеся записи и останавливает фоновую задачу."""
+        if self.is_running:
+            await self._queue.put(_STOP)
+            await self._task
+        self._task = None
+        self._queue = None
+        await asyncio.to_thread(self.close)
+        logger.info(f"{type(self).__name__} остановлен")
+
+    async def submit(self, record: Dict[str, Any]) -> None:
+        """
+        Ставит запись в очередь на запись.
+
+        Args:
+            record: Запись для сохранения
+        """
+        self._stats["submitted"] += 1
+        if not self.is_running:
+            await self._write([record])
+            return
+        # При переполненной очереди эндпоинт ждет, а не теряет запись
+        await self._queue.put(record)
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> None:
+        """Записывает пачку в пуле потоков, не прерывая фоновую задачу."""
+        try:
+            await asyncio.to_thread(self.write_batch, batch)
+            self._stats["written"] += len(batch)
+            self._stats["batches"] += 1
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.error(f"Ошибка записи пачки из {len(batch)} записей: {e}")
+
+    async def _flush(self) -> None:
+        """Сбрасывает буферы в пуле потоков, не прерывая фоновую задачу."""
+        try:
+            await asyncio.to_thread(self.flush)
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.error(f"Ошибка сброса буферов {type(self).__name__}: {e}")
+
+    async def _run(self) -> None:
+        """Цикл фоновой задачи: собирает пачки из очереди и записывает их."""
+        while True:
+            try:
+                item = await asyncio.wait_for(
+                    self._queue.get(), timeout=self.flush_interval
+                )
+            except asyncio.TimeoutError:
+                await self._flush()
+                continue
+
+            stop = item is _STOP
+            batch = [] if stop else [item]
+            while not stop and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if item is _STOP:
+                    stop = True
+                else:
+                    batch.append(item)
+
+            if batch:
+                await self._write(batch)
+            if stop:
+                return
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Возвращает статистику писателя.
+
+        Returns:
+            Dict[str, Any]: Счетчики записей, пачек, ошибок и размер очереди
+        """
+        pending = self._queue.qsize() if self._queue is not None else 0
+        return {**self._stats, "pending": pending, "running": self.is_running}
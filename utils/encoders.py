@@ -0,0 +1,288 @@
+"""Модели эмбеддингов: sentence-transformers, сервер моделей и офлайн-заглушка."""
+
+import logging
+import re
+import zlib
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+
+from .search_config import (
+    ENCODER_BACKEND,
+    HASHING_DIM,
+    HASHING_NGRAM_SIZE,
+    MODEL_SERVER_BATCH_SIZE,
+    MODEL_SERVER_TIMEOUT,
+    MODEL_SERVER_URL,
+)
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Поддерживаемые бэкенды эмбеддингов
+ENCODER_BACKENDS = ("sentence-transformers", "model-server", "hashing")
+
+# Бэкенды, которые загружают модель по названию. Сервер моделей обслуживает
+# одну модель по MODEL_SERVER_URL, а заглушка игнорирует название, поэтому
+# быстрая модель каскада на них совпала бы с основной
+MULTI_MODEL_BACKENDS = ("sentence-transformers",)
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+class Encoder:
+    """
+    Базовый класс модели эмбеддингов.
+
+    Интерфейс совпадает с SentenceTransformer.encode, поэтому движок поиска
+    и конвертер работают с любым бэкендом одинаково.
+    """
+
+    model_id: str = ""
+    # encode ждет сеть: движок вызывает его в пуле потоков, а не в цикле событий
+    blocking_io: bool = False
+
+    @property
+    def dimension(self) -> int:
+        """Размерность эмбеддингов."""
+        raise NotImplementedError
+
+    def encode(
+        self,
+        texts: Sequence[str],
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+        convert_to_numpy: bool = True,
+        **kwargs: Any,
+    ) -> np.ndarray:
+        """
+        Вычисляет эмбеддинги пачки текстов.
+
+        Args:
+            texts: Тексты
+            batch_size: Размер пачки для модели
+            show_progress_bar: Показывать прогресс (если бэкенд умеет)
+            convert_to_numpy: Оставлен для совместимости с SentenceTransformer
+
+        Returns:
+            np.ndarray: Эмбеддинги float32 (len(texts), dimension)
+        """
+        raise NotImplementedError
+
+
+class SentenceTransformerEncoder(Encoder):
+    """Локальная модель sentence-transformers."""
+
+    def __init__(self, model_name: str) -> None:
+        """
+        Загружает модель.
+
+        Args:
+            model_name: Название модели sentence-transformers
+        """
+        # Импорт здесь: torch не нужен, если выбран другой бэкенд
+        from sentence_transformers import SentenceTransformer
+
+        self.model_id = model_name
+        self.model = SentenceTransformer(model_name)
+
+    @property
+    def dimension(self) -> int:
+        """Размерность эмбеддингов."""
+        return int(self.model.get_sentence_embedding_dimension())
+
+    def encode(
+        self,
+        texts: Sequence[str],
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+        convert_to_numpy: bool = True,
+        **kwargs: Any,
+    ) -> np.ndarray:
+        """Вычисляет эмбеддинги пачки текстов."""
+        embeddings = self.model.encode(
+            list(texts),
+            batch_size=batch_size,
+            show_progress_bar=show_progress_bar,
+            convert_to_numpy=True,
+            **kwargs,
+        )
+        return np.asarray(embeddings, dtype="float32")
+
+
+class ModelServerEncoder(Encoder):
+    """
+    Клиент сервера моделей с API text-embeddings-inference.
+
+    Отправляет POST {url}/embed с полем inputs и получает список векторов.
+    """
+
+    blocking_io = True
+
+    def __init__(
+        self,
+        model_name: str,
+        url: str = MODEL_SERVER_URL,
+        timeout: float = MODEL_SERVER_TIMEOUT,
+        batch_size: int = MODEL_SERVER_BATCH_SIZE,
+        client: Optional[Any] = None,
+    ) -> None:
+        """
+        Инициализирует клиент.
+
+        Args:
+            model_name: Название модели, которую обслуживает сервер
+            url: Адрес сервера моделей
+            timeout: Таймаут запроса в секундах
+            batch_size: Максимальный размер пачки в одном запросе
+            client: Готовый httpx.Client (по умолчанию создается новый)
+        """
+        import httpx
+
+        self.model_id = model_name
+        self.url = url.rstrip("/")
+        self.batch_size = batch_size
+        self.client = client or httpx.Client(timeout=timeout)
+        self._dimension: Optional[int] = None
+
+    @property
+    def dimension(self) -> int:
+        """Размерность эмбеддингов (узнается пробным запросом)."""
+        if self._dimension is None:
+            self._dimension = int(self.encode(["dimension"]).shape[1])
+        return self._dimension
+
+    def encode(
+        self,
+        texts: Sequence[str],
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+        convert_to_numpy: bool = True,
+        **kwargs: Any,
+    ) -> np.ndarray:
+        """Вычисляет эмбеддинги пачки текстов на сервере моделей."""
+        texts = list(texts)
+        step = min(batch_size, self.batch_size)
+        vectors: List[List[float]] = []
+        for start in range(0, len(texts), step):
+            response = self.client.post(
+                f"{self.url}/embed", json={"inputs": texts[start : start + step]}
+            )
+            response.raise_for_status()
+            vectors.extend(response.json())
+
+        embeddings = np.asarray(vectors, dtype="float32")
+        if embeddings.size:
+            self._dimension = int(embeddings.shape[1])
+        return embeddings
+
+    def close(self) -> None:
+        """Закрывает HTTP соединения."""
+        self.client.close()
+
+
+class HashingEncoder(Encoder):
+    """
+    Детерминированная модель на хешах символьных n-грамм и слов.
+
+    Не требует загрузки весов и сети: похожие по написанию тексты получают
+    близкие векторы, поэтому полный путь конвертация -> индекс -> поиск -> API
+    проверяется офлайн за секунды. Семантику не понимает.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "hashing",
+        dim: int = HASHING_DIM,
+        ngram_size: int = HASHING_NGRAM_SIZE,
+    ) -> None:
+        """
+        Инициализирует модель.
+
+        Args:
+            model_name: Префикс идентификатора модели
+            dim: Размерность эмбеддингов
+            ngram_size: Длина символьных n-грамм
+        """
+        self.model_id = f"{model_name}-{ngram_size}gram-{dim}"
+        self.dim = dim
+        self.ngram_size = ngram_size
+
+    @property
+    def dimension(self) -> int:
+        """Размерность эмбеддингов."""
+        return self.dim
+
+    def _features(self, text: str) -> List[str]:
+        """Возвращает слова и символьные n-граммы текста."""
+        words = _WORD_PATTERN.findall(text.lower())
+        features = list(words)
+        for word in words:
+            padded = f" {word} "
+            features.extend(
+                padded[i : i + self.ngram_size]
+                for i in range(max(1, len(padded) - self.ngram_size + 1))
+            )
+        return features
+
+    def encode(
+        self,
+        texts: Sequence[str],
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+        convert_to_numpy: bool = True,
+        **kwargs: Any,
+    ) -> np.ndarray:
+        """Вычисляет эмбеддинги пачки текстов."""
+        embeddings = np.zeros((len(texts), self.dim), dtype="float32")
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                # crc32 не зависит от PYTHONHASHSEED, векторы воспроизводимы
+                code = zlib.crc32(feature.encode("utf-8"))
+                sign = 1.0 if code & 0x80000000 else -1.0
+                embeddings[row, code % self.dim] += sign
+
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
+
+
+def check_cascade_backend(backend: str) -> None:
+    """
+    Проверяет, что бэкенд может загрузить отдельную быструю модель каскада.
+
+    Args:
+        backend: Бэкенд эмбеддингов
+
+    Raises:
+        ValueError: Если бэкенд не различает модели по названию
+    """
+    if backend not in MULTI_MODEL_BACKENDS:
+        raise ValueError(
+            f"Бэкенд {backend} не загружает отдельную быструю модель, "
+            f"каскад поддерживается только с: {', '.join(MULTI_MODEL_BACKENDS)}"
+        )
+
+
+def create_encoder(model_name: str, backend: str = ENCODER_BACKEND) -> Encoder:
+    """
+    Создает модель эмбеддингов выбранного бэкенда.
+
+    Args:
+        model_name: Название модели
+        backend: "sentence-transformers", "model-server" или "hashing"
+
+    Returns:
+        Encoder: Модель эмбеддингов
+    """
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(
+            f"Неизвестный бэкенд эмбеддингов: {backend}. "
+            f"Поддерживаются: {', '.join(ENCODER_BACKENDS)}"
+        )
+
+    logger.info(f"Загружаем модель {model_name} (бэкенд {backend})...")
+    if backend == "model-server":
+        return ModelServerEncoder(model_name)
+    if backend == "hashing":
+        return HashingEncoder()
+    return SentenceTransformerEncoder(model_name)
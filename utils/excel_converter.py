@@ -2,13 +2,37 @@
 
 import json
 import logging
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import faiss
 import numpy as np
 import pandas as pd
-from sentence_transformers import SentenceTransformer
+
+from .encoders import Encoder, check_cascade_backend, create_encoder
+from .search_config import (
+    CASCADE_CALIBRATION_NEIGHBORS,
+    CASCADE_CALIBRATION_SAMPLE,
+    CASCADE_INDEX_FILE,
+    CASCADE_MODEL,
+    ENABLE_CASCADE,
+    ENCODER_BACKEND,
+    INDEX_META_FILE,
+    NEIGHBORS_FILE,
+    NEIGHBORS_TOP_K,
+    PROJECTION_FILE,
+    REDUCED_DIM,
+    REDUCTION_REPORT_FILE,
+    REDUCTION_REPORT_FOLDS,
+    REDUCTION_REPORT_TOP_K,
+    VECTOR_QUANTIZATION,
+    VECTOR_REDUCTION,
+    VECTORS_FILE,
+)
+from .text_normalize import normalize_text_forms
+from .vector_quantization import AnyIndex, build_quantized_index, write_index
+from .vector_reduction import VectorProjection, cross_validate_reduction
 
 # Настройка логирования
 logger = logging.getLogger(__name__)
@@ -23,22 +47,54 @@ MEDIUM_CONFIDENCE_THRESHOLD = 0.6
 class ExcelToVectorDBConverter:
     """Класс для конвертации Excel файлов в векторную базу знаний."""
 
-    def __init__(self, model_name: str = EMBEDDING_MODEL) -> None:
+    def __init__(
+        self,
+        model_name: str = EMBEDDING_MODEL,
+        cascade_model_name: Optional[str] = None,
+        reduction: Optional[str] = None,
+        reduced_dim: int = REDUCED_DIM,
+        quantization: Optional[str] = None,
+        encoder_backend: str = ENCODER_BACKEND,
+    ) -> None:
         """
         Инициализирует конвертер.
 
         Args:
             model_name: Название модели для генерации эмбеддингов
+            cascade_model_name: Название быстрой модели каскада (если None,
+                индекс для каскада не строится)
+            reduction: Метод снижения размерности ("pca", "truncate" или None)
+            reduced_dim: Целевая размерность при снижении
+            quantization: Тип сжатия векторов индекса ("fp16", "sq8",
+                "binary" или None)
+            encoder_backend: Бэкенд эмбеддингов ("sentence-transformers",
+                "model-server" или "hashing")
         """
         self.model_name = model_name
-        self.model: Optional[SentenceTransformer] = None
+        self.model: Optional[Encoder] = None
+        self.cascade_model_name = cascade_model_name
+        self.cascade_model: Optional[Encoder] = None
+        self.encoder_backend = encoder_backend
         self.embedding_dim = EMBEDDING_DIM
+        self.reduction = reduction
+        self.reduced_dim = reduced_dim
+        self.quantization = quantization
 
     async def load_model(self) -> None:
-        """Загружает модель для генерации эмбеддингов."""
+        """Загружает модели для генерации эмбеддингов."""
         try:
-            logger.info(f"Загружаем модель {self.model_name}...")
-            self.model = SentenceTransformer(self.model_name)
+            self.model = create_encoder(self.model_name, self.encoder_backend)
+            self.embedding_dim = self.model.dimension
+            if self.cascade_model_name:
+                try:
+                    check_cascade_backend(self.encoder_backend)
+                except ValueError as e:
+                    logger.warning(f"Индекс быстрой модели не строится: {e}")
+                    self.cascade_model_name = None
+            if self.cascade_model_name:
+                self.cascade_model = create_encoder(
+                    self.cascade_model_name, self.encoder_backend
+                )
             logger.info("Модель успешно загружена")
         except Exception as e:
             logger.error(f"Ошибка загрузки модели: {e}")
@@ -144,28 +200,24 @@ class ExcelToVectorDBConverter:
         Returns:
             Нормализованный текст
         """
-        if not isinstance(text, str):
-            return ""
-
-        # Базовая нормализация
-        text = text.strip().lower()
+        # Общая нормализация с сервером и конвертером, чтобы формы не расходились
+        return normalize_text_forms(text).search
 
-        # Удаляем лишние пробелы
-        text = " ".join(text.split())
-
-        return text
-
-    def generate_embeddings(self, texts: List[str]) -> np.ndarray:
+    def generate_embeddings(
+        self, texts: List[str], model: Optional[Encoder] = None
+    ) -> np.ndarray:
         """
         Генерирует эмбеддинги для списка текстов.
 
         Args:
             texts: Список текстов для обработки
+            model: Модель для генерации (по умолчанию основная)
 
         Returns:
             Массив эмбеддингов
         """
-        if not self.model:
+        model = model or self.model
+        if not model:
             raise RuntimeError("Модель не загружена. Вызовите load_model()")
 
         try:
@@ -173,7 +225,7 @@ class ExcelToVectorDBConverter:
             normalized_texts = [self.normalize_text(text) for text in texts]
 
             # Генерируем эмбеддинги
-            embeddings = self.model.encode(
+            embeddings = model.encode(
                 normalized_texts,
                 batch_size=32,
                 show_progress_bar=True,
@@ -187,33 +239,211 @@ class ExcelToVectorDBConverter:
             logger.error(f"Ошибка генерации эмбеддингов: {e}")
             raise
 
-    def build_faiss_index(self, embeddings: np.ndarray) -> faiss.Index:
+    def build_faiss_index(
+        self, embeddings: np.ndarray, quantization: Optional[str] = None
+    ) -> AnyIndex:
         """
         Строит FAISS индекс из эмбеддингов.
 
         Args:
             embeddings: Массив эмбеддингов
+            quantization: Тип сжатия векторов ("fp16", "sq8", "binary");
+                None - индекс хранит исходные float32 векторы
 
         Returns:
             FAISS индекс
         """
         try:
-            # Создаем индекс для косинусного сходства
-            index = faiss.IndexFlatIP(embeddings.shape[1])
-
             # Нормализуем эмбеддинги для косинусного сходства
             faiss.normalize_L2(embeddings)
+            embeddings = embeddings.astype("float32")
+
+            if quantization:
+                # Сжатый индекс для первого этапа поиска
+                index = build_quantized_index(embeddings, quantization)
+            else:
+                # Создаем индекс для косинусного сходства
+                index = faiss.IndexFlatIP(embeddings.shape[1])
 
-            # Добавляем эмбеддинги в индекс
-            index.add(embeddings.astype("float32"))
+                # Добавляем эмбеддинги в индекс
+                index.add(embeddings)
 
-            logger.info(f"Построен FAISS индекс с {index.ntotal} векторами")
+            logger.info(
+                f"Построен FAISS индекс с {index.ntotal} векторами"
+                + (f" (квантование: {quantization})" if quantization else "")
+            )
             return index
 
         except Exception as e:
             logger.error(f"Ошибка построения FAISS индекса: {e}")
             raise
 
+    def calibrate_cascade(
+        self,
+        cascade_embeddings: np.ndarray,
+        embeddings: np.ndarray,
+        neighbors: int = CASCADE_CALIBRATION_NEIGHBORS,
+        sample_size: int = CASCADE_CALIBRATION_SAMPLE,
+    ) -> Dict[str, float]:
+        """
+        Подбирает перевод оценок быстрой модели в шкалу основной модели.
+
+        Для вопросов базы знаний берутся ближайшие по быстрой модели соседи,
+        и по парам (оценка быстрой модели, оценка основной модели) строится
+        линейная регрессия.
+
+        Args:
+            cascade_embeddings: Нормализованные эмбеддинги быстрой модели
+            embeddings: Нормализованные эмбеддинги основного индекса
+            neighbors: Соседей на вопрос
+            sample_size: Максимум вопросов в выборке
+
+        Returns:
+            Dict[str, float]: slope и intercept (оценка основной модели
+            = slope * оценка быстрой + intercept)
+        """
+        small = np.ascontiguousarray(cascade_embeddings, dtype="float32")
+        large = np.ascontiguousarray(embeddings, dtype="float32")
+        rows = np.random.default_rng(0).permutation(len(small))[:sample_size]
+
+        index = faiss.IndexFlatIP(small.shape[1])
+        index.add(small)
+        # Первым найдется сам вопрос, его пара (1, 1) закрепляет верх шкалы
+        k = min(neighbors + 1, len(small))
+        small_scores, indices = index.search(small[rows], k)
+
+        pairs = [
+            (float(small_score), float(large[row] @ large[idx]))
+            for row, scores, found in zip(rows, small_scores, indices)
+            for small_score, idx in zip(scores, found)
+            if idx >= 0
+        ]
+        x, y = np.array(pairs).T if pairs else (np.array([]), np.array([]))
+        if len(x) < 2 or np.ptp(x) == 0:
+            logger.warning("Недостаточно пар для калибровки каскада")
+            return {"slope": 1.0, "intercept": 0.0}
+
+        slope, intercept = np.polyfit(x, y, 1)
+        logger.info(
+            f"Калибровка каскада по {len(x)} парам: "
+            f"bge-m3 = {slope:.3f} * быстрая + {intercept:.3f}"
+        )
+        return {
+            "slope": round(float(slope), 6),
+            "intercept": round(float(intercept), 6),
+        }
+
+    def build_neighbor_graph(
+        self, embeddings: np.ndarray, ids: List[str], top_k: int = NEIGHBORS_TOP_K
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Находит для каждой записи базы знаний ближайшие записи.
+
+        Args:
+            embeddings: Нормализованные эмбеддинги записей
+            ids: ID записей в том же порядке
+            top_k: Количество соседей для каждой записи
+
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: ID записи -> список соседей
+            с полями "id" и "score"
+        """
+        try:
+            vectors = np.ascontiguousarray(embeddings, dtype="float32")
+            index = faiss.IndexFlatIP(vectors.shape[1])
+            index.add(vectors)
+
+            # Ищем на одного соседа больше: первым найдется сама запись
+            k = min(top_k + 1, len(ids))
+            similarities, indices = index.search(vectors, k)
+
+            graph = {}
+            for row, entry_id in enumerate(ids):
+                graph[entry_id] = [
+                    {"id": ids[idx], "score": round(float(similarity), 4)}
+                    for similarity, idx in zip(similarities[row], indices[row])
+                    if idx >= 0 and idx != row
+                ][:top_k]
+
+            logger.info(f"Построен граф соседей для {len(graph)} записей")
+            return graph
+
+        except Exception as e:
+            logger.error(f"Ошибка построения графа соседей: {e}")
+            raise
+
+    def save_index_meta(self, output_path: Path, meta: Dict[str, Any]) -> None:
+        """
+        Сохраняет описание собранного индекса рядом с ним.
+
+        Args:
+            output_path: Директория индекса
+            meta: Описание индекса
+        """
+        meta_file = output_path / Path(INDEX_META_FILE).name
+        with open(meta_file, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    def reduce_embeddings(
+        self, embeddings: np.ndarray, output_path: Path
+    ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Снижает размерность эмбеддингов и сохраняет проекцию рядом с индексом.
+
+        Args:
+            embeddings: Эмбеддинги полной размерности
+            output_path: Директория для сохранения проекции и отчета
+
+        Returns:
+            Tuple[np.ndarray, Dict[str, Any]]: (векторы сниженной размерности,
+            отчет о recall@k и дрейфе оценок относительно полной размерности,
+            посчитанный кросс-валидацией по векторам базы знаний)
+        """
+        try:
+            full = np.ascontiguousarray(embeddings, dtype="float32")
+            faiss.normalize_L2(full)
+
+            projection = VectorProjection.fit(full, self.reduction, self.reduced_dim)
+            reduced = projection.apply(full)
+
+            report = {
+                "method": self.reduction,
+                "requested_dim": self.reduced_dim,
+                "original_dim": projection.input_dim,
+                "reduced_dim": projection.output_dim,
+                **cross_validate_reduction(
+                    full,
+                    self.reduction,
+                    projection.output_dim,
+                    REDUCTION_REPORT_TOP_K,
+                    REDUCTION_REPORT_FOLDS,
+                ),
+            }
+
+            projection.save(str(output_path / Path(PROJECTION_FILE).name))
+            report_file = output_path / Path(REDUCTION_REPORT_FILE).name
+            with open(report_file, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+
+            summary = (
+                f"Размерность снижена {report['original_dim']} -> "
+                f"{report['reduced_dim']} ({self.reduction})"
+            )
+            if report["queries"]:
+                logger.info(
+                    f"{summary}: recall@{report['top_k']}="
+                    f"{report['recall_at_k']:.3f}, "
+                    f"дрейф оценок {report['mean_score_drift']:.4f} "
+                    f"(макс. {report['max_score_drift']:.4f})"
+                )
+            else:
+                logger.warning(f"{summary}: записей слишком мало для оценки")
+            return reduced, report
+
+        except Exception as e:
+            logger.error(f"Ошибка снижения размерности: {e}")
+            raise
+
     def save_knowledge_base(self, df: pd.DataFrame, output_file: str) -> None:
         """
         Сохраняет базу знаний в JSONL формате.
@@ -273,14 +503,67 @@ class ExcelToVectorDBConverter:
             questions = df["question"].tolist()
             embeddings = self.generate_embeddings(questions)
 
+            # Снижаем размерность (проекция сохраняется рядом с индексом)
+            projection_file = output_path / Path(PROJECTION_FILE).name
+            reduction_info = None
+            if self.reduction:
+                embeddings, reduction_info = self.reduce_embeddings(
+                    embeddings, output_path
+                )
+            elif projection_file.exists():
+                # Устаревшая проекция не должна применяться к новому индексу
+                projection_file.unlink()
+
             # Строим FAISS индекс
-            index = self.build_faiss_index(embeddings)
+            index = self.build_faiss_index(embeddings, self.quantization)
 
             # Сохраняем индекс
             index_file = output_path / index_filename
-            faiss.write_index(index, str(index_file))
+            write_index(index, str(index_file))
             logger.info(f"FAISS индекс сохранен в {index_file}")
 
+            # Для сжатого индекса сохраняем исходные векторы для точной переоценки
+            vectors_file = output_path / Path(VECTORS_FILE).name
+            if self.quantization:
+                np.save(vectors_file, embeddings.astype("float32"))
+                logger.info(f"Векторы для переоценки сохранены в {vectors_file}")
+            elif vectors_file.exists():
+                vectors_file.unlink()
+
+            # Сохраняем граф соседей для мгновенных подсказок
+            neighbors_file = output_path / Path(NEIGHBORS_FILE).name
+            neighbors = self.build_neighbor_graph(
+                embeddings, [f"q{idx:03d}" for idx in df.index]
+            )
+            with open(neighbors_file, "w", encoding="utf-8") as f:
+                json.dump(neighbors, f, ensure_ascii=False)
+
+            index_meta = {
+                "built_at": datetime.now().isoformat(),
+                "model": self.model.model_id,
+                "vectors": int(index.ntotal),
+                "dimension": int(embeddings.shape[1]),
+                "reduction": self.reduction,
+                "quantization": self.quantization,
+            }
+
+            # Строим индекс быстрой модели каскада по тем же вопросам
+            cascade_index_file = None
+            if self.cascade_model:
+                cascade_embeddings = self.generate_embeddings(
+                    questions, self.cascade_model
+                )
+                cascade_index = self.build_faiss_index(cascade_embeddings)
+                cascade_index_file = output_path / Path(CASCADE_INDEX_FILE).name
+                faiss.write_index(cascade_index, str(cascade_index_file))
+                logger.info(f"Индекс быстрой модели сохранен в {cascade_index_file}")
+                index_meta["cascade_model"] = self.cascade_model.model_id
+                index_meta["cascade_calibration"] = self.calibrate_cascade(
+                    cascade_embeddings, embeddings
+                )
+
+            self.save_index_meta(output_path, index_meta)
+
             # Сохраняем базу знаний
             kb_file = output_path / kb_filename
             self.save_knowledge_base(df, str(kb_file))
@@ -291,9 +574,19 @@ class ExcelToVectorDBConverter:
                 "records_processed": len(df),
                 "index_file": str(index_file),
                 "knowledge_base_file": str(kb_file),
+                "neighbors_file": str(neighbors_file),
                 "embedding_dimension": embeddings.shape[1],
-                "model_used": self.model_name,
+                "model_used": self.model.model_id,
             }
+            if self.quantization:
+                result["quantization"] = self.quantization
+                result["vectors_file"] = str(vectors_file)
+            if reduction_info:
+                result["projection_file"] = str(projection_file)
+                result["reduction_report"] = reduction_info
+            if cascade_index_file:
+                result["cascade_index_file"] = str(cascade_index_file)
+                result["cascade_model_used"] = self.cascade_model_name
 
             logger.info("Конвертация завершена успешно!")
             return result
@@ -312,6 +605,11 @@ async def convert_excel_to_vector_db(
     excel_file: str,
     output_dir: str = "data",
     model_name: str = EMBEDDING_MODEL,
+    cascade_model_name: Optional[str] = CASCADE_MODEL if ENABLE_CASCADE else None,
+    reduction: Optional[str] = VECTOR_REDUCTION,
+    reduced_dim: int = REDUCED_DIM,
+    quantization: Optional[str] = VECTOR_QUANTIZATION,
+    encoder_backend: str = ENCODER_BACKEND,
 ) -> Dict[str, Any]:
     """
     Быстрая функция для конвертации Excel в векторную БД.
@@ -320,9 +618,21 @@ async def convert_excel_to_vector_db(
         excel_file: Путь к Excel файлу
         output_dir: Директория для сохранения
         model_name: Модель для эмбеддингов
+        cascade_model_name: Быстрая модель каскада (None - без каскада)
+        reduction: Метод снижения размерности (None - полная размерность)
+        reduced_dim: Целевая размерность при снижении
+        quantization: Тип сжатия векторов индекса (None - без сжатия)
+        encoder_backend: Бэкенд эмбеддингов
 
     Returns:
         Результат конвертации
     """
-    converter = ExcelToVectorDBConverter(model_name)
+    converter = ExcelToVectorDBConverter(
+        model_name,
+        cascade_model_name,
+        reduction,
+        reduced_dim,
+        quantization,
+        encoder_backend,
+    )
     return await converter.convert_excel_to_vector_db(excel_file, output_dir)
@@ -0,0 +1,146 @@
+"""Фоновая запись обратной связи в JSONL файл с ротацией."""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional
+
+from .batch_writer import BackgroundBatchWriter
+from .storage_config import (
+    FEEDBACK_BATCH_SIZE,
+    FEEDBACK_FSYNC_INTERVAL,
+    FEEDBACK_LOG_FILE,
+    FEEDBACK_MAX_BYTES,
+    FEEDBACK_QUEUE_SIZE,
+)
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+
+class FeedbackWriter(BackgroundBatchWriter):
+    """Пишет обратную связь в JSONL файл пачками с fsync и ротацией."""
+
+    def __init__(
+        self,
+        path: str = FEEDBACK_LOG_FILE,
+        max_bytes: int = FEEDBACK_MAX_BYTES,
+        fsync_interval: float = FEEDBACK_FSYNC_INTERVAL,
+        batch_size: int = FEEDBACK_BATCH_SIZE,
+        queue_size: int = FEEDBACK_QUEUE_SIZE,
+    ) -> None:
+        """
+        Инициализирует писатель обратной связи.
+
+        Args:
+            path: Путь к JSONL файлу
+            max_bytes: Размер файла, при котором он ротируется
+            fsync_interval: Минимальный интервал между fsync в секундах
+            batch_size: Максимум записей в одной пачке
+            queue_size: Максимальный размер очереди в памяти
+        """
+        super().__init__(batch_size, queue_size, flush_interval=fsync_interval)
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.fsync_interval = fsync_interval
+        self._file: Optional[IO[str]] = None
+        self._file_date: Optional[date] = None
+        self._last_fsync = 0.0
+        self._dirty = False
+        # Запись вне фоновой задачи может идти из нескольких потоков сразу
+        self._lock = threading.Lock()
+
+    def _open(self) -> IO[str]:
+        """Открывает текущий файл на дозапись, ротируя его при необходимости."""
+        if self._file is not None and self._needs_rotation():
+            self._close_file()
+            self._rotate()
+
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self.path.exists():
+                self._file_date = date.fromtimestamp(self.path.stat().st_mtime)
+                if self._needs_rotation():
+                    self._rotate()
+            if not self.path.exists():
+                self._file_date = date.today()
+            self._file = open(self.path, "a", encoding="utf-8")
+
+        return self._file
+
+    def _needs_rotation(self) -> bool:
+        """Проверяет, пора ли ротировать файл по размеру или дате."""
+        if self._file_date is not None and self._file_date != date.today():
+            return True
+        return self.path.exists() and self.path.stat().st_size >= self.max_bytes
+
+    def _rotate(self) -> None:
+        """Переименовывает текущий файл, добавляя к имени дату и время."""
+        stamp = datetime.now().strftime("%H%M%S")
+        file_date = (self._file_date or date.today()).strftime("%Y%m%d")
+        target = self.path.with_name(
+            f"{self.path.stem}-{file_date}-{stamp}{self.path.suffix}"
+        )
+        counter = 1
+        while target.exists():
+            target = self.path.with_name(
+                f"{self.path.stem}-{file_date}-{stamp}-{counter}{self.path.suffix}"
+            )
+            counter += 1
+
+        self.path.rename(target)
+        self._file_date = None
+        logger.info(f"Файл обратной связи ротирован: {target}")
+
+    def _sync(self) -> None:
+        """Сбрасывает файл на диск."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._last_fsync = time.monotonic()
+        self._dirty = False
+
+    def _close_file(self) -> None:
+        """Сбрасывает и закрывает текущий файл."""
+        if self._file is None:
+            return
+        if self._dirty:
+            self._sync()
+        self._file.close()
+        self._file = None
+
+    def write_batch(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Записывает пачку записей в JSONL файл.
+
+        Args:
+            records: Записи обратной связи
+        """
+        lines = "".join(
+            json.dumps(record, ensure_ascii=False) + "\n" for record in records
+        )
+        with self._lock:
+            f = self._open()
+            f.write(lines)
+            f.flush()
+            self._dirty = True
+            if time.monotonic() - self._last_fsync >= self.fsync_interval:
+                self._sync()
+
+    def flush(self) -> None:
+        """Выполняет отложенный fsync после простоя."""
+        with self._lock:
+            if self._file is not None and self._dirty:
+                self._sync()
+
+    def close(self) -> None:
+        """Сбрасывает данные на диск и закрывает файл."""
+        with self._lock:
+            self._close_file()
+
+
+# Глобальный экземпляр писателя обратной связи
+feedback_writer = FeedbackWriter()
@@ -1,9 +1,10 @@
 """Модуль для fuzzy matching приветствий."""
 
 import logging
-from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
 
 from .fuzzy_config import (
     ENABLE_FUZZY_CACHE,
@@ -14,12 +15,51 @@ from .fuzzy_config import (
     LOG_FUZZY_THRESHOLD,
     MAX_FUZZY_LENGTH,
 )
+from .lru_cache import LRUCache
+from .tracing import trace_cache
 
 # Настройка логирования
 logger = logging.getLogger(__name__)
 
-# Простой кэш для результатов fuzzy matching
-_fuzzy_cache: Dict[str, Tuple[bool, float, str]] = {}
+# LRU кэш для результатов fuzzy matching
+_fuzzy_cache = LRUCache(FUZZY_CACHE_SIZE)
+
+# Функции сравнения rapidfuzz по названию из конфигурации
+_SCORERS: Dict[str, Callable[..., float]] = {
+    "ratio": fuzz.ratio,
+    "partial_ratio": fuzz.partial_ratio,
+    "token_sort_ratio": fuzz.token_sort_ratio,
+    "token_set_ratio": fuzz.token_set_ratio,
+}
+
+# Scorer выбирается один раз при импорте, а не при каждом сравнении
+_SCORER = _SCORERS.get(FUZZY_SCORER, fuzz.ratio)
+
+# Минимальный порог среди всех типов приветствий: ниже него совпадения нет
+_MIN_TYPE_THRESHOLD = min(config["threshold"] for config in GREETING_TYPES.values())
+
+
+def _truncate(text: str) -> str:
+    """Ограничивает длину текста для производительности."""
+    return text[:MAX_FUZZY_LENGTH]
+
+
+def patterns_version(patterns: Sequence[str]) -> int:
+    """
+    Возвращает версию набора паттернов для ключа кэша.
+
+    Вычисление проходит по всем паттернам, поэтому для постоянного набора
+    версию нужно получить один раз и передавать в fuzzy_greeting_match.
+    """
+    return hash(tuple(patterns))
+
+
+def _score_cutoff(threshold: Optional[float]) -> float:
+    """Возвращает минимальное сходство, которое нужно вычислять точно."""
+    cutoff = threshold if threshold is not None else _MIN_TYPE_THRESHOLD
+    if LOG_FUZZY_MATCHES:
+        cutoff = min(cutoff, LOG_FUZZY_THRESHOLD)
+    return float(cutoff)
 
 
 def calculate_similarity(text1: str, text2: str) -> float:
@@ -37,21 +77,7 @@ def calculate_similarity(text1: str, text2: str) -> float:
         return 0.0
 
     # Ограничиваем длину для производительности
-    if len(text1) > MAX_FUZZY_LENGTH or len(text2) > MAX_FUZZY_LENGTH:
-        text1 = text1[:MAX_FUZZY_LENGTH]
-        text2 = text2[:MAX_FUZZY_LENGTH]
-
-    # Используем выбранный scorer
-    if FUZZY_SCORER == "ratio":
-        similarity = fuzz.ratio(text1, text2)
-    elif FUZZY_SCORER == "partial_ratio":
-        similarity = fuzz.partial_ratio(text1, text2)
-    elif FUZZY_SCORER == "token_sort_ratio":
-        similarity = fuzz.token_sort_ratio(text1, text2)
-    elif FUZZY_SCORER == "token_set_ratio":
-        similarity = fuzz.token_set_ratio(text1, text2)
-    else:
-        similarity = fuzz.ratio(text1, text2)
+    similarity = _SCORER(_truncate(text1), _truncate(text2))
 
     return float(similarity)
 
@@ -70,18 +96,15 @@ def get_best_match(message: str, patterns: List[str]) -> Tuple[str, float]:
     if not patterns:
         return "", 0.0
 
-    best_pattern = ""
-    best_similarity = 0.0
-
-    for pattern in patterns:
-        similarity = calculate_similarity(message, pattern)
-        if similarity > best_similarity:
-            best_similarity = similarity
-            best_pattern = pattern
+    best = process.extractOne(message, patterns, scorer=_SCORER, processor=_truncate)
+    if best is None:
+        return "", 0.0
 
-    return best_pattern, best_similarity
+    best_pattern, best_similarity, _ = best
+    return best_pattern, float(best_similarity)
 
 
+@lru_cache(maxsize=None)
 def determine_greeting_type(pattern: str) -> str:
     """
     Определяет тип приветствия по паттерну.
@@ -115,36 +138,26 @@ def get_threshold_for_type(greeting_type: str) -> float:
     return GREETING_TYPES.get(greeting_type, {}).get("threshold", 85.0)
 
 
-def fuzzy_greeting_match(
-    message: str, patterns: List[str], threshold: Optional[float] = None
-) -> Tuple[bool, float, str]:
+@lru_cache(maxsize=None)
+def get_threshold_for_pattern(pattern: str) -> float:
     """
-    Проверяет приветствие с помощью fuzzy matching.
+    Получает порог сходства для паттерна (вычисляется один раз на паттерн).
 
     Args:
-        message: Сообщение для проверки
-        patterns: Список паттернов приветствий
-        threshold: Порог сходства (если None, определяется автоматически)
+        pattern: Паттерн приветствия
 
     Returns:
-        Tuple[bool, float, str]: (найдено, сходство, лучший_паттерн)
+        float: Порог сходства
     """
-    if not message or not patterns:
-        return False, 0.0, ""
-
-    # Проверяем кэш
-    cache_key = f"{message.lower()}_{len(patterns)}"
-    if ENABLE_FUZZY_CACHE and cache_key in _fuzzy_cache:
-        logger.debug(f"Fuzzy match из кэша: '{message}'")
-        return _fuzzy_cache[cache_key]
+    return float(get_threshold_for_type(determine_greeting_type(pattern)))
 
-    # Находим лучший паттерн
-    best_pattern, similarity = get_best_match(message, patterns)
 
-    # Определяем порог
+def _decide_match(
+    message: str, best_pattern: str, similarity: float, threshold: Optional[float]
+) -> Tuple[bool, float, str]:
+    """Сравнивает сходство лучшего паттерна с порогом и логирует результат."""
     if threshold is None:
-        greeting_type = determine_greeting_type(best_pattern)
-        threshold = get_threshold_for_type(greeting_type)
+        threshold = get_threshold_for_pattern(best_pattern)
 
     # Проверяем, превышает ли сходство порог
     is_match = similarity >= threshold
@@ -156,33 +169,117 @@ def fuzzy_greeting_match(
             f"(similarity: {similarity:.1f}%, threshold: {threshold:.1f}%, match: {is_match})"
         )
 
-    result = (is_match, similarity, best_pattern)
+    return is_match, similarity, best_pattern
+
+
+def fuzzy_greeting_match(
+    message: str,
+    patterns: List[str],
+    threshold: Optional[float] = None,
+    version: Optional[int] = None,
+) -> Tuple[bool, float, str]:
+    """
+    Проверяет приветствие с помощью fuzzy matching.
+
+    Args:
+        message: Сообщение для проверки
+        patterns: Список паттернов приветствий
+        threshold: Порог сходства (если None, определяется автоматически)
+        version: Версия набора паттернов из patterns_version (если None,
+            вычисляется при каждом вызове)
+
+    Returns:
+        Tuple[bool, float, str]: (найдено, сходство, лучший_паттерн)
+    """
+    if not message or not patterns:
+        return False, 0.0, ""
 
-    # Сохраняем в кэш
+    # Проверяем кэш (ключ учитывает сам набор паттернов, а не только его длину)
+    if version is None:
+        version = patterns_version(patterns)
+    cache_key = (message.lower(), version, threshold)
     if ENABLE_FUZZY_CACHE:
-        if len(_fuzzy_cache) >= FUZZY_CACHE_SIZE:
-            # Очищаем кэш при превышении размера
-            _fuzzy_cache.clear()
-        _fuzzy_cache[cache_key] = result
+        cached = _fuzzy_cache.get(cache_key)
+        trace_cache("fuzzy_greetings", cached is not None)
+        if cached is not None:
+            logger.debug(f"Fuzzy match из кэша: '{message}'")
+            return cached
+
+    # Находим лучший паттерн (совпадения ниже порога не вычисляются точно)
+    best = process.extractOne(
+        message,
+        patterns,
+        scorer=_SCORER,
+        processor=_truncate,
+        score_cutoff=_score_cutoff(threshold),
+    )
+    if best is None:
+        result = (False, 0.0, "")
+    else:
+        best_pattern, similarity, _ = best
+        result = _decide_match(message, best_pattern, float(similarity), threshold)
+
+    # Сохраняем в кэш (при переполнении вытесняется самая старая запись)
+    if ENABLE_FUZZY_CACHE:
+        _fuzzy_cache.put(cache_key, result)
 
     return result
 
 
+def fuzzy_greeting_match_batch(
+    messages: Sequence[str], patterns: List[str], threshold: Optional[float] = None
+) -> List[Tuple[bool, float, str]]:
+    """
+    Проверяет приветствия для пачки сообщений одной матричной операцией.
+
+    Args:
+        messages: Сообщения для проверки
+        patterns: Список паттернов приветствий
+        threshold: Порог сходства (если None, определяется по паттерну)
+
+    Returns:
+        List[Tuple[bool, float, str]]: (найдено, сходство, лучший_паттерн)
+        для каждого сообщения в исходном порядке
+    """
+    if not messages:
+        return []
+    if not patterns:
+        return [(False, 0.0, "") for _ in messages]
+
+    # Матрица сходства (сообщения x паттерны) вычисляется в C без цикла Python
+    scores = process.cdist(
+        messages,
+        patterns,
+        scorer=_SCORER,
+        processor=_truncate,
+        score_cutoff=_score_cutoff(threshold),
+    )
+    best_indices = scores.argmax(axis=1)
+
+    results = []
+    for message, row, best_idx in zip(messages, scores, best_indices):
+        similarity = float(row[best_idx])
+        if not message or similarity <= 0.0:
+            results.append((False, 0.0, ""))
+            continue
+        results.append(
+            _decide_match(message, patterns[best_idx], similarity, threshold)
+        )
+
+    return results
+
+
 def clear_fuzzy_cache() -> None:
     """Очищает кэш fuzzy matching."""
     _fuzzy_cache.clear()
     logger.debug("Fuzzy cache очищен")
 
 
-def get_fuzzy_cache_stats() -> Dict[str, int]:
+def get_fuzzy_cache_stats() -> Dict[str, Any]:
     """
     Возвращает статистику кэша fuzzy matching.
 
     Returns:
-        Dict[str, int]: Статистика кэша
+        Dict[str, Any]: Размер кэша, попадания, промахи, вытеснения и hit rate
     """
-    return {
-        "cache_size": len(_fuzzy_cache),
-        "max_cache_size": FUZZY_CACHE_SIZE,
-        "cache_usage_percent": int((len(_fuzzy_cache) / FUZZY_CACHE_SIZE) * 100),
-    }
+    return _fuzzy_cache.get_stats()
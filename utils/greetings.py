@@ -2,17 +2,27 @@
 
 import logging
 import re
-from typing import Optional, Tuple
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
 
-from .fuzzy_greetings import fuzzy_greeting_match
+from .fuzzy_greetings import (
+    fuzzy_greeting_match,
+    fuzzy_greeting_match_batch,
+    patterns_version,
+)
 from .greetings_config import (
+    ENGLISH_GREETINGS,
     FALLBACK_CONFIDENCE_THRESHOLD,
     FALLBACK_GREETING_RESPONSE,
+    GREETING_FILLER_PATTERNS,
     GREETING_PATTERNS,
+    KAZAKH_GREETINGS,
     PARTIAL_GREETING_PATTERNS,
+    SHORT_GREETING_PATTERNS,
     STANDARD_GREETING_RESPONSE,
 )
 from .smart_normalize import is_potential_greeting, smart_normalize_text
+from .text_normalize import normalize_text_forms, normalize_word
+from .tracing import trace_event
 
 # Настройка логирования
 logger = logging.getLogger(__name__)
@@ -20,65 +30,278 @@ logger = logging.getLogger(__name__)
 
 def normalize_text(text: str) -> str:
     """Нормализует текст для сравнения с паттернами приветствий."""
-    if not text:
-        return ""
+    return normalize_text_forms(text).greeting
 
-    # Приводим к нижнему регистру и убираем лишние пробелы
-    normalized = text.lower().strip()
 
-    # Убираем знаки препинания в конце
-    normalized = re.sub(r"[.!?]+$", "", normalized)
+class GreetingMatch(NamedTuple):
+    """Результат разбора сообщения на приветствие и основное содержание."""
 
-    return normalized
+    is_greeting: bool
+    pattern: Optional[str]
+    span: Tuple[int, int]  # Границы приветствия в исходном сообщении
+    remainder: str  # Сообщение без приветствия
+    method: str
 
 
-def hybrid_greeting_detection(message: str) -> Tuple[bool, Optional[str], str]:
+# Слова сообщения и символы, отделяющие приветствие от вопроса
+_WORD_RE = re.compile(r"\w+")
+_LEADING_SEPARATORS_RE = re.compile(r"^[\s,.\-:;!?)]+")
+_SEPARATORS_RE = re.compile(r"[\s,.\-:;!?)]*")
+
+# Ключ в узле префиксного дерева, под которым хранится найденный паттерн
+_PATTERN_KEY = ""
+
+
+def _build_greeting_trie(patterns: Sequence[str]) -> Dict[str, Any]:
     """
-    Гибридная система распознавания приветствий.
+    Строит префиксное дерево паттернов по словам.
+
+    Args:
+        patterns: Паттерны в порядке приоритета
+
+    Returns:
+        Dict[str, Any]: Дерево, в котором узел со значением под ключом
+        _PATTERN_KEY завершает паттерн
+    """
+    trie: Dict[str, Any] = {}
+    for pattern in patterns:
+        node = trie
+        for word in _WORD_RE.findall(pattern):
+            node = node.setdefault(normalize_word(word), {})
+        # При совпадении после нормализации оставляем первый паттерн из списка
+        node.setdefault(_PATTERN_KEY, pattern)
+    return trie
+
+
+# Деревья строятся один раз при импорте модуля
+_GREETING_TRIE = _build_greeting_trie(
+    GREETING_PATTERNS
+    + PARTIAL_GREETING_PATTERNS
+    + SHORT_GREETING_PATTERNS
+    + ENGLISH_GREETINGS
+    + KAZAKH_GREETINGS
+)
+_FILLER_TRIE = _build_greeting_trie(GREETING_FILLER_PATTERNS)
+_GREETING_PATTERN_SET = frozenset(GREETING_PATTERNS)
+_SHORT_GREETING_PATTERN_SET = frozenset(SHORT_GREETING_PATTERNS)
+
+# Версия набора паттернов для ключа кэша fuzzy matching
+_GREETING_PATTERNS_VERSION = patterns_version(GREETING_PATTERNS)
+_NO_MATCH_SPAN = (0, 0)
+
+
+def _match_greeting_prefix(
+    message: str, trie: Dict[str, Any] = _GREETING_TRIE, pos: int = 0
+) -> Optional[Tuple[str, int]]:
+    """
+    Находит самый длинный паттерн дерева в начале сообщения.
+
+    Args:
+        message: Исходное сообщение
+        trie: Префиксное дерево паттернов
+        pos: Позиция, с которой начинается поиск
+
+    Returns:
+        Optional[Tuple[str, int]]: (паттерн, позиция конца приветствия)
+    """
+    node = trie
+    best: Optional[Tuple[str, int]] = None
+
+    for word_match in _WORD_RE.finditer(message, pos):
+        node = node.get(normalize_word(word_match.group()))
+        if node is None:
+            break
+        if _PATTERN_KEY in node:
+            best = (node[_PATTERN_KEY], word_match.end())
+
+    return best
+
+
+def _extend_greeting(message: str, end: int) -> int:
+    """
+    Продлевает приветствие на повторы и слова-связки после него.
+
+    "Привет-привет" и "спасибо большое за помощь" целиком считаются
+    приветствием, а не приветствием с вопросом "привет" или "за помощь".
+    Продление применяется, только если после него сообщение заканчивается:
+    в "Привет! Как дела у моего заказа" слова "как дела" относятся к вопросу.
+
+    Args:
+        message: Исходное сообщение
+        end: Позиция конца найденного приветствия
+
+    Returns:
+        int: Позиция конца приветствия вместе с повторами и связками
+    """
+    extended = end
+    while True:
+        pos = _SEPARATORS_RE.match(message, extended).end()
+        if pos == len(message):
+            return extended
+        # Между частями приветствия допустимы только разделители
+        if not _WORD_RE.match(message, pos):
+            return end
+        next_match = _match_greeting_prefix(
+            message, _GREETING_TRIE, pos
+        ) or _match_greeting_prefix(message, _FILLER_TRIE, pos)
+        if next_match is None:
+            return end
+        extended = next_match[1]
+
+
+def _no_greeting(message: str) -> GreetingMatch:
+    """Формирует результат разбора для сообщения без приветствия."""
+    return GreetingMatch(False, None, _NO_MATCH_SPAN, message.strip(), "no_match")
+
+
+def _parse_greeting_prefix(message: str) -> Optional[GreetingMatch]:
+    """Разбирает сообщение по префиксному дереву паттернов."""
+    prefix_match = _match_greeting_prefix(message)
+    if not prefix_match:
+        return None
+
+    pattern, end = prefix_match
+    end = _extend_greeting(message, end)
+    start = _WORD_RE.search(message).start()
+    remainder = _LEADING_SEPARATORS_RE.sub("", message[end:]).strip()
+    method = "partial_patterns" if remainder else "extended_patterns"
+    logger.debug(f"Найдено приветствие: '{pattern}' ({method})")
+    return GreetingMatch(True, pattern, (start, end), remainder, method)
+
+
+def _fuzzy_candidate(message: str) -> Optional[str]:
+    """Возвращает нормализованный текст, если его стоит проверять fuzzy matching."""
+    normalized = smart_normalize_text(message)
+    return normalized if is_potential_greeting(normalized) else None
+
+
+def _is_tentative(prefix_greeting: GreetingMatch) -> bool:
+    """
+    Проверяет, нужно ли уточнить совпадение fuzzy matching.
+
+    Первое слово составного приветствия с продолжением ("добрый днь")
+    скорее всего приветствие с опечаткой, а не приветствие с вопросом.
+    """
+    return prefix_greeting.pattern in _SHORT_GREETING_PATTERN_SET and bool(
+        prefix_greeting.remainder
+    )
+
+
+def _greeting_from_fuzzy(
+    message: str,
+    fuzzy_result: Tuple[bool, float, str],
+    prefix_greeting: Optional[GreetingMatch] = None,
+) -> GreetingMatch:
+    """Формирует результат разбора по результату fuzzy matching."""
+    fuzzy_match, similarity, best_pattern = fuzzy_result
+    if not fuzzy_match:
+        return prefix_greeting or _no_greeting(message)
+
+    logger.debug(
+        f"Найдено fuzzy приветствие: '{best_pattern}' (similarity: {similarity:.1f}%)"
+    )
+    return GreetingMatch(
+        True, best_pattern, (0, len(message)), "", f"fuzzy_{similarity:.1f}%"
+    )
+
+
+def parse_greeting(message: str) -> GreetingMatch:
+    """
+    Разбирает сообщение за один проход.
 
     Алгоритм:
-    1. Умная нормализация текста
-    2. Быстрое сравнение с расширенными паттернами
-    3. Если не найдено - fuzzy matching
-    4. Логирование результата
+    1. Самый длинный паттерн в начале сообщения по префиксному дереву
+    2. Если не найдено (или найдено только "добрый" с продолжением) -
+       fuzzy matching всего сообщения
 
     Args:
         message: Сообщение для проверки
 
     Returns:
-        Tuple[bool, Optional[str], str]: (найдено, паттерн, метод)
+        GreetingMatch: Признак приветствия, паттерн, его границы в исходном
+        сообщении и оставшийся текст без приветствия
     """
     if not message or not isinstance(message, str):
-        return False, None, "invalid_input"
+        return GreetingMatch(False, None, _NO_MATCH_SPAN, "", "invalid_input")
+
+    # Этап 1: Паттерны в начале сообщения по префиксному дереву
+    prefix_greeting = _parse_greeting_prefix(message)
+    if prefix_greeting and not _is_tentative(prefix_greeting):
+        return prefix_greeting
+
+    # Этап 2: Fuzzy matching для сообщений с опечатками
+    normalized = _fuzzy_candidate(message)
+    if normalized is None:
+        return prefix_greeting or _no_greeting(message)
+
+    return _greeting_from_fuzzy(
+        message,
+        fuzzy_greeting_match(
+            normalized, GREETING_PATTERNS, version=_GREETING_PATTERNS_VERSION
+        ),
+        prefix_greeting,
+    )
 
-    # Этап 1: Умная нормализация
-    normalized = smart_normalize_text(message)
 
-    # Этап 2: Быстрое сравнение с расширенными паттернами
-    exact_match = check_extended_patterns(normalized)
-    if exact_match:
-        logger.debug(f"Найдено точное приветствие: '{exact_match}'")
-        return True, exact_match, "extended_patterns"
-
-    # Этап 3: Проверка частичных совпадений
-    partial_match = check_partial_patterns(normalized)
-    if partial_match:
-        logger.debug(f"Найдено частичное приветствие: '{partial_match}'")
-        return True, partial_match, "partial_patterns"
-
-    # Этап 4: Fuzzy matching для сложных случаев
-    if is_potential_greeting(normalized):
-        fuzzy_match, similarity, best_pattern = fuzzy_greeting_match(
-            normalized, GREETING_PATTERNS
-        )
+def parse_greetings_batch(messages: Sequence[str]) -> List[GreetingMatch]:
+    """
+    Разбирает пачку сообщений (для повторов диалогов и пакетной обработки).
+
+    Сообщения без точного паттерна проверяются fuzzy matching одной
+    матричной операцией вместо отдельного вызова на каждое сообщение.
 
-        if fuzzy_match:
-            logger.debug(
-                f"Найдено fuzzy приветствие: '{best_pattern}' (similarity: {similarity:.1f}%)"
+    Args:
+        messages: Сообщения для проверки
+
+    Returns:
+        List[GreetingMatch]: Результаты разбора в исходном порядке
+    """
+    results: List[Optional[GreetingMatch]] = []
+    fuzzy_positions: List[int] = []
+    fuzzy_texts: List[str] = []
+
+    for position, message in enumerate(messages):
+        if not message or not isinstance(message, str):
+            results.append(
+                GreetingMatch(False, None, _NO_MATCH_SPAN, "", "invalid_input")
             )
-            return True, best_pattern, f"fuzzy_{similarity:.1f}%"
+            continue
+
+        prefix_greeting = _parse_greeting_prefix(message)
+        if prefix_greeting and not _is_tentative(prefix_greeting):
+            results.append(prefix_greeting)
+            continue
+
+        normalized = _fuzzy_candidate(message)
+        if normalized is None:
+            results.append(prefix_greeting or _no_greeting(message))
+            continue
+
+        results.append(prefix_greeting)
+        fuzzy_positions.append(position)
+        fuzzy_texts.append(normalized)
+
+    fuzzy_results = fuzzy_greeting_match_batch(fuzzy_texts, GREETING_PATTERNS)
+    for position, fuzzy_result in zip(fuzzy_positions, fuzzy_results):
+        results[position] = _greeting_from_fuzzy(
+            messages[position], fuzzy_result, results[position]
+        )
+
+    return results
+
 
-    return False, None, "no_match"
+def hybrid_greeting_detection(message: str) -> Tuple[bool, Optional[str], str]:
+    """
+    Гибридная система распознавания приветствий.
+
+    Args:
+        message: Сообщение для проверки
+
+    Returns:
+        Tuple[bool, Optional[str], str]: (найдено, паттерн, метод)
+    """
+    match = parse_greeting(message)
+    return match.is_greeting, match.pattern, match.method
 
 
 def check_extended_patterns(normalized_message: str) -> Optional[str]:
@@ -91,17 +314,15 @@ def check_extended_patterns(normalized_message: str) -> Optional[str]:
     Returns:
         Optional[str]: Найденный паттерн или None
     """
-    # Проверяем точные совпадения с паттернами
-    for pattern in GREETING_PATTERNS:
-        if normalized_message == pattern:
-            return pattern
+    if normalized_message in _GREETING_PATTERN_SET:
+        return normalized_message
 
     return None
 
 
 def check_partial_patterns(normalized_message: str) -> Optional[str]:
     """
-    Проверяет частичные совпадения в начале сообщения.
+    Проверяет совпадения паттернов в начале сообщения.
 
     Args:
         normalized_message: Нормализованное сообщение
@@ -109,20 +330,8 @@ def check_partial_patterns(normalized_message: str) -> Optional[str]:
     Returns:
         Optional[str]: Найденный паттерн или None
     """
-    # Проверяем частичные совпадения в начале сообщения
-    for pattern in PARTIAL_GREETING_PATTERNS:
-        if normalized_message.startswith(pattern):
-            return pattern
-
-    # Проверяем, начинается ли сообщение с приветствия
-    words = normalized_message.split()
-    if words:
-        first_word = words[0]
-        for pattern in GREETING_PATTERNS:
-            if first_word == pattern.split()[0]:
-                return pattern
-
-    return None
+    prefix_match = _match_greeting_prefix(normalized_message)
+    return prefix_match[0] if prefix_match else None
 
 
 def is_greeting(message: str) -> Tuple[bool, Optional[str]]:
@@ -136,11 +345,13 @@ def is_greeting(message: str) -> Tuple[bool, Optional[str]]:
     Returns:
         Tuple[bool, Optional[str]]: (найдено, паттерн)
     """
-    is_greeting_flag, greeting_pattern, method = hybrid_greeting_detection(message)
+    match = parse_greeting(message)
 
-    if is_greeting_flag:
-        logger.info(f"Приветствие распознано: '{greeting_pattern}' (method: {method})")
-        return True, greeting_pattern
+    if match.is_greeting:
+        logger.info(
+            f"Приветствие распознано: '{match.pattern}' (method: {match.method})"
+        )
+        return True, match.pattern
 
     return False, None
 
@@ -148,7 +359,6 @@ def is_greeting(message: str) -> Tuple[bool, Optional[str]]:
 def extract_main_content(message: str) -> str:
     """
     Извлекает основное содержание сообщения, убирая приветствие.
-    Использует гибридную систему для более точного извлечения.
 
     Args:
         message: Исходное сообщение пользователя
@@ -156,43 +366,7 @@ def extract_main_content(message: str) -> str:
     Returns:
         str: Сообщение без приветствия, только основное содержание
     """
-    if not message or not isinstance(message, str):
-        return ""
-
-    # Используем умную нормализацию
-    normalized_message = smart_normalize_text(message)
-    is_greeting_flag, greeting_pattern = is_greeting(message)
-
-    if not is_greeting_flag:
-        return message.strip()
-
-    # Убираем найденное приветствие из начала сообщения
-    if greeting_pattern:
-        # Убираем точное совпадение
-        if normalized_message == greeting_pattern:
-            return ""
-
-        # Убираем частичное совпадение в начале
-        if normalized_message.startswith(greeting_pattern):
-            remaining = normalized_message[len(greeting_pattern) :].strip()
-            # Убираем запятые и другие знаки препинания после приветствия
-            remaining = re.sub(r"^[,.\-:;]+", "", remaining).strip()
-            return remaining
-
-    # Если не удалось точно определить, пробуем убрать первое слово
-    words = normalized_message.split()
-    if len(words) > 1:
-        # Проверяем, является ли первое слово приветствием
-        first_word = words[0]
-        for pattern in GREETING_PATTERNS:
-            if first_word == pattern.split()[0]:
-                remaining_words = words[1:]
-                remaining_text = " ".join(remaining_words)
-                # Убираем знаки препинания после приветствия
-                remaining_text = re.sub(r"^[,.\-:;]+", "", remaining_text).strip()
-                return remaining_text
-
-    return ""
+    return parse_greeting(message).remainder
 
 
 def get_greeting_response() -> str:
@@ -224,20 +398,22 @@ def should_use_fallback_greeting(confidence: float) -> bool:
 
 
 def process_greeting_message(message: str) -> Tuple[bool, Optional[str], Optional[str]]:
-    """Обрабатывает сообщение на предмет приветствия."""
-    is_greeting_flag, greeting_pattern = is_greeting(message)
+    """Обрабатывает сообщение на предмет приветствия за один проход."""
+    match = parse_greeting(message)
+    trace_event("greeting_method", match.method)
 
-    if not is_greeting_flag:
+    if not match.is_greeting:
         return False, None, message
 
     # Если это только приветствие
-    main_content = extract_main_content(message)
-    if not main_content:
-        logger.info(f"Обработано приветствие: '{greeting_pattern}'")
+    if not match.remainder:
+        logger.info(
+            f"Обработано приветствие: '{match.pattern}' (method: {match.method})"
+        )
         return True, get_greeting_response(), None
 
     # Если приветствие + вопрос
     logger.info(
-        f"Обработано приветствие с вопросом: '{greeting_pattern}' + '{main_content}'"
+        f"Обработано приветствие с вопросом: '{match.pattern}' + '{match.remainder}'"
     )
-    return True, None, main_content
+    return True, None, match.remainder
@@ -62,6 +62,14 @@ PARTIAL_GREETING_PATTERNS = [
     "добро пожаловать в службу поддержки",
 ]
 
+# Первые слова составных приветствий, которые и сами по себе приветствие
+# ("Добрый!"); проверяются только в начале сообщения, без fuzzy matching
+SHORT_GREETING_PATTERNS = ["добрый", "доброе", "доброго"]
+
+# Слова после приветствия, не относящиеся к вопросу
+# ("спасибо большое за помощь", "спасибо вам")
+GREETING_FILLER_PATTERNS = ["большое", "огромное", "вам", "за помощь"]
+
 # Английские приветствия (опционально)
 ENGLISH_GREETINGS = [
     "hello",
@@ -74,3 +82,41 @@ ENGLISH_GREETINGS = [
 
 # Казахские приветствия (опционально)
 KAZAKH_GREETINGS = ["сәлем", "қайырлы күн", "қайырлы таң", "қайырлы кеш"]
+
+# Слова, по которым сообщение считается потенциальным приветствием
+# (английские и казахские приветствия добавляются к ним автоматически)
+GREETING_WORDS = [
+    "здравствуйте",
+    "здраствуйте",
+    "добрый",
+    "доброе",
+    "доброго",
+    "добрй",  # опечатка в "добрый"
+    "ден",  # опечатка в "день"
+    "привет",
+    "приветт",
+    "хай",
+    "хелло",
+    "хей",
+    "здрасьте",
+    "здарова",
+    "добреньки",
+    "как",
+    "все",
+    "спасибо",
+    "благодарю",
+]
+
+# Слова, наличие которых означает, что сообщение - не просто приветствие
+NON_GREETING_WORDS = [
+    "вопрос",
+    "проблема",
+    "ошибка",
+    "помощь",
+    "заказ",
+    "оплата",
+    "доставка",
+    "возврат",
+    "жалоба",
+    "претензия",
+]
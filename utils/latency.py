@@ -0,0 +1,56 @@
+"""Сводная статистика задержек: перцентили и пропускная способность."""
+
+import math
+from typing import Dict, Sequence
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """
+    Вычисляет перцентиль методом линейной интерполяции.
+
+    Args:
+        sorted_values: Значения, отсортированные по возрастанию
+        q: Перцентиль от 0 до 100
+
+    Returns:
+        float: Значение перцентиля (0.0 для пустой выборки)
+    """
+    if not sorted_values:
+        return 0.0
+
+    position = (len(sorted_values) - 1) * q / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return float(sorted_values[lower])
+
+    weight = position - lower
+    return float(sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight)
+
+
+def summarize_latencies(
+    latencies_ms: Sequence[float], wall_time_s: float
+) -> Dict[str, float]:
+    """
+    Считает сводку задержек серии запросов.
+
+    Args:
+        latencies_ms: Задержки отдельных запросов в миллисекундах
+        wall_time_s: Общее время выполнения серии в секундах
+
+    Returns:
+        Dict[str, float]: Количество, пропускная способность (запросов в секунду),
+        среднее, p50/p90/p95/p99 и максимум в миллисекундах
+    """
+    values = sorted(latencies_ms)
+    count = len(values)
+    return {
+        "count": count,
+        "throughput_rps": count / wall_time_s if wall_time_s > 0 else 0.0,
+        "mean_ms": sum(values) / count if count else 0.0,
+        "p50_ms": percentile(values, 50),
+        "p90_ms": percentile(values, 90),
+        "p95_ms": percentile(values, 95),
+        "p99_ms": percentile(values, 99),
+        "max_ms": values[-1] if values else 0.0,
+    }
@@ -0,0 +1,89 @@
+"""Потокобезопасный LRU кэш со статистикой попаданий."""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """Ограниченный LRU кэш, безопасный для вызова из пула потоков."""
+
+    def __init__(self, max_size: int) -> None:
+        """
+        Инициализирует кэш.
+
+        Args:
+            max_size: Максимальное количество записей
+        """
+        self.max_size = max_size
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Возвращает значение по ключу и отмечает его как недавно использованное.
+
+        Args:
+            key: Ключ записи
+
+        Returns:
+            Optional[Any]: Значение или None, если ключа нет в кэше
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self._misses += 1
+                return None
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Сохраняет значение, вытесняя самую давно использованную запись.
+
+        Args:
+            key: Ключ записи
+            value: Значение
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """Очищает кэш и счетчики."""
+        with self._lock:
+            self._data.clear()
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    def __len__(self) -> int:
+        """Возвращает количество записей в кэше."""
+        return len(self._data)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Возвращает статистику кэша.
+
+        Returns:
+            Dict[str, Any]: Размер, попадания, промахи, вытеснения и hit rate
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "cache_size": len(self._data),
+                "max_cache_size": self.max_size,
+                "cache_usage_percent": int(len(self._data) / self.max_size * 100),
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+            }
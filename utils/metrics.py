@@ -0,0 +1,320 @@
+"""
+Метрики в формате Prometheus: счетчики, gauge и гистограммы.
+
+Обновление метрики - изменение словаря или списка без блокировок: сервис
+обрабатывает запросы в одном потоке событий, а редкая потеря инкремента
+при записи из потоков допустима для метрик. Значения, которые дорого
+поддерживать на каждом запросе (размеры кэшей, очередей, индекса),
+вычисляются функциями только при чтении /metrics.
+"""
+
+import math
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .monitoring_config import LATENCY_BUCKETS
+from .tracing import current_trace
+
+Labels = Tuple[str, ...]
+Collector = Callable[[], Dict[Labels, float]]
+
+
+def _escape(value: str) -> str:
+    """Экранирует значение метки по правилам текстового формата Prometheus."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Форматирует метки в виде {name="value",...}."""
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    """Форматирует значение метрики (целые - без дробной части)."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value) or value != int(value):
+        return repr(float(value))
+    return str(int(value))
+
+
+class Metric:
+    """Базовый класс метрики."""
+
+    kind = "untyped"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        """
+        Инициализирует метрику.
+
+        Args:
+            name: Имя метрики
+            documentation: Описание (строка HELP)
+            labelnames: Имена меток
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def render(self) -> List[str]:
+        """Возвращает строки текстового формата Prometheus."""
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            *self._samples(),
+        ]
+
+    def _samples(self) -> List[str]:
+        """Возвращает строки значений метрики."""
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Монотонно растущий счетчик."""
+
+    kind = "counter"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        """Инициализирует счетчик с нулевыми значениями."""
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """Увеличивает счетчик для значений меток."""
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        """Возвращает текущее значение счетчика."""
+        return self._values.get(labels, 0.0)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} "
+            f"{_format_value(value)}"
+            for labels, value in list(self._values.items())
+        ]
+
+
+class Gauge(Metric):
+    """
+    Значение, которое может расти и убывать.
+
+    Если задана функция collector, значения вычисляются ею при чтении
+    метрик, а set/inc/dec не используются.
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        collector: Optional[Collector] = None,
+    ) -> None:
+        """
+        Инициализирует gauge.
+
+        Args:
+            name: Имя метрики
+            documentation: Описание (строка HELP)
+            labelnames: Имена меток
+            collector: Функция, возвращающая значения по меткам при чтении
+        """
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+        self.collector = collector
+
+    def set(self, value: float, *labels: str) -> None:
+        """Устанавливает значение для значений меток."""
+        self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """Увеличивает значение."""
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        """Уменьшает значение."""
+        self._values[labels] = self._values.get(labels, 0.0) - amount
+
+    def value(self, *labels: str) -> float:
+        """Возвращает текущее значение."""
+        return self._values.get(labels, 0.0)
+
+    def _samples(self) -> List[str]:
+        values = self.collector() if self.collector else dict(self._values)
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} "
+            f"{_format_value(value)}"
+            for labels, value in values.items()
+        ]
+
+
+class Histogram(Metric):
+    """Гистограмма с фиксированными корзинами."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        """
+        Инициализирует гистограмму.
+
+        Args:
+            name: Имя метрики
+            documentation: Описание (строка HELP)
+            labelnames: Имена меток
+            buckets: Верхние границы корзин
+        """
+        super().__init__(name, documentation, labelnames)
+        self.bounds = tuple(sorted(buckets))
+        # Метки -> [счетчики по корзинам (последняя - больше всех границ), сумма]
+        self._series: Dict[Labels, list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Добавляет наблюдение для значений меток."""
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series.setdefault(
+                labels, [[0] * (len(self.bounds) + 1), 0.0]
+            )
+        series[0][bisect_left(self.bounds, value)] += 1
+        series[1] += value
+
+    def count(self, *labels: str) -> int:
+        """Возвращает количество наблюдений."""
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for labels, (counts, total) in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.bounds + (float("inf"),), list(counts)):
+                cumulative += count
+                bucket_labels = _format_labels(
+                    self.labelnames + ("le",), labels + (_format_value(bound),)
+                )
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Набор метрик, отдаваемых эндпоинтом /metrics."""
+
+    def __init__(self) -> None:
+        """Инициализирует пустой набор."""
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """Регистрирует метрику; метрика с тем же именем заменяется."""
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        """Создает и регистрирует счетчик."""
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        collector: Optional[Collector] = None,
+    ) -> Gauge:
+        """Создает и регистрирует gauge."""
+        return self.register(Gauge(name, documentation, labelnames, collector))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        """Создает и регистрирует гистограмму."""
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """
+        Возвращает все метрики в текстовом формате Prometheus.
+
+        Returns:
+            str: Текст для ответа /metrics
+        """
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Глобальный набор метрик
+metrics_registry = MetricsRegistry()
+
+ask_requests = metrics_registry.counter(
+    "faq_ask_requests_total",
+    "Запросы /api/v1/ask по исходу (значению source ответа)",
+    ("source",),
+)
+stage_latency = metrics_registry.histogram(
+    "faq_stage_duration_seconds",
+    "Длительность этапов обработки вопроса",
+    ("stage",),
+)
+ask_in_flight = metrics_registry.gauge(
+    "faq_ask_in_flight",
+    "Запросы /api/v1/ask в обработке",
+)
+encoder_queue_depth = metrics_registry.gauge(
+    "faq_encoder_queue_depth",
+    "Вызовы модели эмбеддингов, ожидающие или выполняющиеся",
+    ("model",),
+)
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """
+    Записывает длительность этапа обработки запроса.
+
+    Длительность попадает в гистограмму и, если запрос трассируется,
+    в заголовок Server-Timing этого запроса.
+
+    Args:
+        stage: Название этапа (greeting, normalize, encode, faiss, response, total)
+        seconds: Длительность в секундах
+    """
+    stage_latency.observe(seconds, stage)
+    trace = current_trace()
+    if trace is not None:
+        trace.add_stage(stage, seconds)
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """Измеряет длительность блока кода как этап обработки запроса."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
@@ -0,0 +1,38 @@
+"""Конфигурация метрик и мониторинга."""
+
+import os
+
+# Эндпоинт /metrics в формате Prometheus
+ENABLE_METRICS = True
+
+# Границы корзин гистограмм задержек этапов (секунды)
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+
+# Заголовок Server-Timing с длительностью этапов в ответе /api/v1/ask
+ENABLE_SERVER_TIMING = True
+
+# Разрешить отладочную трассировку (/api/v1/ask?debug=true): кэши,
+# кандидаты FAISS и выбранный быстрый путь в поле trace ответа
+ENABLE_DEBUG_TRACE = False
+
+# Токен служебных эндпоинтов /api/v1/admin (статистика кэшей, аналитика
+# вопросов). Передается в заголовке ADMIN_TOKEN_HEADER; пока токен не задан,
+# эндпоинты отключены и отвечают 404
+ADMIN_API_TOKEN = os.environ.get("ADMIN_API_TOKEN", "")
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+
+# Заголовок с идентификатором запроса (принимается от клиента и возвращается)
+REQUEST_ID_HEADER = "X-Request-ID"
@@ -0,0 +1,165 @@
+"""Модуль для переоценки кандидатов поиска cross-encoder моделью."""
+
+import asyncio
+import logging
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+
+from .lru_cache import LRUCache
+from .search_config import (
+    RERANKER_ACCEPT_THRESHOLD,
+    RERANKER_CACHE_SIZE,
+    RERANKER_MAX_IN_FLIGHT,
+    RERANKER_MIN_MARGIN,
+    RERANKER_MODEL,
+    RERANKER_TIMEOUT,
+)
+from .tracing import trace_cache
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+
+class CrossEncoderReranker:
+    """Класс для переоценки кандидатов поиска cross-encoder моделью."""
+
+    def __init__(
+        self,
+        model_name: str = RERANKER_MODEL,
+        timeout: float = RERANKER_TIMEOUT,
+        cache_size: int = RERANKER_CACHE_SIZE,
+        max_in_flight: int = RERANKER_MAX_IN_FLIGHT,
+    ) -> None:
+        """
+        Инициализирует reranker.
+
+        Args:
+            model_name: Название cross-encoder модели
+            timeout: Бюджет времени на переоценку в секундах
+            cache_size: Максимальный размер кэша результатов
+            max_in_flight: Максимум одновременных вызовов модели
+        """
+        self.model_name = model_name
+        self.model: Optional[Any] = None  # sentence_transformers.CrossEncoder
+        self.timeout = timeout
+        self.max_in_flight = max_in_flight
+        self._in_flight = 0
+        self._cache = LRUCache(cache_size)
+        self._stats = {"calls": 0, "timeouts": 0, "skipped_busy": 0}
+
+    def load(self) -> None:
+        """Загружает cross-encoder модель."""
+        # Импорт здесь: torch загружается, только если reranker включен
+        from sentence_transformers import CrossEncoder
+
+        logger.info(f"Загружаем reranker {self.model_name}...")
+        self.model = CrossEncoder(self.model_name)
+        logger.info("Reranker успешно загружен")
+
+    def _predict(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        """Вычисляет оценки cross-encoder для пар (запрос, вопрос)."""
+        scores = self.model.predict(pairs, convert_to_numpy=True)
+        return [float(score) for score in scores]
+
+    def _finish_predict(self, cache_key: Tuple[Any, ...], future: Any) -> None:
+        """
+        Учитывает завершение вызова модели в потоке пула.
+
+        Вызывается и для запросов, не дождавшихся оценок: поздний результат
+        сохраняется в кэш, а ошибка забирается из future и пишется в лог.
+        """
+        self._in_flight -= 1
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            logger.error(f"Ошибка reranking: {future.exception()}")
+            return
+        self._cache.put(cache_key, future.result())
+
+    async def rerank(
+        self, query: str, candidates: List[Tuple[Dict[str, Any], float]]
+    ) -> Optional[List[Tuple[Dict[str, Any], float]]]:
+        """
+        Переоценивает кандидатов поиска.
+
+        Args:
+            query: Запрос пользователя
+            candidates: Кандидаты поиска (запись базы знаний, сходство)
+
+        Returns:
+            Кандидаты, отсортированные по оценке reranker, или None,
+            если reranking недоступен или не уложился в бюджет времени
+        """
+        if self.model is None or not candidates:
+            return None
+
+        self._stats["calls"] += 1
+        cache_key = (
+            " ".join(query.lower().split()),
+            tuple(entry["id"] for entry, _ in candidates),
+        )
+
+        scores = self._cache.get(cache_key)
+        trace_cache("reranker", scores is not None)
+        if scores is None:
+            # Вызовы, вышедшие за бюджет, продолжают занимать потоки пула
+            if self._in_flight >= self.max_in_flight:
+                self._stats["skipped_busy"] += 1
+                logger.warning("Reranker занят предыдущими вызовами, пропускаем")
+                return None
+
+            pairs = [(query, entry["question"]) for entry, _ in candidates]
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(None, self._predict, pairs)
+            self._in_flight += 1
+            future.add_done_callback(partial(self._finish_predict, cache_key))
+            try:
+                # shield: по таймауту отменяется ожидание, а не future, и
+                # счетчик уменьшается, только когда поток действительно свободен
+                scores = await asyncio.wait_for(
+                    asyncio.shield(future), timeout=self.timeout
+                )
+            except asyncio.TimeoutError:
+                self._stats["timeouts"] += 1
+                logger.warning(
+                    f"Reranking превысил бюджет {self.timeout:.3f}с, пропускаем"
+                )
+                return None
+            except Exception:
+                # Ошибка уже записана в лог в _finish_predict
+                return None
+
+        reranked = [(entry, score) for (entry, _), score in zip(candidates, scores)]
+        reranked.sort(key=lambda item: item[1], reverse=True)
+        return reranked
+
+    def is_confident(self, reranked: List[Tuple[Dict[str, Any], float]]) -> bool:
+        """
+        Проверяет, достаточно ли уверен reranker в лучшем кандидате.
+
+        Args:
+            reranked: Кандидаты, отсортированные по оценке reranker
+
+        Returns:
+            bool: True если лучший кандидат можно вернуть как ответ
+        """
+        if not reranked:
+            return False
+
+        best_score = reranked[0][1]
+        if best_score < RERANKER_ACCEPT_THRESHOLD:
+            return False
+
+        if len(reranked) > 1 and best_score - reranked[1][1] < RERANKER_MIN_MARGIN:
+            return False
+
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Возвращает статистику reranker.
+
+        Returns:
+            Dict[str, Any]: Статистика вызовов и кэша
+        """
+        return {**self._stats, "cache": self._cache.get_stats()}
@@ -1,13 +1,37 @@
 """Утилиты для поиска и работы с эмбеддингами."""
 
+import asyncio
 import json
 import logging
+import time
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 import faiss
 import numpy as np
-from sentence_transformers import SentenceTransformer
+
+from .encoders import Encoder, check_cascade_backend, create_encoder
+from .metrics import encoder_queue_depth, record_stage, stage_timer
+from .reranker import CrossEncoderReranker
+from .search_config import (
+    CASCADE_ACCEPT_THRESHOLD,
+    CASCADE_INDEX_FILE,
+    CASCADE_MIN_MARGIN,
+    CASCADE_MODEL,
+    ENABLE_CASCADE,
+    ENABLE_RERANKER,
+    ENCODER_BACKEND,
+    INDEX_META_FILE,
+    NEIGHBORS_FILE,
+    PROJECTION_FILE,
+    RERANKER_TOP_K,
+    RESCORE_CANDIDATES_FACTOR,
+    VECTORS_FILE,
+)
+from .text_normalize import normalize_text_forms
+from .tracing import debug_trace, trace_event
+from .vector_quantization import AnyIndex, read_index, search_with_rescoring
+from .vector_reduction import VectorProjection
 
 # Настройка логирования
 logger = logging.getLogger(__name__)
@@ -27,36 +51,73 @@ TOP_K_RESULTS = 5
 class SearchEngine:
     """Класс для поиска в базе знаний FAQ."""
 
-    def __init__(self) -> None:
-        """Инициализирует поисковый движок."""
-        self.model: Optional[SentenceTransformer] = None
-        self.index: Optional[faiss.Index] = None
+    def __init__(
+        self,
+        enable_reranker: bool = ENABLE_RERANKER,
+        enable_cascade: bool = ENABLE_CASCADE,
+        data_dir: Optional[str] = None,
+        encoder_backend: str = ENCODER_BACKEND,
+    ) -> None:
+        """
+        Инициализирует поисковый движок.
+
+        Args:
+            enable_reranker: Включить переоценку кандидатов в зоне средней
+                уверенности
+            enable_cascade: Включить каскад из быстрой модели и bge-m3
+            data_dir: Директория с индексом и базой знаний (по умолчанию
+                пути из конфигурации, обычно data/)
+            encoder_backend: Бэкенд эмбеддингов ("sentence-transformers",
+                "model-server" или "hashing")
+        """
+        self.data_dir = data_dir
+        self.encoder_backend = encoder_backend
+        self.model: Optional[Encoder] = None
+        self.index: Optional[AnyIndex] = None
+        self.index_meta: Dict[str, Any] = {}
+        self.quantization: Optional[str] = None
+        self.vectors: Optional[np.ndarray] = None
         self.knowledge_base: List[Dict[str, Any]] = []
+        self.kb_by_id: Dict[str, Dict[str, Any]] = {}
+        self.neighbors: Dict[str, List[Dict[str, Any]]] = {}
+        self.projection: Optional[VectorProjection] = None
+        self.enable_reranker = enable_reranker
+        self.reranker: Optional[CrossEncoderReranker] = None
+        self.enable_cascade = enable_cascade
+        self.cascade_model: Optional[Encoder] = None
+        self.cascade_index: Optional[faiss.Index] = None
+        # Перевод оценок быстрой модели в шкалу bge-m3: (slope, intercept)
+        self.cascade_calibration: Tuple[float, float] = (1.0, 0.0)
+        self._cascade_stats = {
+            "queries": 0,
+            "escalations": 0,
+            "small_tier_seconds": 0.0,
+            "large_tier_seconds": 0.0,
+        }
         self._is_initialized = False
 
+    def _data_file(self, default_path: str) -> str:
+        """Возвращает путь к файлу данных с учетом data_dir."""
+        if self.data_dir is None:
+            return default_path
+        return str(Path(self.data_dir) / Path(default_path).name)
+
     async def initialize(self) -> None:
         """Инициализирует поисковый движок."""
         try:
             # Загружаем модель эмбеддингов
-            logger.info(f"Загружаем модель {EMBEDDING_MODEL}...")
-            self.model = SentenceTransformer(EMBEDDING_MODEL)
+            self.model = create_encoder(EMBEDDING_MODEL, self.encoder_backend)
 
-            # Загружаем FAISS индекс
-            if Path(INDEX_FILE).exists():
-                self.index = faiss.read_index(INDEX_FILE)
-                logger.info(f"Загружен FAISS индекс с {self.index.ntotal} векторами")
-            else:
-                raise FileNotFoundError(f"FAISS индекс не найден: {INDEX_FILE}")
+            self.load_data()
+            self._check_model()
 
-            # Загружаем базу знаний
-            if Path(KB_FILE).exists():
-                with open(KB_FILE, "r", encoding="utf-8") as f:
-                    self.knowledge_base = [json.loads(line) for line in f]
-                logger.info(
-                    f"Загружена база знаний с {len(self.knowledge_base)} записями"
-                )
-            else:
-                raise FileNotFoundError(f"База знаний не найдена: {KB_FILE}")
+            # Загружаем reranker (необязательный этап)
+            if self.enable_reranker:
+                self._load_reranker()
+
+            # Загружаем быструю модель каскада (необязательный этап)
+            if self.enable_cascade:
+                self._load_cascade()
 
             self._is_initialized = True
             logger.info("Поисковый движок инициализирован успешно")
@@ -65,6 +126,144 @@ class SearchEngine:
             logger.error(f"Ошибка инициализации поискового движка: {e}")
             raise
 
+    def load_data(self) -> None:
+        """
+        Загружает индекс, базу знаний и сопутствующие файлы без моделей.
+
+        Raises:
+            FileNotFoundError: Если индекс или база знаний не найдены
+        """
+        index_file = self._data_file(INDEX_FILE)
+        kb_file = self._data_file(KB_FILE)
+        index_meta_file = self._data_file(INDEX_META_FILE)
+        vectors_file = self._data_file(VECTORS_FILE)
+        projection_file = self._data_file(PROJECTION_FILE)
+        neighbors_file = self._data_file(NEIGHBORS_FILE)
+
+        # Загружаем описание индекса (отсутствует у старых сборок)
+        if Path(index_meta_file).exists():
+            with open(index_meta_file, "r", encoding="utf-8") as f:
+                self.index_meta = json.load(f)
+        self.quantization = self.index_meta.get("quantization")
+
+        # Загружаем FAISS индекс
+        if Path(index_file).exists():
+            self.index = read_index(index_file, self.quantization)
+            logger.info(f"Загружен FAISS индекс с {self.index.ntotal} векторами")
+        else:
+            raise FileNotFoundError(f"FAISS индекс не найден: {index_file}")
+
+        # Для сжатого индекса подключаем исходные векторы без чтения в память
+        if self.quantization:
+            if Path(vectors_file).exists():
+                self.vectors = np.load(vectors_file, mmap_mode="r")
+                logger.info(
+                    f"Сжатый индекс ({self.quantization}), "
+                    f"переоценка по {vectors_file}"
+                )
+            else:
+                logger.warning(
+                    f"Файл {vectors_file} не найден, сжатый индекс "
+                    f"({self.quantization}) вернет приближенные оценки"
+                )
+
+        # Загружаем проекцию сниженной размерности, если индекс построен с ней
+        if Path(projection_file).exists():
+            self.projection = VectorProjection.load(projection_file)
+            if self.projection.output_dim != self.index.d:
+                raise ValueError(
+                    f"Размерность проекции {self.projection.output_dim} "
+                    f"не совпадает с индексом {self.index.d}"
+                )
+            logger.info(
+                f"Загружена проекция {self.projection.method}: "
+                f"{self.projection.input_dim} -> {self.projection.output_dim}"
+            )
+
+        # Загружаем базу знаний
+        if Path(kb_file).exists():
+            with open(kb_file, "r", encoding="utf-8") as f:
+                self.knowledge_base = [json.loads(line) for line in f]
+            logger.info(f"Загружена база знаний с {len(self.knowledge_base)} записями")
+        else:
+            raise FileNotFoundError(f"База знаний не найдена: {kb_file}")
+        self.kb_by_id = {entry["id"]: entry for entry in self.knowledge_base}
+
+        # Загружаем граф соседей (отсутствует у старых сборок)
+        if Path(neighbors_file).exists():
+            with open(neighbors_file, "r", encoding="utf-8") as f:
+                self.neighbors = json.load(f)
+            logger.info(f"Загружен граф соседей для {len(self.neighbors)} записей")
+
+    def _check_model(self) -> None:
+        """
+        Проверяет, что модель эмбеддингов подходит к загруженному индексу.
+
+        Raises:
+            ValueError: Если размерность модели не совпадает с индексом
+        """
+        expected_dim = (
+            self.projection.input_dim if self.projection is not None else self.index.d
+        )
+        if self.model.dimension != expected_dim:
+            raise ValueError(
+                f"Размерность модели {self.model.model_id} ({self.model.dimension}) "
+                f"не совпадает с индексом ({expected_dim})"
+            )
+
+        index_model = self.index_meta.get("model")
+        if index_model and index_model != self.model.model_id:
+            logger.warning(
+                f"Индекс собран моделью {index_model}, "
+                f"а запросы кодируются моделью {self.model.model_id}"
+            )
+
+    def _load_reranker(self) -> None:
+        """Загружает reranker, при ошибке продолжает работу без него."""
+        try:
+            reranker = CrossEncoderReranker()
+            reranker.load()
+            self.reranker = reranker
+        except Exception as e:
+            logger.warning(f"Reranker недоступен, работаем без него: {e}")
+            self.reranker = None
+
+    def _load_cascade(self) -> None:
+        """Загружает быструю модель и ее индекс, при ошибке отключает каскад."""
+        cascade_index_file = self._data_file(CASCADE_INDEX_FILE)
+        try:
+            check_cascade_backend(self.encoder_backend)
+            if not Path(cascade_index_file).exists():
+                raise FileNotFoundError(
+                    f"Индекс быстрой модели не найден: {cascade_index_file}"
+                )
+
+            cascade_index = faiss.read_index(cascade_index_file)
+            if cascade_index.ntotal != self.index.ntotal:
+                raise ValueError(
+                    f"Индекс быстрой модели содержит {cascade_index.ntotal} "
+                    f"векторов вместо {self.index.ntotal}"
+                )
+
+            calibration = self.index_meta.get("cascade_calibration")
+            if calibration:
+                self.cascade_calibration = (
+                    float(calibration["slope"]),
+                    float(calibration["intercept"]),
+                )
+            else:
+                logger.warning(
+                    "Калибровка каскада не найдена в описании индекса, оценки "
+                    "быстрой модели сравниваются с порогами bge-m3 как есть"
+                )
+
+            self.cascade_model = create_encoder(CASCADE_MODEL, self.encoder_backend)
+            self.cascade_index = cascade_index
+        except Exception as e:
+            logger.warning(f"Каскад недоступен, используем только bge-m3: {e}")
+            self.cascade_model = None
+            self.cascade_index = None
+
     def _ensure_initialized(self) -> None:
         """Проверяет, что движок инициализирован."""
         if not self._is_initialized:
@@ -72,29 +271,46 @@ class SearchEngine:
 
     def normalize_text(self, text: str) -> str:
         """Нормализует текст для лучшего поиска."""
-        if not isinstance(text, str):
-            return ""
-
-        # Базовая нормализация
-        text = text.strip().lower()
-
-        # Удаляем лишние пробелы
-        text = " ".join(text.split())
-
-        return text
+        # Общая нормализация с сервером и конвертером, чтобы формы не расходились
+        return normalize_text_forms(text).search
 
-    async def generate_embedding(self, text: str) -> np.ndarray:
-        """Генерирует эмбеддинг для текста."""
+    async def generate_embedding(
+        self, text: str, model: Optional[Encoder] = None
+    ) -> np.ndarray:
+        """Генерирует эмбеддинг для текста (по умолчанию основной моделью)."""
         self._ensure_initialized()
 
         try:
             normalized_text = self.normalize_text(text)
-            embedding = self.model.encode([normalized_text], convert_to_numpy=True)
+            started = time.perf_counter()
+            encoder = model or self.model
+            queue_label = "main" if model is None else "cascade"
+            encoder_queue_depth.inc(queue_label)
+            try:
+                if getattr(encoder, "blocking_io", False):
+                    # Запрос к серверу моделей не должен останавливать цикл
+                    # событий; вызовы ждут свободного потока пула
+                    embedding = await asyncio.to_thread(
+                        encoder.encode, [normalized_text], convert_to_numpy=True
+                    )
+                else:
+                    embedding = encoder.encode([normalized_text], convert_to_numpy=True)
+            finally:
+                encoder_queue_depth.dec(queue_label)
 
             # Нормализуем для косинусного сходства
+            embedding = embedding.astype("float32")
             faiss.normalize_L2(embedding)
 
-            return embedding.astype("float32")
+            # Основной индекс может хранить векторы сниженной размерности
+            if model is None and self.projection is not None:
+                embedding = self.projection.apply(embedding)
+
+            record_stage(
+                "encode" if model is None else "encode_cascade",
+                time.perf_counter() - started,
+            )
+            return embedding
 
         except Exception as e:
             logger.error(f"Ошибка генерации эмбеддинга: {e}")
@@ -107,18 +323,26 @@ class SearchEngine:
         self._ensure_initialized()
 
         try:
+            # Сначала пробуем ответить быстрой моделью каскада
+            if self.cascade_model is not None:
+                results = await self._search_cascade(query, top_k)
+                if results is not None:
+                    return results
+
+            started = time.perf_counter()
+
             # Генерируем эмбеддинг для запроса
             query_embedding = await self.generate_embedding(query)
 
             # Ищем похожие векторы
-            similarities, indices = self.index.search(query_embedding, top_k)
+            with stage_timer("faiss"):
+                similarities, indices = self._search_index(query_embedding, top_k)
+            results = self._collect_results(similarities, indices)
 
-            # Формируем результаты
-            results = []
-            for similarity, idx in zip(similarities[0], indices[0]):
-                if idx < len(self.knowledge_base):
-                    kb_entry = self.knowledge_base[idx]
-                    results.append((kb_entry, float(similarity)))
+            if self.cascade_model is not None:
+                self._cascade_stats["large_tier_seconds"] += (
+                    time.perf_counter() - started
+                )
 
             logger.info(
                 f"Найдено {len(results)} похожих вопросов "
@@ -130,6 +354,126 @@ class SearchEngine:
             logger.error(f"Ошибка поиска: {e}")
             raise
 
+    def _search_index(
+        self, query_embedding: np.ndarray, top_k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Ищет в основном индексе, для сжатого индекса с точной переоценкой."""
+        if not self.quantization:
+            return self.index.search(query_embedding, top_k)
+
+        return search_with_rescoring(
+            self.index,
+            query_embedding,
+            top_k,
+            top_k * RESCORE_CANDIDATES_FACTOR,
+            self.vectors,
+        )
+
+    def _collect_results(
+        self, similarities: np.ndarray, indices: np.ndarray
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        """Сопоставляет результаты FAISS с записями базы знаний."""
+        results = []
+        for similarity, idx in zip(similarities[0], indices[0]):
+            if 0 <= idx < len(self.knowledge_base):
+                kb_entry = self.knowledge_base[idx]
+                results.append((kb_entry, float(similarity)))
+        return results
+
+    async def _search_cascade(
+        self, query: str, top_k: int
+    ) -> Optional[List[Tuple[Dict[str, Any], float]]]:
+        """
+        Ищет ответ быстрой моделью каскада.
+
+        Оценки быстрой модели переводятся в шкалу bge-m3, поэтому порог
+        эскалации и confidence ответа сравнимы с ответами основной модели.
+
+        Returns:
+            Результаты поиска, если быстрая модель уверена, иначе None
+            (запрос эскалируется к основной модели)
+        """
+        started = time.perf_counter()
+        query_embedding = await self.generate_embedding(query, self.cascade_model)
+        with stage_timer("faiss_cascade"):
+            similarities, indices = self.cascade_index.search(query_embedding, top_k)
+        slope, intercept = self.cascade_calibration
+        similarities = np.clip(similarities * slope + intercept, -1.0, 1.0)
+        results = self._collect_results(similarities, indices)
+
+        self._cascade_stats["queries"] += 1
+        self._cascade_stats["small_tier_seconds"] += time.perf_counter() - started
+
+        if results:
+            best_score = results[0][1]
+            margin = best_score - results[1][1] if len(results) > 1 else best_score
+            if best_score >= CASCADE_ACCEPT_THRESHOLD and margin >= CASCADE_MIN_MARGIN:
+                trace_event("fast_path", "cascade")
+                logger.info(
+                    f"Быстрая модель ответила без эскалации "
+                    f"(score: {best_score:.3f}) для запроса: {query[:50]}..."
+                )
+                return results
+
+        self._cascade_stats["escalations"] += 1
+        trace_event("cascade_escalated", True)
+        return None
+
+    def get_cascade_stats(self) -> Dict[str, Any]:
+        """
+        Возвращает статистику каскада моделей.
+
+        Returns:
+            Dict[str, Any]: Доля эскалаций и средняя задержка каждого уровня
+        """
+        stats = self._cascade_stats
+        queries = stats["queries"]
+        escalations = stats["escalations"]
+        return {
+            "enabled": self.cascade_model is not None,
+            "queries": queries,
+            "escalations": escalations,
+            "escalation_rate": escalations / queries if queries else 0.0,
+            "small_tier_avg_ms": (
+                stats["small_tier_seconds"] / queries * 1000 if queries else 0.0
+            ),
+            "large_tier_avg_ms": (
+                stats["large_tier_seconds"] / escalations * 1000 if escalations else 0.0
+            ),
+        }
+
+    def get_related_questions(
+        self, source_id: str, limit: int = 3
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Возвращает похожие вопросы по заранее построенному графу соседей.
+
+        Не обращается к модели эмбеддингов, поэтому работает мгновенно.
+
+        Args:
+            source_id: ID записи базы знаний
+            limit: Максимальное количество вопросов
+
+        Returns:
+            Список похожих вопросов (id, question, score) или None,
+            если запись с таким ID не найдена
+        """
+        if source_id not in self.kb_by_id:
+            return None
+
+        related = []
+        for neighbor in self.neighbors.get(source_id, [])[:limit]:
+            entry = self.kb_by_id.get(neighbor["id"])
+            if entry:
+                related.append(
+                    {
+                        "id": entry["id"],
+                        "question": entry["question"],
+                        "score": neighbor["score"],
+                    }
+                )
+        return related
+
     def get_confidence_level(self, similarity: float) -> str:
         """Определяет уровень уверенности по сходству."""
         if similarity >= HIGH_CONFIDENCE_THRESHOLD:
@@ -142,8 +486,16 @@ class SearchEngine:
     async def find_best_answer(self, query: str) -> Dict[str, Any]:
         """Находит лучший ответ на вопрос пользователя."""
         try:
-            # Ищем похожие вопросы
-            similar_results = await self.search_similar(query, top_k=3)
+            # Ищем похожие вопросы (для reranker берем больше кандидатов)
+            top_k = max(3, RERANKER_TOP_K) if self.reranker else 3
+            similar_results = await self.search_similar(query, top_k=top_k)
+
+            trace = debug_trace()
+            if trace is not None:
+                trace.events["candidates"] = [
+                    {"id": entry["id"], "score": round(score, 4)}
+                    for entry, score in similar_results
+                ]
 
             if not similar_results:
                 return {
@@ -156,6 +508,26 @@ class SearchEngine:
             # Берем лучший результат
             best_match, best_similarity = similar_results[0]
             confidence_level = self.get_confidence_level(best_similarity)
+            trace_event("confidence_level", confidence_level)
+
+            # В зоне средней уверенности уточняем выбор reranker-ом
+            if confidence_level == "medium" and self.reranker:
+                reranked = await self.reranker.rerank(
+                    query, similar_results[:RERANKER_TOP_K]
+                )
+                if reranked and self.reranker.is_confident(reranked):
+                    best_match, rerank_score = reranked[0]
+                    trace_event("fast_path", "reranker")
+                    logger.info(
+                        f"Reranker разрешил уточнение: {best_match['id']} "
+                        f"(score: {rerank_score:.3f})"
+                    )
+                    return {
+                        "reply": best_match["answer"],
+                        "confidence": min(rerank_score, 1.0),
+                        "source": best_match["id"],
+                        "similar_questions": [],
+                    }
 
             if confidence_level == "high":
                 # Высокая уверенность - возвращаем готовый ответ
@@ -0,0 +1,62 @@
+"""Конфигурация для поискового движка."""
+
+# Reranking кандидатов cross-encoder моделью
+# Применяется только когда лучшая оценка попадает в зону средней уверенности
+ENABLE_RERANKER = False
+RERANKER_MODEL = "BAAI/bge-reranker-v2-m3"
+RERANKER_TOP_K = 5  # Сколько кандидатов переоценивать
+RERANKER_ACCEPT_THRESHOLD = 0.8  # Минимальная оценка reranker для ответа
+RERANKER_MIN_MARGIN = 0.1  # Минимальный отрыв лучшего кандидата от второго
+RERANKER_TIMEOUT = 0.3  # Бюджет времени (сек), после которого reranking пропускается
+RERANKER_CACHE_SIZE = 1000
+# Максимум одновременных вызовов cross-encoder, включая вышедшие за бюджет:
+# поток пула нельзя прервать, поэтому при медленной модели новые запросы
+# пропускают reranking, а не копятся в очереди пула потоков
+RERANKER_MAX_IN_FLIGHT = 2
+
+# Каскад моделей: быстрая модель отвечает первой,
+# bge-m3 используется только при неуверенном ответе быстрой модели
+ENABLE_CASCADE = False
+CASCADE_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+CASCADE_INDEX_FILE = "data/faiss_small.index"
+# Оценки быстрой модели приводятся к шкале bge-m3 линейной калибровкой,
+# которую конвертер подбирает по парам соседних вопросов базы знаний и
+# сохраняет в index_meta.json. Порог, отрыв и confidence ответа каскада
+# задаются в шкале bge-m3, как HIGH_CONFIDENCE_THRESHOLD
+CASCADE_ACCEPT_THRESHOLD = 0.85  # Минимальная оценка без эскалации (шкала bge-m3)
+CASCADE_MIN_MARGIN = 0.05  # Минимальный отрыв лучшего кандидата (шкала bge-m3)
+CASCADE_CALIBRATION_NEIGHBORS = 5  # Соседей на вопрос для подбора калибровки
+CASCADE_CALIBRATION_SAMPLE = 2000  # Максимум вопросов для подбора калибровки
+
+# Снижение размерности векторов: None, "pca" или "truncate"
+# (усечение до префикса в стиле Matryoshka)
+VECTOR_REDUCTION = None
+REDUCED_DIM = 256
+PROJECTION_FILE = "data/projection.npz"
+REDUCTION_REPORT_FILE = "data/reduction_report.json"
+REDUCTION_REPORT_TOP_K = 5  # k для recall@k в отчете о снижении размерности
+# Отчет считается кросс-валидацией: проекция обучается без векторов-запросов
+REDUCTION_REPORT_FOLDS = 5
+
+# Сжатое хранение векторов в индексе: None, "fp16", "sq8" или "binary"
+# Кандидаты первого этапа переоцениваются по исходным float32 векторам
+VECTOR_QUANTIZATION = None
+VECTORS_FILE = "data/vectors.npy"
+RESCORE_CANDIDATES_FACTOR = 4  # Первый этап возвращает top_k * factor кандидатов
+
+# Описание собранного индекса (тип квантования и т.п.)
+INDEX_META_FILE = "data/index_meta.json"
+
+# Граф ближайших соседей базы знаний для подсказок "похожие вопросы"
+NEIGHBORS_FILE = "data/kb_neighbors.json"
+NEIGHBORS_TOP_K = 5
+
+# Бэкенд эмбеддингов: "sentence-transformers" (локальная модель),
+# "model-server" (сервер с API text-embeddings-inference) или
+# "hashing" (детерминированная заглушка для офлайн тестов без весов модели)
+ENCODER_BACKEND = "sentence-transformers"
+MODEL_SERVER_URL = "http://localhost:8080"
+MODEL_SERVER_TIMEOUT = 10.0
+MODEL_SERVER_BATCH_SIZE = 32
+HASHING_DIM = 1024
+HASHING_NGRAM_SIZE = 3
@@ -1,7 +1,47 @@
 """Модуль для умной нормализации текста приветствий."""
 
 import re
-from typing import Dict, List
+from typing import List
+
+from .greetings_config import (
+    ENGLISH_GREETINGS,
+    GREETING_WORDS,
+    KAZAKH_GREETINGS,
+    NON_GREETING_WORDS,
+)
+from .text_normalize import COMMON_FIXES, collapse_repeated_chars, normalize_text_forms
+
+
+def _build_keyword_matcher() -> "re.Pattern[str]":
+    """
+    Собирает одно регулярное выражение для слов-приветствий и стоп-слов.
+
+    Слова-приветствия ищутся целиком (группа "greeting"), не-приветственные
+    слова - как подстроки (группа "non_greeting"), как и раньше. Одно
+    выражение позволяет классифицировать сообщение за один проход
+    независимо от количества слов в списках.
+    """
+    greeting_words = set(GREETING_WORDS)
+    for phrase in ENGLISH_GREETINGS + KAZAKH_GREETINGS:
+        greeting_words.update(phrase.split())
+
+    def alternation(words: List[str]) -> str:
+        # Текст проверяется после smart_normalize_text, поэтому добавляем
+        # и формы слов без повторяющихся букв (hello -> helo)
+        forms = {word.lower() for word in words}
+        forms |= {collapse_repeated_chars(form) for form in forms}
+        # Длинные слова первыми, чтобы они не перекрывались префиксами
+        ordered = sorted(forms, key=len, reverse=True)
+        return "|".join(re.escape(word) for word in ordered)
+
+    return re.compile(
+        rf"(?P<non_greeting>{alternation(NON_GREETING_WORDS)})"
+        rf"|\b(?P<greeting>{alternation(list(greeting_words))})\b"
+    )
+
+
+# Автомат ключевых слов строится один раз при импорте модуля
+_KEYWORD_RE = _build_keyword_matcher()
 
 
 def smart_normalize_text(text: str) -> str:
@@ -14,25 +54,7 @@ def smart_normalize_text(text: str) -> str:
     Returns:
         str: Нормализованный текст
     """
-    if not text:
-        return ""
-
-    # Базовая нормализация
-    normalized = text.lower().strip()
-
-    # Убираем знаки препинания в конце
-    normalized = re.sub(r"[.!?]+$", "", normalized)
-
-    # Убираем лишние пробелы
-    normalized = re.sub(r"\s+", " ", normalized).strip()
-
-    # Удаляем повторяющиеся символы (приветт -> привет)
-    normalized = re.sub(r"(.)\1+", r"\1", normalized)
-
-    # Стандартизация частых опечаток
-    normalized = apply_common_fixes(normalized)
-
-    return normalized
+    return normalize_text_forms(text).greeting
 
 
 def apply_common_fixes(text: str) -> str:
@@ -45,25 +67,8 @@ def apply_common_fixes(text: str) -> str:
     Returns:
         str: Исправленный текст
     """
-    # Словарь частых исправлений (только неправильные -> правильные)
-    common_fixes: Dict[str, str] = {
-        # Формальные приветствия с опечатками
-        "здраствуйте": "здравствуйте",  # пропуск "в"
-        "здравствуйте": "здравствуйте",  # замена "в" на "в"
-        "добрый ден": "добрый день",  # пропуск мягкого знака
-        # Неформальные приветствия с опечатками
-        "приветт": "привет",  # удвоение "т"
-        "привет": "привет",  # замена "т" на "т"
-        # Остальные паттерны оставляем как есть
-    }
-
-    # Применяем исправления только для неправильных вариантов
-    for wrong, correct in common_fixes.items():
-        if text == wrong:  # Точное совпадение с неправильным вариантом
-            text = correct
-            break
-
-    return text
+    # Исправляем только точное совпадение с неправильным вариантом
+    return COMMON_FIXES.get(text, text)
 
 
 def extract_greeting_words(text: str) -> List[str]:
@@ -76,40 +81,12 @@ def extract_greeting_words(text: str) -> List[str]:
     Returns:
         List[str]: Список потенциальных приветствий
     """
-    words = text.split()
-    greeting_words = []
-
-    # Список слов-приветствий
-    greeting_word_list = [
-        "здравствуйте",
-        "здраствуйте",
-        "здравствуйте",
-        "добрый",
-        "доброе",
-        "доброго",
-        "добрй",  # опечатка в "добрый"
-        "ден",  # опечатка в "день"
-        "привет",
-        "приветт",
-        "привет",
-        "хай",
-        "хелло",
-        "хей",
-        "здрасьте",
-        "здарова",
-        "добреньки",
-        "как",
-        "все",
-        "спасибо",
-        "благодарю",
+    return [
+        match.group("greeting")
+        for match in _KEYWORD_RE.finditer(text.lower())
+        if match.lastgroup == "greeting"
     ]
 
-    for word in words:
-        if word.lower() in greeting_word_list:
-            greeting_words.append(word.lower())
-
-    return greeting_words
-
 
 def is_potential_greeting(text: str) -> bool:
     """
@@ -130,30 +107,15 @@ def is_potential_greeting(text: str) -> bool:
     if len(normalized) > 100:
         return False
 
-    # Проверяем наличие слов-приветствий
-    greeting_words = extract_greeting_words(normalized)
-    if not greeting_words:
-        return False
-
-    # Проверяем, что текст не содержит явно не-приветственных слов
-    non_greeting_words = [
-        "вопрос",
-        "проблема",
-        "ошибка",
-        "помощь",
-        "заказ",
-        "оплата",
-        "доставка",
-        "возврат",
-        "жалоба",
-        "претензия",
-    ]
-
-    for word in non_greeting_words:
-        if word in normalized:
+    # Один проход: нужны слова-приветствия и не должно быть
+    # явно не-приветственных слов
+    has_greeting_word = False
+    for match in _KEYWORD_RE.finditer(normalized):
+        if match.lastgroup == "non_greeting":
             return False
+        has_greeting_word = True
 
-    return True
+    return has_greeting_word
 
 
 def normalize_for_fuzzy_matching(text: str) -> str:
@@ -166,15 +128,4 @@ def normalize_for_fuzzy_matching(text: str) -> str:
     Returns:
         str: Текст, оптимизированный для fuzzy matching
     """
-    if not text:
-        return ""
-
-    # Применяем умную нормализацию
-    normalized = smart_normalize_text(text)
-
-    # Дополнительные оптимизации для fuzzy matching
-    # Убираем очень короткие слова (предлоги, союзы)
-    words = normalized.split()
-    filtered_words = [word for word in words if len(word) > 2]
-
-    return " ".join(filtered_words)
+    return normalize_text_forms(text).fuzzy
@@ -0,0 +1,15 @@
+"""Конфигурация фоновой записи данных на диск."""
+
+# Обратная связь пользователей (JSONL, одна запись на строку)
+FEEDBACK_LOG_FILE = "data/feedback.log"
+FEEDBACK_BATCH_SIZE = 100  # Максимум записей в одной пачке
+FEEDBACK_QUEUE_SIZE = 10000  # Размер очереди в памяти
+FEEDBACK_FSYNC_INTERVAL = 5.0  # Как часто (сек) принудительно сбрасывать на диск
+FEEDBACK_MAX_BYTES = 10 * 1024 * 1024  # Ротация файла по размеру
+
+# Аналитика вопросов и обратной связи (SQLite в режиме WAL)
+ENABLE_ANALYTICS = True
+ANALYTICS_DB_FILE = "data/analytics.db"
+ANALYTICS_BATCH_SIZE = 500  # Максимум записей в одной транзакции
+ANALYTICS_QUEUE_SIZE = 10000  # Размер очереди в памяти
+ANALYTICS_FLUSH_INTERVAL = 5.0  # Интервал простоя (сек) перед checkpoint WAL
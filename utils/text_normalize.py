@@ -0,0 +1,126 @@
+"""Единый модуль нормализации текста для поиска, приветствий и конвертера."""
+
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, Iterator, NamedTuple, Optional
+
+# Размер LRU кэша нормализованных форм
+NORMALIZE_CACHE_SIZE = 4096
+
+# Регулярные выражения компилируются один раз при импорте
+_TRAILING_PUNCTUATION_RE = re.compile(r"[.!?]+$")
+_REPEATED_CHARS_RE = re.compile(r"(.)\1+")
+
+# Словарь частых исправлений (только неправильные -> правильные)
+COMMON_FIXES: Dict[str, str] = {
+    # Формальные приветствия с опечатками
+    "здраствуйте": "здравствуйте",  # пропуск "в"
+    "здравствуйте": "здравствуйте",  # замена "в" на "в"
+    "добрый ден": "добрый день",  # пропуск мягкого знака
+    # Неформальные приветствия с опечатками
+    "приветт": "привет",  # удвоение "т"
+    "привет": "привет",  # замена "т" на "т"
+}
+
+# Формы текста, уже вычисленные в рамках текущего запроса
+_request_forms: ContextVar[Optional[Dict[str, "NormalizedText"]]] = ContextVar(
+    "request_normalized_forms", default=None
+)
+
+
+class NormalizedText(NamedTuple):
+    """Все нормализованные формы одного текста."""
+
+    search: str  # Для эмбеддингов: нижний регистр, без лишних пробелов
+    greeting: str  # Для приветствий: плюс без конечной пунктуации и повторов букв
+    fuzzy: str  # Для fuzzy matching: форма приветствий без коротких слов
+
+
+def collapse_repeated_chars(text: str) -> str:
+    """Удаляет повторяющиеся символы (приветт -> привет)."""
+    return _REPEATED_CHARS_RE.sub(r"\1", text)
+
+
+def normalize_word(word: str) -> str:
+    """Нормализует отдельное слово так же, как форма для приветствий."""
+    return collapse_repeated_chars(word.lower())
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def _compute_forms(text: str) -> NormalizedText:
+    """Вычисляет все формы текста за один проход."""
+    # Базовая нормализация: нижний регистр и одиночные пробелы
+    search = " ".join(text.lower().split())
+
+    # Убираем знаки препинания в конце и повторяющиеся символы
+    greeting = _TRAILING_PUNCTUATION_RE.sub("", search).strip()
+    greeting = collapse_repeated_chars(greeting)
+
+    # Стандартизация частых опечаток (только точное совпадение)
+    greeting = COMMON_FIXES.get(greeting, greeting)
+
+    # Для fuzzy matching убираем очень короткие слова (предлоги, союзы)
+    fuzzy = " ".join(word for word in greeting.split() if len(word) > 2)
+
+    return NormalizedText(search, greeting, fuzzy)
+
+
+def normalize_text_forms(text: str) -> NormalizedText:
+    """
+    Возвращает все нормализованные формы текста.
+
+    Результат кэшируется в рамках запроса (см. normalization_scope)
+    и в общем LRU кэше, поэтому повторная нормализация одной строки
+    бесплатна.
+
+    Args:
+        text: Исходный текст
+
+    Returns:
+        NormalizedText: Формы для поиска, приветствий и fuzzy matching
+    """
+    if not text or not isinstance(text, str):
+        return NormalizedText("", "", "")
+
+    request_forms = _request_forms.get()
+    if request_forms is None:
+        return _compute_forms(text)
+
+    forms = request_forms.get(text)
+    if forms is None:
+        forms = _compute_forms(text)
+        request_forms[text] = forms
+    return forms
+
+
+@contextmanager
+def normalization_scope() -> Iterator[None]:
+    """Кэширует нормализованные формы на время обработки одного запроса."""
+    token = _request_forms.set({})
+    try:
+        yield
+    finally:
+        _request_forms.reset(token)
+
+
+def clear_normalize_cache() -> None:
+    """Очищает LRU кэш нормализации."""
+    _compute_forms.cache_clear()
+
+
+def get_normalize_cache_stats() -> Dict[str, int]:
+    """
+    Возвращает статистику LRU кэша нормализации.
+
+    Returns:
+        Dict[str, int]: Попадания, промахи и размер кэша
+    """
+    info = _compute_forms.cache_info()
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "cache_size": info.currsize,
+        "max_cache_size": info.maxsize,
+    }
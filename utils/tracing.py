@@ -0,0 +1,216 @@
+"""
+Трассировка отдельного запроса: request id, тайминги этапов и отладка.
+
+Идентификатор запроса и трассировка хранятся в ContextVar, поэтому видны
+всем функциям, вызванным при обработке запроса, без передачи аргументов.
+Фабрика записей логов добавляет request id в каждую запись, так что один
+медленный запрос прослеживается по логам роутера, приветствий и поиска.
+"""
+
+import logging
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+from .monitoring_config import REQUEST_ID_HEADER
+
+# Формат логов с идентификатором запроса
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] - %(message)s"
+
+# Значение request id вне обработки запроса
+NO_REQUEST_ID = "-"
+
+# Допустимый request id от клиента: без пробелов и управляющих символов
+_REQUEST_ID_RE = re.compile(r"^[\w.:-]{1,128}$")
+
+_request_id: ContextVar[str] = ContextVar("request_id", default=NO_REQUEST_ID)
+_request_trace: ContextVar[Optional["RequestTrace"]] = ContextVar(
+    "request_trace", default=None
+)
+
+
+class RequestTrace:
+    """Тайминги этапов и отладочные события одного запроса."""
+
+    def __init__(self, request_id: str, debug: bool = False) -> None:
+        """
+        Инициализирует трассировку.
+
+        Args:
+            request_id: Идентификатор запроса
+            debug: Собирать отладочные события (кэши, кандидаты FAISS)
+        """
+        self.request_id = request_id
+        self.debug = debug
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.caches: Dict[str, str] = {}
+        self.events: Dict[str, Any] = {}
+
+    def add_stage(self, stage: str, seconds: float) -> None:
+        """Добавляет длительность этапа (повторные вызовы суммируются)."""
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        """Время с начала запроса в секундах."""
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """
+        Возвращает значение заголовка Server-Timing.
+
+        Returns:
+            str: Этапы и общее время в миллисекундах, например
+            "greeting;dur=0.05, encode;dur=3.1, total;dur=4.2"
+        """
+        timings = {**self.stages, "total": self.elapsed()}
+        return ", ".join(
+            f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in timings.items()
+        )
+
+    def to_payload(self) -> Dict[str, Any]:
+        """
+        Возвращает отладочную трассировку для ответа API.
+
+        Returns:
+            Dict[str, Any]: request id, этапы в миллисекундах, кэши и события
+        """
+        return {
+            "request_id": self.request_id,
+            "stages_ms": {
+                stage: round(seconds * 1000, 3)
+                for stage, seconds in self.stages.items()
+            },
+            "total_ms": round(self.elapsed() * 1000, 3),
+            "caches": dict(self.caches),
+            **self.events,
+        }
+
+
+def new_request_id() -> str:
+    """Генерирует новый идентификатор запроса."""
+    return uuid.uuid4().hex
+
+
+def get_request_id() -> str:
+    """Возвращает идентификатор текущего запроса ("-" вне запроса)."""
+    return _request_id.get()
+
+
+def current_trace() -> Optional[RequestTrace]:
+    """Возвращает трассировку текущего запроса или None."""
+    return _request_trace.get()
+
+
+def debug_trace() -> Optional[RequestTrace]:
+    """Возвращает трассировку, если для запроса включен режим отладки."""
+    trace = _request_trace.get()
+    return trace if trace is not None and trace.debug else None
+
+
+def trace_event(name: str, value: Any) -> None:
+    """Записывает отладочное событие (только в режиме отладки)."""
+    trace = debug_trace()
+    if trace is not None:
+        trace.events[name] = value
+
+
+def trace_cache(cache: str, hit: bool) -> None:
+    """Отмечает попадание или промах кэша (только в режиме отладки)."""
+    trace = debug_trace()
+    if trace is not None:
+        trace.caches[cache] = "hit" if hit else "miss"
+
+
+@contextmanager
+def request_trace(debug: bool = False) -> Iterator[RequestTrace]:
+    """
+    Включает трассировку на время обработки запроса.
+
+    Если request id не задан middleware, генерируется новый.
+
+    Args:
+        debug: Собирать отладочные события
+
+    Yields:
+        RequestTrace: Трассировка запроса
+    """
+    request_id = _request_id.get()
+    id_token = None
+    if request_id == NO_REQUEST_ID:
+        request_id = new_request_id()
+        id_token = _request_id.set(request_id)
+
+    trace_token = _request_trace.set(RequestTrace(request_id, debug))
+    try:
+        yield _request_trace.get()
+    finally:
+        _request_trace.reset(trace_token)
+        if id_token is not None:
+            _request_id.reset(id_token)
+
+
+def _incoming_request_id(headers: Any) -> str:
+    """Берет request id из заголовков клиента или генерирует новый."""
+    header = REQUEST_ID_HEADER.lower().encode("latin-1")
+    for name, value in headers:
+        if name == header:
+            request_id = value.decode("latin-1")
+            if _REQUEST_ID_RE.match(request_id):
+                return request_id
+            break
+    return new_request_id()
+
+
+class RequestIdMiddleware:
+    """
+    ASGI middleware: назначает request id и возвращает его в заголовке.
+
+    Реализован без BaseHTTPMiddleware, чтобы обработчик выполнялся в той же
+    задаче и видел request id через ContextVar.
+    """
+
+    def __init__(self, app: Any) -> None:
+        """Оборачивает ASGI приложение."""
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        """Обрабатывает HTTP запрос с установленным request id."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _incoming_request_id(scope.get("headers", []))
+        header = (REQUEST_ID_HEADER.lower().encode("latin-1"), request_id.encode())
+
+        async def send_with_request_id(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                message = {
+                    **message,
+                    "headers": [*message.get("headers", []), header],
+                }
+            await send(message)
+
+        token = _request_id.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            _request_id.reset(token)
+
+
+def install_log_record_factory() -> None:
+    """Добавляет атрибут request_id во все записи логов (повторный вызов безопасен)."""
+    factory = logging.getLogRecordFactory()
+    if getattr(factory, "adds_request_id", False):
+        return
+
+    def record_factory(*args: Any, **kwargs: Any) -> logging.LogRecord:
+        record = factory(*args, **kwargs)
+        record.request_id = _request_id.get()
+        return record
+
+    record_factory.adds_request_id = True
+    logging.setLogRecordFactory(record_factory)
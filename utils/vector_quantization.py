@@ -0,0 +1,134 @@
+"""Утилиты для сжатого хранения векторов в FAISS индексе."""
+
+import logging
+from typing import Optional, Tuple, Union
+
+import faiss
+import numpy as np
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Поддерживаемые типы квантования
+QUANTIZATION_TYPES = ("fp16", "sq8", "binary")
+
+# Типы скалярного квантования FAISS
+_SCALAR_QUANTIZERS = {
+    "fp16": faiss.ScalarQuantizer.QT_fp16,
+    "sq8": faiss.ScalarQuantizer.QT_8bit,
+}
+
+AnyIndex = Union[faiss.Index, faiss.IndexBinary]
+
+
+def binarize(vectors: np.ndarray) -> np.ndarray:
+    """
+    Преобразует векторы в бинарные коды по знаку компонент.
+
+    Args:
+        vectors: Векторы (n, d), d кратно 8
+
+    Returns:
+        np.ndarray: Упакованные коды (n, d / 8) типа uint8
+    """
+    return np.packbits(vectors > 0, axis=1)
+
+
+def build_quantized_index(embeddings: np.ndarray, quantization: str) -> AnyIndex:
+    """
+    Строит FAISS индекс со сжатыми векторами.
+
+    Args:
+        embeddings: Нормализованные векторы float32 (n, d)
+        quantization: Тип квантования ("fp16", "sq8" или "binary")
+
+    Returns:
+        AnyIndex: Индекс для первого этапа поиска
+    """
+    if quantization not in QUANTIZATION_TYPES:
+        raise ValueError(
+            f"Неизвестный тип квантования: {quantization}. "
+            f"Поддерживаются: {', '.join(QUANTIZATION_TYPES)}"
+        )
+
+    dim = embeddings.shape[1]
+
+    if quantization == "binary":
+        if dim % 8:
+            raise ValueError(
+                f"Для бинарных кодов размерность {dim} должна быть кратна 8"
+            )
+        index = faiss.IndexBinaryFlat(dim)
+        index.add(binarize(embeddings))
+        return index
+
+    index = faiss.IndexScalarQuantizer(
+        dim, _SCALAR_QUANTIZERS[quantization], faiss.METRIC_INNER_PRODUCT
+    )
+    index.train(embeddings)
+    index.add(embeddings)
+    return index
+
+
+def write_index(index: AnyIndex, file_path: str) -> None:
+    """Сохраняет обычный или бинарный FAISS индекс."""
+    if isinstance(index, faiss.IndexBinary):
+        faiss.write_index_binary(index, file_path)
+    else:
+        faiss.write_index(index, file_path)
+
+
+def read_index(file_path: str, quantization: Optional[str] = None) -> AnyIndex:
+    """Загружает обычный или бинарный FAISS индекс."""
+    if quantization == "binary":
+        return faiss.read_index_binary(file_path)
+    return faiss.read_index(file_path)
+
+
+def search_with_rescoring(
+    index: AnyIndex,
+    query: np.ndarray,
+    top_k: int,
+    candidates_k: int,
+    vectors: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Ищет кандидатов по сжатому индексу и переоценивает их точно.
+
+    Переоценка по исходным float32 векторам возвращает те же косинусные
+    сходства, что и несжатый индекс, поэтому пороги уверенности не меняются.
+
+    Args:
+        index: Индекс со сжатыми векторами
+        query: Нормализованный вектор запроса (1, d)
+        top_k: Количество результатов
+        candidates_k: Количество кандидатов первого этапа
+        vectors: Исходные векторы (допускается np.memmap); без них
+            возвращаются приближенные оценки первого этапа
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (сходства, индексы) в формате FAISS
+    """
+    candidates_k = max(top_k, min(candidates_k, index.ntotal))
+    is_binary = isinstance(index, faiss.IndexBinary)
+
+    if is_binary:
+        distances, indices = index.search(binarize(query), candidates_k)
+        # Расстояние Хэмминга -> приближенное косинусное сходство
+        scores = np.cos(np.pi * distances.astype("float32") / index.d)
+    else:
+        scores, indices = index.search(query, candidates_k)
+
+    candidates = indices[0][indices[0] >= 0]
+    if vectors is not None and len(candidates):
+        # Читаем строки по возрастанию номеров, чтобы memmap читал диск подряд
+        candidates = np.sort(candidates)
+        exact = np.asarray(vectors[candidates], dtype="float32") @ query[0]
+        order = np.argsort(-exact)[:top_k]
+        return exact[order][None, :], candidates[order][None, :]
+
+    if vectors is None:
+        logger.debug("Исходные векторы недоступны, используем приближенные оценки")
+
+    order = np.argsort(-scores[0][: len(candidates)], kind="stable")[:top_k]
+    return scores[0][order][None, :], candidates[order][None, :]
@@ -0,0 +1,264 @@
+"""Утилиты для снижения размерности векторов (PCA и усечение)."""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+import faiss
+import numpy as np
+
+# Настройка логирования
+logger = logging.getLogger(__name__)
+
+# Поддерживаемые методы снижения размерности
+REDUCTION_METHODS = ("pca", "truncate")
+
+
+class VectorProjection:
+    """Линейная проекция векторов в пространство меньшей размерности."""
+
+    def __init__(self, method: str, components: np.ndarray) -> None:
+        """
+        Инициализирует проекцию.
+
+        Args:
+            method: Метод снижения размерности ("pca" или "truncate")
+            components: Матрица проекции размера (новая_размерность, исходная)
+        """
+        self.method = method
+        self.components = components.astype("float32")
+
+    @property
+    def input_dim(self) -> int:
+        """Исходная размерность векторов."""
+        return int(self.components.shape[1])
+
+    @property
+    def output_dim(self) -> int:
+        """Размерность векторов после проекции."""
+        return int(self.components.shape[0])
+
+    @classmethod
+    def fit(cls, embeddings: np.ndarray, method: str, dim: int) -> "VectorProjection":
+        """
+        Строит проекцию по эмбеддингам базы знаний.
+
+        PCA строится без центрирования, чтобы скалярные произведения
+        после проекции оставались близки к исходным косинусным сходствам
+        и пороги уверенности не требовали перекалибровки.
+
+        Args:
+            embeddings: Нормализованные эмбеддинги (n, d)
+            method: Метод снижения размерности ("pca" или "truncate")
+            dim: Целевая размерность
+
+        Returns:
+            VectorProjection: Обученная проекция
+        """
+        if method not in REDUCTION_METHODS:
+            raise ValueError(
+                f"Неизвестный метод снижения размерности: {method}. "
+                f"Поддерживаются: {', '.join(REDUCTION_METHODS)}"
+            )
+
+        n_vectors, input_dim = embeddings.shape
+        if dim >= input_dim:
+            raise ValueError(
+                f"Целевая размерность {dim} должна быть меньше исходной {input_dim}"
+            )
+
+        if method == "truncate":
+            components = np.eye(dim, input_dim, dtype="float32")
+            return cls(method, components)
+
+        # PCA не может выделить больше компонент, чем векторов в выборке
+        if dim > n_vectors:
+            logger.warning(
+                f"Векторов ({n_vectors}) меньше целевой размерности ({dim}), "
+                f"PCA ограничена {n_vectors} компонентами"
+            )
+            dim = n_vectors
+
+        _, _, vt = np.linalg.svd(embeddings.astype("float64"), full_matrices=False)
+        return cls(method, vt[:dim])
+
+    def project(self, embeddings: np.ndarray) -> np.ndarray:
+        """
+        Проецирует векторы без повторной нормализации.
+
+        Args:
+            embeddings: Векторы исходной размерности (n, d)
+
+        Returns:
+            np.ndarray: Векторы новой размерности
+        """
+        return np.ascontiguousarray(embeddings.astype("float32") @ self.components.T)
+
+    def apply(self, embeddings: np.ndarray) -> np.ndarray:
+        """
+        Проецирует векторы и заново нормализует их для косинусного сходства.
+
+        Args:
+            embeddings: Векторы исходной размерности (n, d)
+
+        Returns:
+            np.ndarray: Нормализованные векторы новой размерности
+        """
+        projected = self.project(embeddings)
+        faiss.normalize_L2(projected)
+        return projected
+
+    def save(self, file_path: str) -> None:
+        """Сохраняет проекцию в .npz файл."""
+        np.savez(file_path, method=self.method, components=self.components)
+
+    @classmethod
+    def load(cls, file_path: str) -> "VectorProjection":
+        """Загружает проекцию из .npz файла."""
+        with np.load(file_path) as data:
+            return cls(str(data["method"]), data["components"])
+
+
+def reduction_report(
+    full_embeddings: np.ndarray,
+    projection: VectorProjection,
+    top_k: int,
+    query_embeddings: Optional[np.ndarray] = None,
+    exclude: Optional[np.ndarray] = None,
+) -> Dict[str, Any]:
+    """
+    Сравнивает поиск по сниженной размерности с поиском по полной.
+
+    Выдача сравнивается по нормализованным проекциям, как при поиске.
+    Дрейф оценок считается по проекциям без повторной нормализации: он
+    показывает, насколько скалярные произведения после проекции отличаются
+    от исходных косинусных сходств.
+
+    Если запросы не переданы, каждый вектор базы знаний используется как
+    запрос, а он сам исключается из выдачи. Такая оценка завышена для PCA,
+    обученной на тех же векторах (см. cross_validate_reduction).
+
+    Args:
+        full_embeddings: Нормализованные векторы базы знаний полной размерности
+        projection: Проекция в пространство сниженной размерности
+        top_k: Глубина выдачи для recall@k
+        query_embeddings: Нормализованные запросы полной размерности
+        exclude: Для каждого запроса номер записи базы знаний, исключаемой
+            из выдачи (сам запрос, если он взят из базы знаний)
+
+    Returns:
+        Dict[str, Any]: recall@k, совпадение top-1 и дрейф оценок
+    """
+    if query_embeddings is None:
+        query_embeddings = full_embeddings
+        exclude = np.arange(full_embeddings.shape[0])
+
+    n_vectors = full_embeddings.shape[0]
+    k = min(top_k, n_vectors - 1 if exclude is not None else n_vectors)
+    if k < 1 or query_embeddings.shape[0] == 0:
+        return {"top_k": 0, "queries": 0}
+
+    full_scores = query_embeddings @ full_embeddings.T
+    reduced_scores = projection.apply(query_embeddings) @ (
+        projection.apply(full_embeddings).T
+    )
+    if exclude is not None:
+        rows = np.arange(query_embeddings.shape[0])
+        full_scores[rows, exclude] = -np.inf
+        reduced_scores[rows, exclude] = -np.inf
+
+    full_top = np.argsort(-full_scores, axis=1)[:, :k]
+    reduced_top = np.argsort(-reduced_scores, axis=1)[:, :k]
+
+    recall = np.mean(
+        [
+            len(set(full_row) & set(reduced_row)) / k
+            for full_row, reduced_row in zip(full_top, reduced_top)
+        ]
+    )
+    top1_agreement = np.mean(full_top[:, 0] == reduced_top[:, 0])
+
+    # Дрейф оценок для тех же пар (запрос, кандидат из полной выдачи)
+    raw_scores = projection.project(query_embeddings) @ (
+        projection.project(full_embeddings).T
+    )
+    rows = np.arange(full_top.shape[0])[:, None]
+    drift = np.abs(full_scores[rows, full_top] - raw_scores[rows, full_top])
+
+    return {
+        "top_k": int(k),
+        "queries": int(full_top.shape[0]),
+        "original_dim": int(projection.input_dim),
+        "reduced_dim": int(projection.output_dim),
+        "recall_at_k": float(recall),
+        "top1_agreement": float(top1_agreement),
+        "mean_score_drift": float(drift.mean()),
+        "max_score_drift": float(drift.max()),
+    }
+
+
+def cross_validate_reduction(
+    embeddings: np.ndarray,
+    method: str,
+    dim: int,
+    top_k: int,
+    folds: int,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Оценивает снижение размерности на векторах, не участвовавших в обучении.
+
+    Векторы базы знаний делятся на части; каждая часть по очереди служит
+    запросами к полной базе, а проекция обучается на остальных частях.
+    Так отчет показывает, как проекция переносится на новые запросы.
+
+    Args:
+        embeddings: Нормализованные эмбеддинги базы знаний (n, d)
+        method: Метод снижения размерности ("pca" или "truncate")
+        dim: Целевая размерность
+        top_k: Глубина выдачи для recall@k
+        folds: Количество частей
+        seed: Seed перемешивания векторов
+
+    Returns:
+        Dict[str, Any]: Отчет reduction_report, усредненный по частям
+    """
+    n_vectors = embeddings.shape[0]
+    folds = min(folds, n_vectors)
+    if folds < 2:
+        return {"top_k": 0, "queries": 0, "folds": 0}
+
+    order = np.random.default_rng(seed).permutation(n_vectors)
+    reports: List[Dict[str, Any]] = []
+    for held_out in np.array_split(order, folds):
+        train = np.setdiff1d(order, held_out)
+        # Обучающая часть меньше всей базы: ограничение PCA по числу векторов
+        # уже отражено в dim итоговой проекции, повторно о нем не сообщаем
+        projection = VectorProjection.fit(
+            embeddings[train], method, min(dim, len(train))
+        )
+        report = reduction_report(
+            embeddings, projection, top_k, embeddings[held_out], held_out
+        )
+        if report["queries"]:
+            reports.append(report)
+
+    if not reports:
+        return {"top_k": 0, "queries": 0, "folds": 0}
+
+    weights = np.array([report["queries"] for report in reports], dtype="float64")
+
+    def weighted(name: str) -> float:
+        values = np.array([report[name] for report in reports])
+        return float(np.average(values, weights=weights))
+
+    return {
+        "top_k": reports[0]["top_k"],
+        "queries": int(weights.sum()),
+        "folds": len(reports),
+        "original_dim": reports[0]["original_dim"],
+        "reduced_dim": int(dim),
+        "recall_at_k": weighted("recall_at_k"),
+        "top1_agreement": weighted("top1_agreement"),
+        "mean_score_drift": weighted("mean_score_drift"),
+        "max_score_drift": max(report["max_score_drift"] for report in reports),
+    }